@@ -0,0 +1,60 @@
+"""
+Microbenchmark do decode_token: cache frio x cache quente
+
+Compara a vazão de decode_token quando cada chamada precisa verificar
+o HMAC e fazer o parse do JSON (cache vazio) com o caso comum em que o
+mesmo access token é reutilizado (payload já no cache).
+
+Uso:
+    python -m app.benchmarks.jwt_decode [--iteracoes 50000] [--tokens 100]
+"""
+import argparse
+import time
+
+from app.core.security import create_access_token, decode_token, jwt_decode_cache
+
+
+def _medir(funcao, iteracoes: int) -> float:
+    """Retorna operações por segundo"""
+    inicio = time.perf_counter()
+    for i in range(iteracoes):
+        funcao(i)
+    return iteracoes / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de decode JWT")
+    parser.add_argument("--iteracoes", type=int, default=50000)
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens distintos em rotação")
+    args = parser.parse_args()
+
+    tokens = [
+        create_access_token(user_id=i + 1, email=f"user{i}@escola.com", perfil="ALUNO")
+        for i in range(args.tokens)
+    ]
+
+    def frio(i: int):
+        jwt_decode_cache.clear()
+        decode_token(tokens[i % len(tokens)])
+
+    def quente(i: int):
+        decode_token(tokens[i % len(tokens)])
+
+    # Aquece o cache antes da medição quente
+    for token in tokens:
+        decode_token(token)
+
+    ops_frio = _medir(frio, args.iteracoes)
+    jwt_decode_cache.clear()
+    for token in tokens:
+        decode_token(token)
+    ops_quente = _medir(quente, args.iteracoes)
+
+    print(f"Iterações: {args.iteracoes} | tokens distintos: {len(tokens)}")
+    print(f"Cache frio  : {ops_frio:>12,.0f} decodes/s ({1e6 / ops_frio:.2f} µs/op)")
+    print(f"Cache quente: {ops_quente:>12,.0f} decodes/s ({1e6 / ops_quente:.2f} µs/op)")
+    print(f"Ganho       : {ops_quente / ops_frio:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
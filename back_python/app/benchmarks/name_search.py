@@ -0,0 +1,156 @@
+"""
+Benchmark da busca por nome: ILIKE x trigram sem acento (PostgreSQL)
+
+Cria uma tabela temporária com nomes sintéticos (com e sem acento),
+mede a busca atual (`nome ILIKE '%termo%'`, varredura sequencial) e a
+busca do modo trigram de app/core/busca.py sobre o índice GIN
+f_unaccent(nome) gin_trgm_ops. Também mostra quantas linhas cada modo
+encontra: termos sem acento ("Joao") só casam com "João" no modo trigram.
+
+Requer DATABASE_URL apontando para um PostgreSQL com permissão para
+criar as extensões pg_trgm e unaccent (ou com elas já instaladas).
+
+Uso:
+    python -m app.benchmarks.name_search [--linhas 200000] [--repeticoes 20]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.busca import BuscaNome, ModoBusca
+from app.database.indexes import preparar_busca_textual
+from app.database.session import engine
+
+PRIMEIROS = [
+    "João", "José", "Maria", "Ana", "Antônio", "Francisco", "Luís", "Márcia",
+    "Cláudia", "Sebastião", "Letícia", "Inês", "Vitória", "Júlia", "Mônica",
+    "Pedro", "Paulo", "Lucas", "Gabriel", "Rafael", "Beatriz", "Camila", "Tiago",
+    "Fábio", "Rúbia", "Otávio", "Célia", "Estêvão", "Conceição", "Raimundo",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Conceição", "Araújo", "Gonçalves",
+    "Simões", "Magalhães", "Assunção", "Brandão", "Falcão", "Galvão", "Lima",
+    "Pereira", "Ribeiro", "Carvalho", "Gomes", "Martins", "Rocha", "Almeida",
+    "Nogueira", "Romão", "Guimarães", "Sá", "Damião", "Leão", "Castro",
+]
+# Termos digitados sem acento, parciais e com erro de digitação
+TERMOS = ["Joao", "Sebastiao", "Conceicao", "Guimaraes", "leticia", "Magalhaes", "Ines Sa", "Antonio Romao", "Galvao", "Camlia"]
+
+metadata = MetaData()
+bench_nomes = Table(
+    "bench_nomes",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("nome", String(150), nullable=False),
+    Column("is_deleted", Boolean, nullable=False, default=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+def _gerar_nomes(quantidade: int, semente: int = 42):
+    aleatorio = random.Random(semente)
+    for _ in range(quantidade):
+        yield {
+            "nome": " ".join([
+                aleatorio.choice(PRIMEIROS),
+                aleatorio.choice(SOBRENOMES),
+                aleatorio.choice(SOBRENOMES),
+            ]),
+            "is_deleted": aleatorio.random() < 0.05,
+        }
+
+
+async def _medir(session: AsyncSession, modo: ModoBusca, termo: str, repeticoes: int):
+    """Retorna (tempos em ms, linhas encontradas)"""
+    tempos = []
+    for _ in range(repeticoes):
+        busca = BuscaNome(session, modo)
+        query = select(bench_nomes.c.id).where(
+            bench_nomes.c.is_deleted == False,
+            busca.filtro(bench_nomes.c.nome, termo)
+        )
+
+        inicio = time.perf_counter()
+        result = await busca.executar(query.order_by(*busca.ordem(), bench_nomes.c.id).limit(50))
+        result.all()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    # Contagem total separada para comparar a cobertura de cada modo
+    contagem = select(func.count()).select_from(query.subquery())
+    linhas = (await busca.executar(contagem)).scalar()
+    return tempos, linhas
+
+
+async def _executar(quantidade: int, repeticoes: int):
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Este benchmark requer PostgreSQL (DATABASE_URL)")
+
+    async with engine.connect() as conn:
+        if not await conn.run_sync(preparar_busca_textual):
+            raise SystemExit("pg_trgm/unaccent indisponíveis")
+        await conn.run_sync(metadata.create_all)
+
+        print(f"Inserindo {quantidade:,} nomes sintéticos...")
+        lote = []
+        for linha in _gerar_nomes(quantidade):
+            lote.append(linha)
+            if len(lote) == 10_000:
+                await conn.execute(bench_nomes.insert(), lote)
+                lote = []
+        if lote:
+            await conn.execute(bench_nomes.insert(), lote)
+        await conn.execute(text("ANALYZE bench_nomes"))
+
+        session = AsyncSession(bind=conn)
+        resultados = {}
+
+        # ILIKE atual: sem índice utilizável
+        for termo in TERMOS:
+            resultados[(ModoBusca.ILIKE, termo)] = await _medir(session, ModoBusca.ILIKE, termo, repeticoes)
+
+        await conn.execute(text(
+            "CREATE INDEX ix_bench_nomes_trgm ON bench_nomes "
+            "USING gin (f_unaccent(nome) gin_trgm_ops) WHERE is_deleted = false"
+        ))
+        await conn.execute(text("ANALYZE bench_nomes"))
+
+        for termo in TERMOS:
+            resultados[(ModoBusca.TRIGRAM, termo)] = await _medir(session, ModoBusca.TRIGRAM, termo, repeticoes)
+
+        await conn.rollback()
+
+    await engine.dispose()
+
+    print(f"Linhas: {quantidade:,} | repetições por termo: {repeticoes}\n")
+    print(f"{'termo':<16}{'ilike ms':>10}{'linhas':>9}{'trigram ms':>12}{'linhas':>9}")
+    medianas = {ModoBusca.ILIKE: [], ModoBusca.TRIGRAM: []}
+    for termo in TERMOS:
+        linha = f"{termo:<16}"
+        for modo in (ModoBusca.ILIKE, ModoBusca.TRIGRAM):
+            tempos, encontrados = resultados[(modo, termo)]
+            mediana = statistics.median(tempos)
+            medianas[modo].append(mediana)
+            largura = 10 if modo == ModoBusca.ILIKE else 12
+            linha += f"{mediana:>{largura}.2f}{encontrados:>9,}"
+        print(linha)
+
+    ilike = statistics.mean(medianas[ModoBusca.ILIKE])
+    trigram = statistics.mean(medianas[ModoBusca.TRIGRAM])
+    print(f"\nMédia das medianas: ilike {ilike:.2f} ms | trigram {trigram:.2f} ms ({ilike / trigram:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca por nome")
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_executar(args.linhas, args.repeticoes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Índice em memória para autocompletar nomes
+
+As telas de cadastro buscam alunos/professores enquanto o usuário
+digita. Em vez de uma consulta ao banco por tecla, o /autocomplete
+responde a partir de listas ordenadas em memória (busca binária pelo
+prefixo), com nomes sem acento e em minúsculas.
+
+Para cada tipo (aluno, professor, servidor, turma, disciplina) há duas
+listas de (chave, id):
+
+- nomes: o nome completo ("joao pedro silva"), casa o início do nome
+- palavras: o nome a partir de cada palavra seguinte ("pedro silva",
+  "silva"), casa sobrenomes
+
+Resultados pelo início do nome vêm antes dos casados por palavra.
+
+O índice é construído na inicialização, atualizado pelos handlers de
+criação/edição/exclusão (`indice_nomes.atualizar(obj)` após o commit)
+e reconstruído periodicamente (AUTOCOMPLETE_REBUILD_SECONDS) para
+incorporar alterações feitas por outros workers.
+"""
+import asyncio
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.busca import remover_acentos
+from app.core.config import settings
+from app.database.session import async_session
+from app.models import Aluno, Disciplina, Professor, Servidor, Turma
+
+
+# tipo -> (model, coluna de ID)
+ENTIDADES = {
+    "aluno": (Aluno, "id_aluno"),
+    "professor": (Professor, "id_professor"),
+    "servidor": (Servidor, "id_servidor"),
+    "turma": (Turma, "id_turma"),
+    "disciplina": (Disciplina, "id_disciplina"),
+}
+_TIPO_POR_MODEL = {model: tipo for tipo, (model, _) in ENTIDADES.items()}
+
+
+class ItemNome(NamedTuple):
+    tipo: str
+    id: int
+    nome: str
+    id_usuario: Optional[int] = None
+
+
+def _ativo(obj) -> bool:
+    # Servidor usa `ativo`; os demais, `is_deleted`
+    return not getattr(obj, "is_deleted", False) and getattr(obj, "ativo", True)
+
+
+def _chaves(nome: str) -> Tuple[str, List[str]]:
+    """(nome completo, nome a partir de cada palavra seguinte), sem acento"""
+    palavras = remover_acentos(nome).split()
+    return " ".join(palavras), [" ".join(palavras[i:]) for i in range(1, len(palavras))]
+
+
+def _remover_chave(lista: List[Tuple[str, int]], chave: Tuple[str, int]) -> None:
+    i = bisect_left(lista, chave)
+    if i < len(lista) and lista[i] == chave:
+        del lista[i]
+
+
+class _IndiceTipo:
+    """Listas ordenadas de um tipo"""
+
+    def __init__(self, itens: Sequence[ItemNome] = ()):
+        self.itens: Dict[int, ItemNome] = {}
+        self.nomes: List[Tuple[str, int]] = []
+        self.palavras: List[Tuple[str, int]] = []
+        for item in itens:
+            self.itens[item.id] = item
+            nome, palavras = _chaves(item.nome)
+            self.nomes.append((nome, item.id))
+            self.palavras.extend((palavra, item.id) for palavra in palavras)
+        self.nomes.sort()
+        self.palavras.sort()
+
+    def inserir(self, item: ItemNome) -> None:
+        self.remover(item.id)
+        self.itens[item.id] = item
+        nome, palavras = _chaves(item.nome)
+        insort(self.nomes, (nome, item.id))
+        for palavra in palavras:
+            insort(self.palavras, (palavra, item.id))
+
+    def remover(self, id: int) -> None:
+        item = self.itens.pop(id, None)
+        if item is None:
+            return
+        nome, palavras = _chaves(item.nome)
+        _remover_chave(self.nomes, (nome, id))
+        for palavra in palavras:
+            _remover_chave(self.palavras, (palavra, id))
+
+    @staticmethod
+    def _faixa(lista: List[Tuple[str, int]], prefixo: str):
+        i = bisect_left(lista, (prefixo,))
+        while i < len(lista) and lista[i][0].startswith(prefixo):
+            yield lista[i]
+            i += 1
+
+    def buscar(self, prefixo: str, limite: int) -> List[Tuple[int, str, ItemNome]]:
+        """Até `limite` itens como (rank, chave, item); rank 0 = início do nome"""
+        encontrados: Dict[int, Tuple[int, str, ItemNome]] = {}
+        for rank, lista in enumerate((self.nomes, self.palavras)):
+            for chave, id in self._faixa(lista, prefixo):
+                if len(encontrados) >= limite:
+                    break
+                if id not in encontrados:
+                    encontrados[id] = (rank, chave, self.itens[id])
+        return list(encontrados.values())
+
+
+class IndiceNomes:
+    """Índice de prefixos de todos os tipos"""
+
+    def __init__(self):
+        self._tipos: Dict[str, _IndiceTipo] = {tipo: _IndiceTipo() for tipo in ENTIDADES}
+        self._aluno_por_usuario: Dict[int, int] = {}
+        # Alterações recebidas durante uma reconstrução (reaplicadas no fim)
+        self._pendentes: Optional[List[Tuple[str, int, Optional[ItemNome]]]] = None
+        self.construido_em: Optional[float] = None
+        self.reconstrucoes = 0
+        self.consultas = 0
+
+    # ---------- atualização ----------
+
+    def atualizar(self, obj) -> None:
+        """Insere/atualiza `obj` (model) ou o remove se estiver excluído/inativo"""
+        tipo = _TIPO_POR_MODEL[type(obj)]
+        id = getattr(obj, ENTIDADES[tipo][1])
+        item = None
+        if _ativo(obj):
+            item = ItemNome(tipo, id, obj.nome, getattr(obj, "id_usuario", None))
+
+        self._aplicar(tipo, id, item)
+        if self._pendentes is not None:
+            self._pendentes.append((tipo, id, item))
+
+    def _aplicar(self, tipo: str, id: int, item: Optional[ItemNome]) -> None:
+        indice = self._tipos[tipo]
+        if tipo == "aluno":
+            anterior = indice.itens.get(id)
+            if anterior is not None and anterior.id_usuario is not None:
+                self._aluno_por_usuario.pop(anterior.id_usuario, None)
+            if item is not None and item.id_usuario is not None:
+                self._aluno_por_usuario[item.id_usuario] = id
+
+        if item is None:
+            indice.remover(id)
+        else:
+            indice.inserir(item)
+
+    async def carregar(self, session: AsyncSession) -> None:
+        """Reconstrói o índice a partir do banco (troca atômica ao final)"""
+        self._pendentes = []
+        try:
+            tipos = {}
+            for tipo, (model, coluna_id) in ENTIDADES.items():
+                colunas = [getattr(model, coluna_id), model.nome]
+                if tipo == "aluno":
+                    colunas.append(model.id_usuario)
+                ativo = model.ativo == True if tipo == "servidor" else model.is_deleted == False
+                result = await session.execute(select(*colunas).where(ativo))
+                tipos[tipo] = _IndiceTipo([ItemNome(tipo, *linha) for linha in result.all()])
+
+            self._tipos = tipos
+            self._aluno_por_usuario = {
+                item.id_usuario: item.id
+                for item in tipos["aluno"].itens.values()
+                if item.id_usuario is not None
+            }
+            for tipo, id, item in self._pendentes:
+                self._aplicar(tipo, id, item)
+        finally:
+            self._pendentes = None
+
+        self.construido_em = time.time()
+        self.reconstrucoes += 1
+
+    # ---------- consulta ----------
+
+    def buscar(
+        self,
+        termo: str,
+        tipos: Sequence[str],
+        limite: int = 10,
+        somente_usuario_aluno: Optional[int] = None
+    ) -> List[ItemNome]:
+        """
+        Até `limite` itens cujo nome (ou alguma palavra dele) começa com `termo`
+
+        - somente_usuario_aluno: restringe os alunos ao vinculado a este
+          usuário (regra de visibilidade do perfil ALUNO)
+        """
+        self.consultas += 1
+        prefixo = " ".join(remover_acentos(termo).split())
+        if not prefixo:
+            return []
+
+        candidatos = []
+        for tipo in tipos:
+            if tipo == "aluno" and somente_usuario_aluno is not None:
+                candidatos.extend(self._proprio_aluno(somente_usuario_aluno, prefixo))
+            else:
+                candidatos.extend(self._tipos[tipo].buscar(prefixo, limite))
+
+        candidatos.sort(key=lambda c: (c[0], c[1], c[2].tipo, c[2].id))
+        return [item for _, _, item in candidatos[:limite]]
+
+    def _proprio_aluno(self, id_usuario: int, prefixo: str) -> List[Tuple[int, str, ItemNome]]:
+        id = self._aluno_por_usuario.get(id_usuario)
+        item = self._tipos["aluno"].itens.get(id) if id is not None else None
+        if item is None:
+            return []
+        nome, palavras = _chaves(item.nome)
+        if nome.startswith(prefixo):
+            return [(0, nome, item)]
+        for palavra in palavras:
+            if palavra.startswith(prefixo):
+                return [(1, palavra, item)]
+        return []
+
+    def stats(self) -> dict:
+        return {
+            "items": {tipo: len(indice.itens) for tipo, indice in self._tipos.items()},
+            "keys": sum(len(i.nomes) + len(i.palavras) for i in self._tipos.values()),
+            "queries": self.consultas,
+            "rebuilds": self.reconstrucoes,
+            "age_seconds": round(time.time() - self.construido_em, 1) if self.construido_em else None,
+        }
+
+
+indice_nomes = IndiceNomes()
+
+
+async def tarefa_reconstrucao_autocomplete() -> None:
+    """Reconstrói o índice a cada AUTOCOMPLETE_REBUILD_SECONDS"""
+    while True:
+        await asyncio.sleep(settings.AUTOCOMPLETE_REBUILD_SECONDS)
+        try:
+            async with async_session() as session:
+                await indice_nomes.carregar(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Falha ao reconstruir o índice de autocomplete: {e}")
@@ -0,0 +1,309 @@
+"""
+Armazenamento de arquivos binários endereçado por conteúdo
+
+Os bytes das imagens da galeria ficam fora do banco: a tabela guarda só
+a chave (SHA-256 do conteúdo), o tamanho e o tipo MIME. Conteúdo igual
+gera a mesma chave, então a mesma foto enviada duas vezes ocupa espaço
+uma única vez.
+
+Backends (BLOB_STORE_BACKEND):
+- "local": sistema de arquivos, com subpastas pelos primeiros bytes do
+  hash (raiz/ab/cd/abcd...) para não acumular milhares de arquivos num
+  único diretório
+- "s3": bucket S3 ou compatível (MinIO, LocalStack etc. via
+  BLOB_S3_ENDPOINT_URL). Requer `boto3` instalado; as credenciais seguem
+  a cadeia padrão do boto3 (AWS_ACCESS_KEY_ID, ~/.aws, ...)
+
+As operações de E/S bloqueantes rodam em threads (asyncio.to_thread)
+para não travar o event loop.
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, Optional, Tuple
+
+from app.core.config import settings
+
+
+def calcular_chave(dados: bytes) -> str:
+    """Chave de conteúdo: SHA-256 em hexadecimal"""
+    return hashlib.sha256(dados).hexdigest()
+
+
+# Assinaturas (magic bytes) dos formatos de imagem aceitos
+_ASSINATURAS = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def detectar_mime(cabecalho: bytes) -> Optional[str]:
+    """Tipo MIME pelos primeiros bytes do arquivo (None se desconhecido)"""
+    for assinatura, mime in _ASSINATURAS:
+        if cabecalho.startswith(assinatura):
+            return mime
+    if cabecalho[:4] == b"RIFF" and cabecalho[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class BlobNaoEncontrado(Exception):
+    """Chave inexistente no armazenamento"""
+
+
+# ==================== BACKENDS ====================
+
+class BlobStore:
+    """Interface comum dos backends"""
+
+    async def salvar(self, dados: bytes) -> Tuple[str, int]:
+        """Grava `dados` (se ainda não existirem) e retorna (chave, tamanho)"""
+        chave = calcular_chave(dados)
+        if not await self.existe(chave):
+            await self._gravar(chave, dados)
+        return chave, len(dados)
+
+    async def gravar(self, chave: str, dados: bytes) -> None:
+        """Grava `dados` sob uma chave definida pelo chamador (derivados de um blob)"""
+        await self._gravar(chave, dados)
+
+    async def ler(self, chave: str) -> bytes:
+        partes = [parte async for parte in self.stream(chave)]
+        return b"".join(partes)
+
+    def dir_temporario(self) -> Optional[str]:
+        """Diretório para temporários de upload (None = padrão do sistema)"""
+        return None
+
+    async def salvar_arquivo(self, caminho: str, chave: str) -> None:
+        """
+        Guarda o arquivo `caminho`, cujo SHA-256 é `chave`, sem lê-lo em memória
+
+        O arquivo é consumido (movido ou apagado).
+        """
+        raise NotImplementedError
+
+    async def _gravar(self, chave: str, dados: bytes) -> None:
+        raise NotImplementedError
+
+    async def existe(self, chave: str) -> bool:
+        raise NotImplementedError
+
+    async def tamanho(self, chave: str) -> int:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        chave: str,
+        inicio: int = 0,
+        fim: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Bytes de `inicio` até `fim` (inclusive; None = até o final) em blocos"""
+        raise NotImplementedError
+
+    async def remover(self, chave: str) -> None:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Arquivos em `raiz`/ab/cd/<sha256>"""
+
+    def __init__(self, raiz: str):
+        self.raiz = os.path.abspath(raiz)
+
+    def caminho(self, chave: str) -> str:
+        return os.path.join(self.raiz, chave[:2], chave[2:4], chave)
+
+    def _gravar_sync(self, chave: str, dados: bytes) -> None:
+        destino = self.caminho(chave)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Grava num temporário e renomeia: leitores nunca veem arquivo parcial
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, destino)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    async def _gravar(self, chave: str, dados: bytes) -> None:
+        await asyncio.to_thread(self._gravar_sync, chave, dados)
+
+    def dir_temporario(self) -> str:
+        # No mesmo sistema de arquivos da raiz: mover para o destino é um rename
+        caminho = os.path.join(self.raiz, ".tmp")
+        os.makedirs(caminho, exist_ok=True)
+        return caminho
+
+    def _mover_sync(self, caminho: str, chave: str) -> None:
+        destino = self.caminho(chave)
+        if os.path.exists(destino):
+            os.remove(caminho)
+            return
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.move(caminho, destino)
+
+    async def salvar_arquivo(self, caminho: str, chave: str) -> None:
+        await asyncio.to_thread(self._mover_sync, caminho, chave)
+
+    async def existe(self, chave: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.caminho(chave))
+
+    async def tamanho(self, chave: str) -> int:
+        try:
+            return await asyncio.to_thread(os.path.getsize, self.caminho(chave))
+        except FileNotFoundError:
+            raise BlobNaoEncontrado(chave)
+
+    async def stream(
+        self,
+        chave: str,
+        inicio: int = 0,
+        fim: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        try:
+            arquivo = await asyncio.to_thread(open, self.caminho(chave), "rb")
+        except FileNotFoundError:
+            raise BlobNaoEncontrado(chave)
+
+        try:
+            await asyncio.to_thread(arquivo.seek, inicio)
+            restante = None if fim is None else fim - inicio + 1
+            while restante is None or restante > 0:
+                tamanho = chunk_size if restante is None else min(chunk_size, restante)
+                bloco = await asyncio.to_thread(arquivo.read, tamanho)
+                if not bloco:
+                    break
+                if restante is not None:
+                    restante -= len(bloco)
+                yield bloco
+        finally:
+            await asyncio.to_thread(arquivo.close)
+
+    async def remover(self, chave: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self.caminho(chave))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore(BlobStore):
+    """Objetos em s3://bucket/prefixo/ab/cd/<sha256>"""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefixo: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None
+    ):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("BLOB_STORE_BACKEND=s3 requer o pacote boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.prefixo = prefixo.strip("/")
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self._ClientError = ClientError
+
+    def objeto(self, chave: str) -> str:
+        caminho = f"{chave[:2]}/{chave[2:4]}/{chave}"
+        return f"{self.prefixo}/{caminho}" if self.prefixo else caminho
+
+    def _nao_encontrado(self, erro) -> bool:
+        return erro.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    async def _gravar(self, chave: str, dados: bytes) -> None:
+        await asyncio.to_thread(
+            self._client.put_object, Bucket=self.bucket, Key=self.objeto(chave), Body=dados
+        )
+
+    async def salvar_arquivo(self, caminho: str, chave: str) -> None:
+        try:
+            if not await self.existe(chave):
+                # upload_file envia em partes (multipart upload) para arquivos grandes
+                await asyncio.to_thread(
+                    self._client.upload_file, caminho, self.bucket, self.objeto(chave)
+                )
+        finally:
+            await asyncio.to_thread(os.remove, caminho)
+
+    async def _head(self, chave: str) -> Optional[dict]:
+        try:
+            return await asyncio.to_thread(
+                self._client.head_object, Bucket=self.bucket, Key=self.objeto(chave)
+            )
+        except self._ClientError as e:
+            if self._nao_encontrado(e):
+                return None
+            raise
+
+    async def existe(self, chave: str) -> bool:
+        return await self._head(chave) is not None
+
+    async def tamanho(self, chave: str) -> int:
+        cabecalho = await self._head(chave)
+        if cabecalho is None:
+            raise BlobNaoEncontrado(chave)
+        return cabecalho["ContentLength"]
+
+    async def stream(
+        self,
+        chave: str,
+        inicio: int = 0,
+        fim: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        faixa = f"bytes={inicio}-{'' if fim is None else fim}"
+        try:
+            resposta = await asyncio.to_thread(
+                self._client.get_object, Bucket=self.bucket, Key=self.objeto(chave), Range=faixa
+            )
+        except self._ClientError as e:
+            if self._nao_encontrado(e):
+                raise BlobNaoEncontrado(chave)
+            raise
+
+        corpo = resposta["Body"]
+        try:
+            while True:
+                bloco = await asyncio.to_thread(corpo.read, chunk_size)
+                if not bloco:
+                    break
+                yield bloco
+        finally:
+            corpo.close()
+
+    async def remover(self, chave: str) -> None:
+        await asyncio.to_thread(
+            self._client.delete_object, Bucket=self.bucket, Key=self.objeto(chave)
+        )
+
+
+def criar_blob_store() -> BlobStore:
+    """Backend configurado em BLOB_STORE_BACKEND"""
+    if settings.BLOB_STORE_BACKEND == "local":
+        return LocalBlobStore(settings.BLOB_STORE_PATH)
+    if settings.BLOB_STORE_BACKEND == "s3":
+        if not settings.BLOB_S3_BUCKET:
+            raise ValueError("BLOB_STORE_BACKEND=s3 requer BLOB_S3_BUCKET")
+        return S3BlobStore(
+            bucket=settings.BLOB_S3_BUCKET,
+            prefixo=settings.BLOB_S3_PREFIX,
+            endpoint_url=settings.BLOB_S3_ENDPOINT_URL,
+            region=settings.BLOB_S3_REGION
+        )
+    raise ValueError("BLOB_STORE_BACKEND deve ser 'local' ou 's3'")
+
+
+blob_store = criar_blob_store()
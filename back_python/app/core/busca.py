@@ -0,0 +1,139 @@
+"""
+Busca por nome: ILIKE ou trigramas sem acento (pg_trgm + unaccent)
+
+`nome ILIKE '%x%'` não usa índice B-tree (varredura sequencial) e não
+encontra "João" buscando "Joao". No modo trigram a comparação é feita
+sobre f_unaccent(nome), com índices GIN gin_trgm_ops (ver
+app/database/indexes.py), e casa quando:
+
+- o termo sem acento aparece no nome (ILIKE, acelerado pelo índice), ou
+- o termo é parecido com alguma parte do nome (operador <% do pg_trgm,
+  word_similarity >= NAME_SEARCH_SIMILARITY_THRESHOLD), tolerando erros
+  de digitação
+
+e os resultados vêm ordenados pela similaridade. Fora do PostgreSQL, ou
+se as extensões não puderem ser criadas (verificado uma vez na
+inicialização por `suporte_trigram.verificar`), o modo trigram recai
+no ILIKE.
+
+Uso nos routers:
+
+    busca = BuscaNome(session, modo_busca)
+    if nome:
+        query = query.where(busca.filtro(Aluno.nome, nome))
+    result = await busca.executar(query.order_by(*busca.ordem(), Aluno.id_aluno))
+"""
+import re
+import unicodedata
+from enum import Enum
+from typing import Any, List
+
+from sqlalchemy import Float, func, literal, or_, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.database.indexes import preparar_busca_textual
+
+
+class ModoBusca(str, Enum):
+    """Estratégia da busca por nome"""
+    ILIKE = "ilike"
+    TRIGRAM = "trigram"
+
+
+# Modo usado quando o parâmetro `busca` não é informado
+MODO_BUSCA_PADRAO = ModoBusca(settings.NAME_SEARCH_DEFAULT_MODE)
+
+
+class SuporteTrigram:
+    """
+    Disponibilidade de pg_trgm, unaccent e f_unaccent
+
+    Independe de DB_ENSURE_INDEXES: sem os índices GIN a busca trigram
+    só fica mais lenta, mas sem as extensões ela falharia.
+    """
+
+    def __init__(self):
+        self.disponivel = False
+
+    async def verificar(self, engine: AsyncEngine) -> bool:
+        """Cria as extensões se faltarem (uma vez, na inicialização)"""
+        async with engine.begin() as conn:
+            self.disponivel = await conn.run_sync(preparar_busca_textual)
+        return self.disponivel
+
+
+suporte_trigram = SuporteTrigram()
+
+
+def remover_acentos(texto: str) -> str:
+    """'João' -> 'joao' (minúsculas, sem marcas diacríticas)"""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def formatos_cpf(termo: str) -> List[str]:
+    """
+    Formas armazenadas de um CPF: só dígitos e com máscara
+
+    Cadastros antigos guardam "987.654.321-00"; os novos, 11 dígitos.
+    Comparar com as duas formas (cpf IN (...)) usa o índice único de cpf.
+    Retorna [] se o termo não tiver 11 dígitos.
+    """
+    digitos = re.sub(r"\D", "", termo)
+    if len(digitos) != 11:
+        return []
+    return [digitos, f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"]
+
+
+class BuscaNome:
+    """
+    Filtros de nome de uma consulta
+
+    Acumula a relevância de cada filtro aplicado para ordenar o
+    resultado no modo trigram.
+    """
+
+    def __init__(self, session: AsyncSession, modo: ModoBusca = ModoBusca.ILIKE):
+        self.session = session
+        if modo == ModoBusca.TRIGRAM and (
+            not suporte_trigram.disponivel or session.bind.dialect.name != "postgresql"
+        ):
+            modo = ModoBusca.ILIKE
+        self.modo = modo
+        self._relevancias: List[Any] = []
+
+    def filtro(self, coluna, termo: str):
+        """Condição WHERE para `coluna` contendo (ou parecida com) `termo`"""
+        if self.modo == ModoBusca.ILIKE:
+            return coluna.ilike(f"%{termo}%")
+
+        self._relevancias.append(self.relevancia(coluna, termo))
+        termo = remover_acentos(termo.strip())
+        nome = func.f_unaccent(coluna)
+        return or_(
+            nome.ilike(f"%{termo}%"),
+            literal(termo).op("<%")(nome)
+        )
+
+    def relevancia(self, coluna, termo: str):
+        """Similaridade de `coluna` com `termo` (0 no modo ILIKE)"""
+        if self.modo == ModoBusca.ILIKE:
+            return literal(0.0, Float)
+        return func.word_similarity(remover_acentos(termo.strip()), func.f_unaccent(coluna))
+
+    def ordem(self) -> List[Any]:
+        """ORDER BY por relevância (vazio no modo ILIKE)"""
+        if not self._relevancias:
+            return []
+        return [sum(self._relevancias[1:], self._relevancias[0]).desc()]
+
+    async def executar(self, query):
+        """Executa a consulta aplicando o limiar de similaridade do modo trigram"""
+        if self._relevancias:
+            # set_config(..., true) vale só para a transação atual
+            await self.session.execute(
+                text("SELECT set_config('pg_trgm.word_similarity_threshold', :limiar, true)"),
+                {"limiar": str(settings.NAME_SEARCH_SIMILARITY_THRESHOLD)}
+            )
+        return await self.session.execute(query)
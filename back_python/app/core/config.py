@@ -8,6 +8,29 @@ class Settings(BaseSettings):
     """
     # Database
     DATABASE_URL: str
+    # Réplica de leitura opcional (endpoints GET); vazio usa o DATABASE_URL
+    DATABASE_READ_URL: Optional[str] = None
+    # Após uma escrita, leituras do mesmo usuário vão ao primário por este tempo
+    READ_AFTER_WRITE_SECONDS: int = 5
+    
+    # Pool de conexões (PostgreSQL)
+    # Conexões máximas por worker = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # Segundos aguardando uma conexão livre antes de falhar
+    DB_POOL_TIMEOUT: int = 30
+    # Recicla conexões mais antigas que isso (segundos); -1 desabilita
+    DB_POOL_RECYCLE: int = 1800
+    # Testa a conexão no checkout (descarta conexões derrubadas pelo servidor)
+    DB_POOL_PRE_PING: bool = True
+    # Cache de prepared statements do asyncpg por conexão
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Compatibilidade com PgBouncer em modo transaction (desliga o cache acima)
+    DB_PGBOUNCER: bool = False
+    # Cria na inicialização os índices de app/database/indexes.py que faltarem.
+    # Só para desenvolvimento: bloqueia escritas nas tabelas durante a criação.
+    # Em produção use `python -m app.database.indexes --create` (CONCURRENTLY)
+    DB_ENSURE_INDEXES: bool = False
     
     # JWT e Segurança
     SECRET_KEY: str
@@ -17,6 +40,89 @@ class Settings(BaseSettings):
     # Tempo de expiração do refresh token em horas (troca: antes era em dias)
     REFRESH_TOKEN_EXPIRE_HOURS: int = 4
     
+    # Store de refresh tokens (rotação, reuso, logout)
+    # Intervalo da tarefa que recarrega o índice de revogação e purga expirados
+    REFRESH_TOKEN_MAINTENANCE_SECONDS: int = 60
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 1000
+    # Capacidade do Bloom filter de famílias revogadas (~1% de falso positivo)
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    
+    # Cache de tokens JWT já verificados (0 desabilita)
+    JWT_DECODE_CACHE_SIZE: int = 4096
+    
+    # Cache do usuário autenticado (get_current_user)
+    # TTL em segundos; USER_CACHE_MAX_SIZE=0 desabilita o cache
+    # Cache por processo: com vários workers, senha/ativo alterados em outro
+    # worker valem em até TOKEN_VERSION_REFRESH_SECONDS; os demais campos,
+    # em até USER_CACHE_TTL_SECONDS
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 1024
+    
+    # Modo claims-only: get_current_user/require_role confiam nas claims
+    # sub/perfil do JWT e não carregam a linha de `usuarios`.
+    # A revogação usa token_version, conferido num mapa em memória
+    # recarregado a cada TOKEN_VERSION_REFRESH_SECONDS.
+    AUTH_CLAIMS_ONLY: bool = False
+    TOKEN_VERSION_REFRESH_SECONDS: int = 30
+    
+    # Pool de hash de senhas (bcrypt fora do event loop)
+    # PASSWORD_HASH_EXECUTOR: "thread" ou "process"
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    # Chamadas que podem aguardar na fila além das em execução; acima disso responde 503
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+    
+    # Limite de tentativas em /auth/login e /auth/signup (antes do bcrypt)
+    # LOGIN_RATE_LIMIT_BACKEND: "memory" (por processo) ou "database" (compartilhado)
+    # Limites por janela; 0 desabilita o respectivo limite
+    LOGIN_RATE_LIMIT_BACKEND: str = "memory"
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    # Usar X-Forwarded-For como IP do cliente (apenas atrás de proxy confiável)
+    TRUST_PROXY_HEADERS: bool = False
+    
+    # Cache de contagens das listagens (parâmetro total=cached)
+    # Invalidado nas escritas deste processo; o TTL limita o atraso entre workers
+    COUNT_CACHE_TTL_SECONDS: int = 300
+    COUNT_CACHE_MAX_SIZE: int = 512
+    
+    # Cache de respostas de notícias e galeria (app/core/response_cache.py)
+    # Fresca por TTL; depois, servida por mais STALE segundos enquanto é
+    # atualizada em segundo plano. RESPONSE_CACHE_MAX_SIZE=0 desabilita
+    # O cache é por processo: escritas feitas em outro worker podem levar
+    # até TTL + STALE para aparecer. Com WEB_CONCURRENCY > 1, STALE é
+    # limitado ao TTL
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_STALE_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_SIZE: int = 1024
+    # Número de workers (o mesmo valor que uvicorn/gunicorn leem para --workers)
+    WEB_CONCURRENCY: int = 1
+    
+    # Busca por nome (parâmetro `busca`: "ilike" ou "trigram")
+    NAME_SEARCH_DEFAULT_MODE: str = "ilike"
+    # Similaridade mínima (word_similarity do pg_trgm, 0 a 1) no modo trigram
+    NAME_SEARCH_SIMILARITY_THRESHOLD: float = 0.4
+    # Intervalo de reconstrução do índice de /autocomplete (segundos)
+    AUTOCOMPLETE_REBUILD_SECONDS: int = 300
+    
+    # Armazenamento das imagens da galeria ("local" ou "s3")
+    BLOB_STORE_BACKEND: str = "local"
+    # Diretório raiz do backend local
+    BLOB_STORE_PATH: str = "./data/blobs"
+    # Backend s3: bucket, prefixo das chaves e endpoint (MinIO/LocalStack)
+    BLOB_S3_BUCKET: Optional[str] = None
+    BLOB_S3_PREFIX: str = "galeria"
+    BLOB_S3_ENDPOINT_URL: Optional[str] = None
+    BLOB_S3_REGION: Optional[str] = None
+    # Tamanho máximo de imagem enviada por POST /galeria/upload (bytes)
+    GALERIA_UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    # Miniaturas da galeria: lados em px (GET /galeria/{id}/raw?size=) e
+    # processos do pool que as gera
+    GALERIA_DERIVADOS_TAMANHOS: List[int] = [200, 400, 800]
+    GALERIA_DERIVADOS_WORKERS: int = 2
+    
     # Application
     APP_NAME: str = "Sistema de Gerenciamento Escolar - CETA Trajano"
     DEBUG: bool = False
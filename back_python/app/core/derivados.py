@@ -0,0 +1,212 @@
+"""
+Imagens derivadas da galeria: miniaturas e versões WebP
+
+A grade da galeria mostra blocos de ~200px, mas baixava os originais.
+Para cada imagem do blob store são geradas:
+
+- miniaturas para cada tamanho de GALERIA_DERIVADOS_TAMANHOS (cabem num
+  quadrado de N×N px, proporção mantida, sem ampliar), no formato de
+  origem: JPEG continua JPEG, os demais viram PNG
+- versões WebP de cada miniatura e da imagem em tamanho original
+
+A decodificação e a codificação (Pillow) rodam num pool de processos,
+fora do event loop e do caminho da requisição; o pool é criado no
+startup da aplicação (`iniciar`). O upload só agenda a geração
+(`agendar`), depois do commit; GET /galeria/{id}/raw?size= gera sob
+demanda os derivados que faltarem (`obter`), por exemplo de imagens
+enviadas antes deste recurso. Pedidos simultâneos da mesma imagem compartilham uma
+única geração.
+
+Os derivados ficam no blob store ao lado do original, com a chave
+"<sha256>.<tamanho>.<ext>": abcd...ef.200.jpg, abcd...ef.200.webp,
+abcd...ef.full.webp.
+"""
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from PIL import Image, ImageOps
+
+from app.core.blob_store import BlobStore, blob_store
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+MIME_POR_EXTENSAO = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+def extensao_miniatura(mime_original: Optional[str]) -> str:
+    """Formato das miniaturas no formato de origem: JPEG continua JPEG, o resto vira PNG"""
+    return "jpg" if mime_original == "image/jpeg" else "png"
+
+
+def chave_derivado(chave: str, tamanho: Optional[int], extensao: str) -> str:
+    """Chave de um derivado no blob store (tamanho None = tamanho original)"""
+    return f"{chave}.{tamanho or 'full'}.{extensao}"
+
+
+# ==================== PROCESSAMENTO (WORKER) ====================
+# Executado nos processos do pool: recebe e devolve só bytes
+
+def _codificar(imagem: "Image.Image", extensao: str) -> bytes:
+    buffer = io.BytesIO()
+    if extensao == "jpg":
+        imagem.convert("RGB").save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+    elif extensao == "png":
+        imagem.save(buffer, "PNG", optimize=True)
+    else:
+        imagem.save(buffer, "WEBP", quality=80, method=4)
+    return buffer.getvalue()
+
+
+def gerar_derivados(dados: bytes, tamanhos: Sequence[int]) -> Dict[str, bytes]:
+    """
+    Decodifica a imagem uma vez e gera todos os derivados
+
+    Returns:
+        {"<tamanho>.<ext>": bytes} (ex.: "200.jpg", "200.webp", "full.webp")
+    """
+    with Image.open(io.BytesIO(dados)) as original:
+        extensao = "jpg" if original.format == "JPEG" else "png"
+        # Aplica a rotação do EXIF (fotos de celular) e lê o primeiro quadro (GIF)
+        imagem = ImageOps.exif_transpose(original)
+
+    if imagem.mode not in ("RGB", "RGBA", "L", "LA"):
+        transparente = "A" in imagem.mode or "transparency" in imagem.info
+        imagem = imagem.convert("RGBA" if transparente else "RGB")
+
+    saidas = {"full.webp": _codificar(imagem, "webp")}
+    for tamanho in tamanhos:
+        miniatura = imagem.copy()
+        miniatura.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+        saidas[f"{tamanho}.{extensao}"] = _codificar(miniatura, extensao)
+        saidas[f"{tamanho}.webp"] = _codificar(miniatura, "webp")
+    return saidas
+
+
+# ==================== GERADOR ====================
+
+class GeradorDerivados:
+    """
+    Gera e localiza os derivados das imagens do blob store
+
+    - tamanhos: lados (px) das miniaturas
+    - max_workers: processos do pool
+    """
+
+    def __init__(self, store: BlobStore, tamanhos: Sequence[int], max_workers: int = 2):
+        self.store = store
+        self.tamanhos = sorted(set(tamanhos))
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Geração em andamento por chave do original
+        self._em_andamento: Dict[str, asyncio.Task] = {}
+        # Imagens que o Pillow não conseguiu ler: não tenta de novo a cada pedido
+        self._falhas_recentes = TTLCache(max_size=1024, ttl=3600)
+
+        self.gerados = 0
+        self.falhas = 0
+        self.latency = Histogram([50, 100, 250, 500, 1000, 2500, 5000, 10000])
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: não herda (via fork) o event loop, threads e
+            # conexões do processo do servidor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def iniciar(self) -> None:
+        """Cria o pool (chamado no startup da aplicação, não no primeiro upload)"""
+        self._get_executor()
+
+    async def _gerar(self, chave: str) -> bool:
+        inicio = time.perf_counter()
+        try:
+            dados = await self.store.ler(chave)
+            loop = asyncio.get_running_loop()
+            saidas = await loop.run_in_executor(
+                self._get_executor(), gerar_derivados, dados, self.tamanhos
+            )
+            for sufixo, conteudo in saidas.items():
+                await self.store.gravar(f"{chave}.{sufixo}", conteudo)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Arquivo corrompido ou formato que o Pillow não lê
+            self.falhas += 1
+            self._falhas_recentes.set(chave, True)
+            print(f"⚠️  Falha ao gerar derivados da imagem {chave}: {e}")
+            return False
+
+        self.gerados += 1
+        self.latency.observe((time.perf_counter() - inicio) * 1000)
+        return True
+
+    def _tarefa(self, chave: str) -> asyncio.Task:
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.create_task(self._gerar(chave))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        return tarefa
+
+    def agendar(self, chave: str) -> None:
+        """Gera os derivados de `chave` em segundo plano (chamar após o commit)"""
+        self._tarefa(chave)
+
+    async def obter(self, chave: str, tamanho: Optional[int], extensao: str) -> Optional[str]:
+        """
+        Chave do derivado pedido, gerando os derivados se estiverem faltando
+
+        Returns:
+            None se a imagem não pôde ser processada
+        """
+        derivado = chave_derivado(chave, tamanho, extensao)
+        if await self.store.existe(derivado):
+            return derivado
+        if self._falhas_recentes.get(chave):
+            return None
+
+        # shield: a geração continua mesmo se este cliente desconectar
+        await asyncio.shield(self._tarefa(chave))
+        return derivado if await self.store.existe(derivado) else None
+
+    def chaves(self, chave: str) -> List[str]:
+        """Chaves de todos os derivados possíveis de `chave` (para remoção)"""
+        derivados = [chave_derivado(chave, None, "webp")]
+        for tamanho in self.tamanhos:
+            derivados.extend(chave_derivado(chave, tamanho, extensao) for extensao in ("jpg", "png", "webp"))
+        return derivados
+
+    def shutdown(self) -> None:
+        """Encerra o pool (chamado no shutdown da aplicação)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sizes": self.tamanhos,
+            "max_workers": self.max_workers,
+            "in_progress": len(self._em_andamento),
+            "generated": self.gerados,
+            "failed": self.falhas,
+            "latency": self.latency.snapshot(),
+        }
+
+
+gerador_derivados = GeradorDerivados(
+    blob_store,
+    tamanhos=settings.GALERIA_DERIVADOS_TAMANHOS,
+    max_workers=settings.GALERIA_DERIVADOS_WORKERS
+)
@@ -0,0 +1,46 @@
+"""
+Primitivas simples de métricas em memória
+
+Sem dependências externas: os valores são expostos em JSON pelo
+router /metrics e são locais a cada processo.
+"""
+from bisect import bisect_left
+from typing import Any, Dict, Sequence
+
+
+class Histogram:
+    """
+    Histograma cumulativo com limites fixos (em milissegundos)
+
+    Cada observação incrementa o primeiro bucket cujo limite é >= valor;
+    valores acima do último limite caem no bucket "+Inf".
+    """
+
+    def __init__(self, buckets_ms: Sequence[float]):
+        self.buckets_ms = sorted(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self._counts[bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {}
+        acumulado = 0
+        for limite, qtd in zip(self.buckets_ms, self._counts):
+            acumulado += qtd
+            buckets[f"le_{limite:g}ms"] = acumulado
+        buckets["le_inf"] = acumulado + self._counts[-1]
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets,
+        }
@@ -0,0 +1,336 @@
+"""
+Paginação por cursor (keyset) com compatibilidade com offset
+
+OFFSET obriga o banco a ler e descartar todas as linhas anteriores à
+página, então páginas profundas ficam cada vez mais lentas. No modo
+cursor a próxima página começa logo após a última linha da anterior
+(WHERE (chaves) < (valores da última linha)), usando o índice das
+chaves de ordenação, com custo constante em qualquer profundidade.
+
+Uso nos routers:
+
+    pagina = Paginacao(
+        [(Noticia.data, True), (Noticia.id_noticia, True)],  # (coluna, desc)
+        limit=limit, offset=offset, cursor=cursor
+    )
+    result = await session.execute(pagina.aplicar(query))
+    noticias, next_cursor = pagina.resultado(result.scalars().all())
+
+Sem `cursor` a consulta usa OFFSET como antes; em ambos os modos a
+resposta traz `next_cursor` para continuar pelo modo keyset.
+A última chave deve ser única (normalmente a chave primária).
+
+O campo `total` das listagens segue o parâmetro `total` (ModoTotal):
+
+- exact: contagem exata; sem cursor vem na própria consulta da página
+  (count(*) OVER()), sem uma segunda ida ao banco
+- cached: COUNT guardado em memória por filtro, invalidado quando
+  alguma das tabelas da contagem recebe escrita (neste processo)
+- estimate: estimativa do planejador do PostgreSQL (EXPLAIN)
+- none: não conta (total = None)
+
+Com `executar` o router passa a consulta filtrada e a consulta de
+contagem equivalente:
+
+    linhas, total, next_cursor = await pagina.executar(session, query, count_query)
+"""
+import base64
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.util import find_tables
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database.session import on_table_write
+
+
+class ModoTotal(str, Enum):
+    """Estratégia de cálculo do `total` das listagens"""
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+# ==================== CACHE DE CONTAGENS ====================
+
+contagem_cache = TTLCache(
+    max_size=settings.COUNT_CACHE_MAX_SIZE,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
+# Geração de cada tabela: incrementada a cada commit que a altera.
+# Faz parte da chave do cache, então contagens antigas deixam de ser
+# encontradas e saem pelo LRU/TTL.
+_geracoes: Dict[str, int] = defaultdict(int)
+
+
+@on_table_write
+def _invalidar_contagens(tabelas: Set[str]) -> None:
+    for tabela in tabelas:
+        _geracoes[tabela] += 1
+
+
+def _chave_contagem(count_query) -> Tuple:
+    compilado = count_query.compile()
+    tabelas = sorted({t.name for t in find_tables(count_query, include_joins=True) if hasattr(t, "name")})
+    return (
+        tuple((tabela, _geracoes[tabela]) for tabela in tabelas),
+        str(compilado),
+        repr(sorted(compilado.params.items())),
+    )
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if hasattr(valor, "value"):  # Enum
+        return valor.value
+    return valor
+
+
+def _desserializar(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+    return valor
+
+
+def encode_cursor(valores: Sequence[Any]) -> str:
+    """Codifica os valores das chaves da última linha num cursor opaco"""
+    dados = json.dumps([_serializar(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(dados.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _converter(valor: Any, tipo: Optional[type]) -> Any:
+    """
+    Confere `valor` com o tipo Python da coluna-chave
+
+    Raises:
+        ValueError: valor de outro tipo (ex.: texto numa chave inteira)
+    """
+    if tipo is None:
+        return valor
+    if valor is None:
+        raise ValueError("chave nula")
+    if issubclass(tipo, Enum):
+        return tipo(valor)
+    if tipo is datetime:
+        aceito = isinstance(valor, datetime)
+    elif tipo is date:
+        # datetime é subclasse de date: {"dt": ...} numa coluna de data não vale
+        aceito = isinstance(valor, date) and not isinstance(valor, datetime)
+    elif tipo is float:
+        aceito = isinstance(valor, (int, float)) and not isinstance(valor, bool)
+        valor = float(valor) if aceito else valor
+    elif tipo is int:
+        aceito = isinstance(valor, int) and not isinstance(valor, bool)
+    else:
+        aceito = isinstance(valor, tipo)
+    if not aceito:
+        raise ValueError(f"esperado {tipo.__name__}, recebido {type(valor).__name__}")
+    return valor
+
+
+def _tipo_python(coluna: Any) -> Optional[type]:
+    try:
+        return coluna.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def decode_cursor(
+    cursor: str,
+    quantidade: int,
+    tipos: Optional[Sequence[Optional[type]]] = None
+) -> List[Any]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`
+
+    - tipos: tipo Python de cada chave; valores de outro tipo (cursor
+      adulterado ou de outro endpoint) são rejeitados aqui, em vez de
+      chegarem ao banco e virarem erro 500
+
+    Raises:
+        HTTPException 400: cursor malformado ou de outro endpoint
+    """
+    try:
+        dados = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = [_desserializar(v) for v in json.loads(dados)]
+        if tipos is not None and len(valores) == len(tipos):
+            valores = [_converter(v, tipo) for v, tipo in zip(valores, tipos)]
+    except (ValueError, TypeError):
+        valores = None
+
+    if not isinstance(valores, list) or len(valores) != quantidade:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+    return valores
+
+
+class Paginacao:
+    """
+    Paginação de uma listagem por offset ou por cursor
+
+    - chaves: [(coluna, descendente)] na ordem do ORDER BY
+    - cursor: quando informado, ignora `offset` e usa keyset
+    - total: estratégia de contagem usada por `executar`
+    """
+
+    def __init__(
+        self,
+        chaves: Sequence[Tuple[Any, bool]],
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        total: ModoTotal = ModoTotal.EXACT
+    ):
+        self.chaves = list(chaves)
+        self.limit = limit
+        self.offset = offset
+        self.cursor = cursor
+        self.modo_total = total
+
+    def _depois_de(self, valores: List[Any]):
+        """Condição 'linha vem depois de `valores`' na ordem das chaves"""
+        colunas = [coluna for coluna, _ in self.chaves]
+        direcoes = {desc for _, desc in self.chaves}
+
+        # Mesma direção em todas as chaves: comparação de tupla (usa o índice composto)
+        if len(direcoes) == 1:
+            if direcoes.pop():
+                return tuple_(*colunas) < tuple_(*valores)
+            return tuple_(*colunas) > tuple_(*valores)
+
+        # Direções mistas: (a > x) OR (a = x AND b < y) OR ...
+        condicoes = []
+        for i, (coluna, desc) in enumerate(self.chaves):
+            anteriores = [c == v for c, v in zip(colunas[:i], valores[:i])]
+            comparacao = coluna < valores[i] if desc else coluna > valores[i]
+            condicoes.append(and_(*anteriores, comparacao))
+        return or_(*condicoes)
+
+    def aplicar(self, query):
+        """Aplica filtro do cursor (ou OFFSET), ORDER BY e LIMIT + 1"""
+        if self.cursor:
+            tipos = [_tipo_python(coluna) for coluna, _ in self.chaves]
+            valores = decode_cursor(self.cursor, len(self.chaves), tipos)
+            query = query.where(self._depois_de(valores))
+        elif self.offset:
+            query = query.offset(self.offset)
+
+        ordem = [coluna.desc() if desc else coluna for coluna, desc in self.chaves]
+        # Uma linha a mais indica se existe próxima página
+        return query.order_by(*ordem).limit(self.limit + 1)
+
+    def resultado(
+        self,
+        linhas: Sequence[Any],
+        entidade: Callable[[Any], Any] = lambda linha: linha
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Corta a linha extra e gera o `next_cursor`
+
+        `entidade` extrai o objeto com as colunas-chave de cada linha
+        (para consultas que retornam tuplas, ex.: lambda row: row[0]).
+        """
+        linhas = list(linhas)
+        if len(linhas) <= self.limit:
+            return linhas, None
+
+        linhas = linhas[:self.limit]
+        ultima = entidade(linhas[-1])
+        return linhas, encode_cursor([getattr(ultima, coluna.key) for coluna, _ in self.chaves])
+
+    async def executar(
+        self,
+        session: AsyncSession,
+        query,
+        count_query,
+        escalar: bool = True,
+        entidade: Callable[[Any], Any] = lambda linha: linha
+    ) -> Tuple[List[Any], Optional[int], Optional[str]]:
+        """
+        Executa a página e calcula o total conforme `modo_total`
+
+        - query: consulta filtrada, sem ORDER BY/LIMIT
+        - count_query: select(func.count()) com os mesmos filtros
+        - escalar: a consulta seleciona uma única entidade (retorna os
+          objetos); senão retorna as tuplas de colunas
+
+        Returns:
+            (linhas, total, next_cursor)
+        """
+        # exact sem cursor: total na mesma consulta (janela antes do LIMIT)
+        janela = self.modo_total == ModoTotal.EXACT and not self.cursor
+        consulta = query.add_columns(func.count().over().label("total_janela")) if janela else query
+
+        result = await session.execute(self.aplicar(consulta))
+        linhas = result.all()
+
+        total = None
+        if janela:
+            if linhas:
+                total = linhas[0][-1]
+                linhas = [linha[:-1] for linha in linhas]
+            elif not self.offset:
+                total = 0
+            else:
+                # Offset além do fim: a janela não trouxe linhas
+                total = await _contar(session, count_query)
+        else:
+            total = await self._total(session, query, count_query)
+
+        if escalar:
+            linhas = [linha[0] for linha in linhas]
+
+        linhas, next_cursor = self.resultado(linhas, entidade)
+        return linhas, total, next_cursor
+
+    async def _total(self, session: AsyncSession, query, count_query) -> Optional[int]:
+        if self.modo_total == ModoTotal.NONE:
+            return None
+
+        if self.modo_total == ModoTotal.CACHED:
+            chave = _chave_contagem(count_query)
+            total = contagem_cache.get(chave)
+            if total is None:
+                total = await _contar(session, count_query)
+                contagem_cache.set(chave, total)
+            return total
+
+        if self.modo_total == ModoTotal.ESTIMATE and session.bind.dialect.name == "postgresql":
+            return await _estimar(session, query)
+
+        # exact com cursor (a janela contaria só as linhas após o cursor)
+        # e estimate fora do PostgreSQL
+        return await _contar(session, count_query)
+
+
+async def _contar(session: AsyncSession, count_query) -> int:
+    result = await session.execute(count_query)
+    return result.scalar()
+
+
+async def _estimar(session: AsyncSession, query) -> int:
+    """Número de linhas estimado pelo planejador (EXPLAIN, sem executar)"""
+    conn = await session.connection()
+    compilado = query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compilado}")
+    plano = result.scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]["Plan"]["Plan Rows"])
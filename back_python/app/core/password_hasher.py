@@ -0,0 +1,169 @@
+"""
+Serviço assíncrono de hash de senhas
+
+bcrypt consome ~200 ms de CPU por chamada. Executado direto num handler
+async, congela o event loop e trava todas as outras requisições.
+Este módulo envia as chamadas para um pool de threads (bcrypt libera
+o GIL) ou de processos, com fila limitada e controle de admissão:
+quando o pool está saturado a requisição recebe 503 + Retry-After
+em vez de acumular latência indefinidamente.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+
+def _timed_call(fn: Callable, *args: Any) -> Tuple[Any, float]:
+    """Executa `fn` no worker e retorna (resultado, tempo de CPU em ms)"""
+    inicio = time.perf_counter()
+    resultado = fn(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+class PasswordHasher:
+    """
+    Pool limitado para operações de hash
+
+    - executor: "thread" ou "process"
+    - max_workers: tamanho do pool
+    - max_queue: quantas chamadas podem aguardar além das que estão executando
+    - retry_after: valor (segundos) do header Retry-After quando saturado
+    """
+
+    def __init__(
+        self,
+        executor: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 32,
+        retry_after: int = 2
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError("PASSWORD_HASH_EXECUTOR deve ser 'thread' ou 'process'")
+
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+
+        # Chamadas submetidas e ainda não concluídas (executando + na fila)
+        self._in_flight = 0
+        self.max_in_flight_seen = 0
+        self.completed = 0
+        self.rejected = 0
+
+        buckets = [10, 50, 100, 200, 300, 500, 1000, 2000, 5000]
+        self.latency = Histogram(buckets)     # tempo total (fila + CPU)
+        self.queue_wait = Histogram(buckets)  # tempo aguardando um worker
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def queue_depth(self) -> int:
+        """Chamadas aguardando um worker livre"""
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                # spawn: não herda (via fork) o event loop, threads e
+                # conexões do processo do servidor
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Executa `fn(*args)` no pool
+
+        Raises:
+            HTTPException 503: se a fila estiver cheia
+        """
+        if self._in_flight >= self.capacity:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado processando autenticações. Tente novamente em instantes.",
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+        return await self._execute(fn, *args)
+
+    async def run_many(self, fn: Callable, argumentos: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """
+        Executa `fn(*args)` para cada tupla de `argumentos`, em paralelo
+
+        Para operações em lote: em vez de rejeitar quando o pool está
+        cheio, aguarda vagas. No máximo `max_workers` chamadas do lote
+        ficam no pool ao mesmo tempo, deixando a fila livre para os
+        logins interativos. Os resultados seguem a ordem de `argumentos`.
+        """
+        vagas = asyncio.Semaphore(self.max_workers)
+
+        async def executar(args: Tuple[Any, ...]) -> Any:
+            async with vagas:
+                return await self._execute(fn, *args)
+
+        return await asyncio.gather(*(executar(args) for args in argumentos))
+
+    async def _execute(self, fn: Callable, *args: Any) -> Any:
+        self._in_flight += 1
+        self.max_in_flight_seen = max(self.max_in_flight_seen, self._in_flight)
+        inicio = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            resultado, cpu_ms = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        total_ms = (time.perf_counter() - inicio) * 1000
+        self.completed += 1
+        self.latency.observe(total_ms)
+        self.queue_wait.observe(max(0.0, total_ms - cpu_ms))
+        return resultado
+
+    def shutdown(self) -> None:
+        """Encerra o pool (chamado no shutdown da aplicação)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_in_flight_seen": self.max_in_flight_seen,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot(),
+            "queue_wait": self.queue_wait.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS
+)
@@ -0,0 +1,267 @@
+"""
+Limitador de tentativas de login/cadastro (proteção de CPU)
+
+/auth/login e /auth/signup executam bcrypt (~200 ms de CPU) para
+qualquer chamador. Uma rajada de credential stuffing esgota a CPU e o
+pool de hash. Este módulo rejeita a requisição com 429 + Retry-After
+ANTES do bcrypt, limitando tentativas por e-mail e por IP.
+
+Algoritmo: janela deslizante aproximada por duas janelas fixas
+(anterior e atual). A estimativa é
+
+    anterior * (1 - fração decorrida da janela atual) + atual
+
+o que dispensa guardar o horário de cada tentativa.
+
+Backends:
+- "memory": por processo; cada chave ocupa um único inteiro empacotado
+  (janela, anterior, atual). Chaves ociosas são compactadas
+  periodicamente.
+- "database": compartilhado entre workers, usando a tabela
+  `tentativas_login` com upsert atômico (PostgreSQL ou SQLite).
+"""
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.database.session import async_session
+from app.models.tentativa_login import TentativaLogin
+
+
+# Contadores empacotados num inteiro: janela (bits altos) | anterior (16) | atual (16)
+_BITS = 16
+_MASK = (1 << _BITS) - 1
+
+
+def _pack(janela: int, anterior: int, atual: int) -> int:
+    return (janela << (2 * _BITS)) | (min(anterior, _MASK) << _BITS) | min(atual, _MASK)
+
+
+def _unpack(valor: int) -> Tuple[int, int, int]:
+    return valor >> (2 * _BITS), (valor >> _BITS) & _MASK, valor & _MASK
+
+
+# ==================== BACKENDS ====================
+
+class MemoryBackend:
+    """Contadores em memória do processo"""
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._counters: Dict[str, int] = {}
+        self._compacted_at = time.time()
+        self.compactions = 0
+
+    async def hit(self, chave: str, agora: float) -> Tuple[int, int]:
+        """Registra uma tentativa e retorna (anterior, atual)"""
+        janela = int(agora // self.window_seconds)
+        valor = self._counters.get(chave)
+
+        if valor is None:
+            anterior, atual = 0, 0
+        else:
+            janela_salva, anterior, atual = _unpack(valor)
+            if janela_salva == janela - 1:
+                anterior, atual = atual, 0
+            elif janela_salva != janela:
+                anterior, atual = 0, 0
+
+        atual += 1
+        self._counters[chave] = _pack(janela, anterior, atual)
+
+        if agora - self._compacted_at >= self.window_seconds:
+            await self.compact(agora)
+        return anterior, atual
+
+    async def compact(self, agora: float) -> None:
+        """Remove chaves sem tentativas nas duas últimas janelas"""
+        janela = int(agora // self.window_seconds)
+        self._counters = {
+            chave: valor
+            for chave, valor in self._counters.items()
+            if _unpack(valor)[0] >= janela - 1
+        }
+        self._compacted_at = agora
+        self.compactions += 1
+
+    def size(self) -> Optional[int]:
+        return len(self._counters)
+
+
+class DatabaseBackend:
+    """Contadores na tabela `tentativas_login` (compartilhados entre workers)"""
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._compacted_at = time.time()
+        self.compactions = 0
+
+    @staticmethod
+    def _insert(dialeto: str):
+        if dialeto == "postgresql":
+            return postgresql.insert(TentativaLogin)
+        if dialeto == "sqlite":
+            return sqlite.insert(TentativaLogin)
+        raise RuntimeError(f"Backend 'database' do limitador não suporta o dialeto {dialeto}")
+
+    async def hit(self, chave: str, agora: float) -> Tuple[int, int]:
+        janela = int(agora // self.window_seconds)
+
+        async with async_session() as session:
+            stmt = self._insert(session.bind.dialect.name).values(
+                chave=chave, janela=janela, contagem=1
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["chave", "janela"],
+                set_={"contagem": stmt.table.c.contagem + 1}
+            )
+            await session.execute(stmt)
+
+            result = await session.execute(
+                select(TentativaLogin.janela, TentativaLogin.contagem).where(
+                    TentativaLogin.chave == chave,
+                    TentativaLogin.janela >= janela - 1
+                )
+            )
+            contagens = dict(result.all())
+
+            if agora - self._compacted_at >= self.window_seconds:
+                await session.execute(
+                    delete(TentativaLogin).where(TentativaLogin.janela < janela - 1)
+                )
+                self._compacted_at = agora
+                self.compactions += 1
+
+            await session.commit()
+
+        return contagens.get(janela - 1, 0), contagens.get(janela, 0)
+
+    async def compact(self, agora: float) -> None:
+        janela = int(agora // self.window_seconds)
+        async with async_session() as session:
+            await session.execute(
+                delete(TentativaLogin).where(TentativaLogin.janela < janela - 1)
+            )
+            await session.commit()
+        self._compacted_at = agora
+        self.compactions += 1
+
+    def size(self) -> Optional[int]:
+        # Não consultado a cada /metrics para não gerar carga no banco
+        return None
+
+
+# ==================== LIMITADOR ====================
+
+class LoginRateLimiter:
+    """
+    Limites de tentativas por e-mail e por IP
+
+    - per_email: tentativas por janela para um mesmo e-mail
+    - per_ip: tentativas por janela vindas de um mesmo IP
+    """
+
+    def __init__(
+        self,
+        backend: str = "memory",
+        window_seconds: int = 60,
+        per_email: int = 5,
+        per_ip: int = 20,
+        trust_proxy: bool = False
+    ):
+        if backend == "memory":
+            self.backend = MemoryBackend(window_seconds)
+        elif backend == "database":
+            self.backend = DatabaseBackend(window_seconds)
+        else:
+            raise ValueError("LOGIN_RATE_LIMIT_BACKEND deve ser 'memory' ou 'database'")
+
+        self.backend_kind = backend
+        self.window_seconds = window_seconds
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.trust_proxy = trust_proxy
+
+        self.allowed = 0
+        self.rejected_email = 0
+        self.rejected_ip = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_email > 0 or self.per_ip > 0
+
+    def client_ip(self, request: Request) -> str:
+        """IP do cliente; com trust_proxy usa o primeiro X-Forwarded-For"""
+        if self.trust_proxy:
+            encaminhado = request.headers.get("x-forwarded-for")
+            if encaminhado:
+                return encaminhado.split(",")[0].strip()
+        return request.client.host if request.client else "desconhecido"
+
+    def _estimate(self, anterior: int, atual: int, agora: float) -> float:
+        decorrido = (agora % self.window_seconds) / self.window_seconds
+        return anterior * (1 - decorrido) + atual
+
+    def _rejeitar(self, agora: float) -> HTTPException:
+        # Ao fim da janela atual a contagem passa a "anterior" e começa a decair
+        retry_after = max(1, math.ceil(self.window_seconds - agora % self.window_seconds))
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas. Aguarde alguns instantes e tente novamente.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    async def check(self, request: Request, email: Optional[str], escopo: str = "login") -> None:
+        """
+        Registra a tentativa e rejeita se algum limite foi excedido
+
+        Raises:
+            HTTPException 429: limite por IP ou por e-mail excedido
+        """
+        if not self.enabled:
+            return
+
+        agora = time.time()
+
+        if self.per_ip > 0:
+            chave = f"{escopo}:ip:{self.client_ip(request)}"
+            anterior, atual = await self.backend.hit(chave, agora)
+            if self._estimate(anterior, atual, agora) > self.per_ip:
+                self.rejected_ip += 1
+                raise self._rejeitar(agora)
+
+        if self.per_email > 0 and email:
+            chave = f"{escopo}:email:{email.strip().lower()}"
+            anterior, atual = await self.backend.hit(chave, agora)
+            if self._estimate(anterior, atual, agora) > self.per_email:
+                self.rejected_email += 1
+                raise self._rejeitar(agora)
+
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend_kind,
+            "window_seconds": self.window_seconds,
+            "per_email": self.per_email,
+            "per_ip": self.per_ip,
+            "keys": self.backend.size(),
+            "compactions": self.backend.compactions,
+            "allowed": self.allowed,
+            "rejected_email": self.rejected_email,
+            "rejected_ip": self.rejected_ip,
+        }
+
+
+login_rate_limiter = LoginRateLimiter(
+    backend=settings.LOGIN_RATE_LIMIT_BACKEND,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    per_email=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+    trust_proxy=settings.TRUST_PROXY_HEADERS
+)
@@ -0,0 +1,283 @@
+"""
+Armazenamento de refresh tokens com rotação e detecção de reuso
+
+- Cada login cria uma família (claim "fam") e um refresh token (claim "jti")
+- /auth/refresh marca o jti como usado e emite outro da mesma família
+- Reapresentar um jti já usado revoga a família inteira (token vazado)
+- /auth/logout revoga a família atual
+
+A checagem de revogação no caminho quente (toda requisição autenticada
+e todo refresh) passa por um índice em memória: um Bloom filter descarta
+sem consulta ao banco o caso comum (família não revogada) e um conjunto
+exato resolve os falsos positivos. O índice é recarregado do banco
+periodicamente pela tarefa de manutenção, que também apaga os tokens
+expirados em lotes.
+"""
+import asyncio
+import hashlib
+import math
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database.session import async_session
+from app.models.refresh_token import RefreshToken
+
+
+# ==================== ÍNDICE DE REVOGAÇÃO ====================
+
+class BloomFilter:
+    """
+    Bloom filter sobre um bytearray
+
+    Dimensionado para `capacity` elementos com taxa de falso positivo
+    `error_rate`. Não suporta remoção: o índice reconstrói o filtro
+    quando purga entradas expiradas.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: h1 + i*h2 a partir de um único digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationIndex:
+    """
+    Famílias de refresh token revogadas e ainda não expiradas
+
+    `is_revoked` não toca o banco: Bloom filter para o caso negativo
+    e dicionário exato (família -> expiração) para confirmar positivos.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: Dict[str, float] = {}
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+
+    def revoke(self, familia: str, expira_em: float) -> None:
+        """Marca a família como revogada até `expira_em` (timestamp unix)"""
+        self._revoked[familia] = max(expira_em, self._revoked.get(familia, 0))
+        self._bloom.add(familia)
+
+    def is_revoked(self, familia: Optional[str]) -> bool:
+        if not familia:
+            return False
+
+        self.checks += 1
+        if familia not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+
+        expira_em = self._revoked.get(familia)
+        if expira_em is None or expira_em <= time.time():
+            self.false_positives += 1
+            return False
+        return True
+
+    def replace(self, revoked: Dict[str, float]) -> None:
+        """Substitui o conteúdo e reconstrói o Bloom filter"""
+        bloom = BloomFilter(max(self.capacity, len(revoked)), self.error_rate)
+        for familia in revoked:
+            bloom.add(familia)
+        self._revoked = revoked
+        self._bloom = bloom
+
+    def stats(self) -> dict:
+        return {
+            "revoked_families": len(self._revoked),
+            "bloom_bits": self._bloom.num_bits,
+            "bloom_hashes": self._bloom.num_hashes,
+            "checks": self.checks,
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_index = RevocationIndex(capacity=settings.REVOCATION_BLOOM_CAPACITY)
+
+
+def _timestamp(dt: datetime) -> float:
+    """Converte datetime UTC ingênuo (padrão dos models) em timestamp unix"""
+    return (dt - datetime(1970, 1, 1)).total_seconds()
+
+
+# ==================== OPERAÇÕES DO STORE ====================
+
+def _refresh_invalido_exception(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def registrar_refresh_token(
+    session: AsyncSession,
+    user_id: int,
+    familia: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Registra um novo refresh token na sessão (o chamador faz o commit)
+
+    Returns:
+        (jti, familia) a serem embutidos no JWT
+    """
+    jti = uuid.uuid4().hex
+    familia = familia or uuid.uuid4().hex
+    session.add(RefreshToken(
+        jti=jti,
+        familia=familia,
+        id_usuario=user_id,
+        expira_em=datetime.utcnow() + timedelta(hours=settings.REFRESH_TOKEN_EXPIRE_HOURS)
+    ))
+    return jti, familia
+
+
+async def revogar_familia(session: AsyncSession, familia: str) -> None:
+    """Revoga todos os tokens da família (banco + índice em memória) e faz commit"""
+    agora = datetime.utcnow()
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.familia == familia, RefreshToken.revogado_em.is_(None))
+        .values(revogado_em=agora)
+    )
+    result = await session.execute(
+        select(func.max(RefreshToken.expira_em)).where(RefreshToken.familia == familia)
+    )
+    expira_em = result.scalar() or (agora + timedelta(hours=settings.REFRESH_TOKEN_EXPIRE_HOURS))
+    await session.commit()
+
+    revocation_index.revoke(familia, _timestamp(expira_em))
+
+
+async def rotacionar_refresh_token(session: AsyncSession, jti: str, familia: str) -> None:
+    """
+    Marca o refresh token como usado, garantindo uso único
+
+    Um único UPDATE condicional faz a checagem e a marcação. Se nenhuma
+    linha for afetada o token já foi usado (reuso: revoga a família),
+    foi revogado ou não existe.
+
+    Raises:
+        HTTPException 401: token reutilizado, revogado ou desconhecido
+    """
+    # Caminho rápido: família já revogada, sem consulta ao banco
+    if revocation_index.is_revoked(familia):
+        raise _refresh_invalido_exception("Sessão encerrada. Faça login novamente.")
+
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.familia == familia,
+            RefreshToken.usado_em.is_(None),
+            RefreshToken.revogado_em.is_(None)
+        )
+        .values(usado_em=datetime.utcnow())
+    )
+    if result.rowcount == 1:
+        return
+
+    result = await session.execute(
+        select(RefreshToken.usado_em).where(RefreshToken.jti == jti)
+    )
+    usado_em = result.scalar_one_or_none()
+    if usado_em is not None:
+        # Reuso de um token já rotacionado: provável vazamento
+        await revogar_familia(session, familia)
+        raise _refresh_invalido_exception(
+            "Refresh token reutilizado. Por segurança, a sessão foi encerrada."
+        )
+
+    raise _refresh_invalido_exception("Não foi possível validar o refresh token")
+
+
+# ==================== MANUTENÇÃO EM BACKGROUND ====================
+
+async def carregar_indice_revogacao(session: AsyncSession) -> None:
+    """Recarrega do banco as famílias revogadas e ainda não expiradas"""
+    result = await session.execute(
+        select(RefreshToken.familia, func.max(RefreshToken.expira_em))
+        .where(
+            RefreshToken.revogado_em.is_not(None),
+            RefreshToken.expira_em > datetime.utcnow()
+        )
+        .group_by(RefreshToken.familia)
+    )
+    revocation_index.replace({
+        familia: _timestamp(expira_em) for familia, expira_em in result.all()
+    })
+
+
+async def purgar_refresh_tokens_expirados(session: AsyncSession, batch_size: int) -> int:
+    """
+    Apaga refresh tokens expirados em lotes de `batch_size`
+
+    Lotes pequenos mantêm as transações curtas e evitam travar a tabela.
+    Returns:
+        Total de linhas apagadas
+    """
+    total = 0
+    while True:
+        lote = (
+            select(RefreshToken.jti)
+            .where(RefreshToken.expira_em < datetime.utcnow())
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            delete(RefreshToken).where(RefreshToken.jti.in_(lote))
+        )
+        await session.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+async def tarefa_manutencao_refresh_tokens() -> None:
+    """
+    Laço executado em background durante a vida da aplicação
+
+    A cada REFRESH_TOKEN_MAINTENANCE_SECONDS recarrega o índice de
+    revogação (propaga logouts feitos em outros workers) e purga os
+    tokens expirados.
+    """
+    while True:
+        try:
+            async with async_session() as session:
+                await carregar_indice_revogacao(session)
+                await purgar_refresh_tokens_expirados(
+                    session, settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Falha na manutenção de refresh tokens: {e}")
+
+        await asyncio.sleep(settings.REFRESH_TOKEN_MAINTENANCE_SECONDS)
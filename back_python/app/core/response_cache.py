@@ -0,0 +1,171 @@
+"""
+Cache de respostas das leituras de conteúdo público (notícias, galeria)
+
+Cada publicação é seguida de milhares de leituras idênticas das
+listagens e do detalhe. As respostas ficam em memória, com a chave
+formada pela rota e pelos parâmetros da consulta:
+
+- fresca (até RESPONSE_CACHE_TTL_SECONDS): devolvida direto
+- velha (até mais RESPONSE_CACHE_STALE_SECONDS): devolvida direto, e
+  uma única atualização roda em segundo plano (stale-while-revalidate)
+- ausente: a primeira requisição consulta o banco e as simultâneas
+  aguardam o mesmo resultado (uma consulta para N misses)
+
+Escritas invalidam na hora: cada commit que altera uma tabela
+incrementa a geração dela (on_table_write), que faz parte da chave.
+Depois de publicar, ninguém recebe a versão anterior no worker que fez
+a escrita. O cache é local ao processo: nos outros workers a resposta
+anterior pode ser servida por até TTL + STALE (a primeira requisição
+depois do TTL ainda recebe a velha). Com WEB_CONCURRENCY > 1 o STALE é
+limitado ao TTL, e o atraso máximo entre workers fica em 2 x TTL.
+
+As consultas que preenchem o cache vão sempre para o primário, mesmo
+quando a requisição usa a réplica: com atraso de replicação, uma
+consulta na réplica logo após a escrita guardaria as linhas anteriores
+sob a geração nova, e elas seriam servidas até o TTL. Só os misses
+(um por chave e geração) chegam ao primário.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database.session import engine, on_table_write
+
+# Consulta de uma resposta: recebe uma sessão própria (a da requisição
+# pode fechar antes de uma atualização em segundo plano terminar)
+Carregador = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class CacheRespostas:
+    """
+    Respostas em cache com coalescência de misses e stale-while-revalidate
+
+    - ttl: segundos em que a resposta é considerada fresca
+    - stale: segundos adicionais em que a resposta velha ainda é servida
+      enquanto é atualizada
+    - max_size: número máximo de respostas (0 desabilita o cache)
+    - processos: workers servindo a aplicação; com mais de um, `stale`
+      é limitado a `ttl` (escritas dos outros não invalidam este cache)
+    """
+
+    def __init__(self, ttl: float, stale: float, max_size: int, processos: int = 1):
+        self.ttl = ttl
+        self.stale = min(stale, ttl) if processos > 1 else stale
+        self._respostas = TTLCache(max_size=max_size, ttl=ttl + self.stale)
+        # Geração de cada tabela: incrementada a cada commit que a altera
+        self._geracoes: Dict[str, int] = defaultdict(int)
+        # Consulta em andamento por chave (misses e atualizações)
+        self._em_andamento: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refresh_errors = 0
+
+    def invalidar(self, tabelas: Set[str]) -> None:
+        """Descarta as respostas que dependem de `tabelas`"""
+        for tabela in tabelas:
+            self._geracoes[tabela] += 1
+
+    def _chave(self, chave: Hashable, tabelas: Sequence[str]) -> Tuple:
+        return (chave, tuple((tabela, self._geracoes[tabela]) for tabela in sorted(tabelas)))
+
+    async def _carregar(self, chave: Tuple, carregar: Carregador) -> Any:
+        # Primário: a réplica pode ainda não ter a escrita que gerou a geração atual
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            valor = await carregar(session)
+        self._respostas.set(chave, (time.monotonic(), valor))
+        return valor
+
+    def _tarefa(self, chave: Tuple, carregar: Carregador) -> asyncio.Task:
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.create_task(self._carregar(chave, carregar))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        else:
+            self.coalesced += 1
+        return tarefa
+
+    def _atualizar(self, chave: Tuple, carregar: Carregador) -> None:
+        if chave in self._em_andamento:
+            return
+
+        def _verificar(tarefa: asyncio.Task) -> None:
+            if not tarefa.cancelled() and tarefa.exception() is not None:
+                # A resposta velha continua sendo servida até expirar
+                self.refresh_errors += 1
+                print(f"⚠️  Falha ao atualizar resposta em cache {chave[0]}: {tarefa.exception()!r}")
+
+        self._tarefa(chave, carregar).add_done_callback(_verificar)
+
+    async def obter(
+        self,
+        chave: Hashable,
+        tabelas: Sequence[str],
+        session: AsyncSession,
+        carregar: Carregador
+    ) -> Any:
+        """
+        Resposta para `chave`, consultando o banco só quando necessário
+
+        - tabelas: tabelas lidas por `carregar` (escritas nelas invalidam)
+        - session: sessão da requisição, usada só com o cache desabilitado;
+          para preencher o cache `carregar` recebe uma nova, no primário
+        """
+        if not self._respostas.enabled:
+            return await carregar(session)
+
+        chave = self._chave(chave, tabelas)
+        entrada = self._respostas.get(chave)
+        if entrada is not None:
+            gerado_em, valor = entrada
+            if time.monotonic() - gerado_em < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._atualizar(chave, carregar)
+            return valor
+
+        self.misses += 1
+        # shield: a consulta termina (e preenche o cache) mesmo se o
+        # cliente que a iniciou desconectar
+        return await asyncio.shield(self._tarefa(chave, carregar))
+
+    def clear(self) -> None:
+        self._respostas.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._respostas),
+            "max_size": self._respostas.max_size,
+            "ttl_seconds": self.ttl,
+            "stale_seconds": self.stale,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_progress": len(self._em_andamento),
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": round((self.hits + self.stale_hits) / total, 4) if total else 0.0,
+        }
+
+
+cache_respostas = CacheRespostas(
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    stale=settings.RESPONSE_CACHE_STALE_SECONDS,
+    max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+    processos=settings.WEB_CONCURRENCY
+)
+
+
+@on_table_write
+def _invalidar_respostas(tabelas: Set[str]) -> None:
+    cache_respostas.invalidar(tabelas)
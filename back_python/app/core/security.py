@@ -4,8 +4,10 @@ Usando PyJWT para tokens simples e seguros
 Usando bcrypt diretamente para hash de senhas
 """
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any
-from fastapi import Depends, HTTPException, status
+from typing import Dict, Any, List, Optional
+import hashlib
+import time
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
@@ -13,8 +15,13 @@ import jwt
 import bcrypt
 
 from app.core.config import settings
+from app.core.cache import TTLCache
 from app.database.session import get_session
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.core.token_versions import token_versions, INATIVO
+from app.core.user_cache import get_cached_user, cache_user, invalidate_user
+from app.core.password_hasher import password_hasher
+from app.core.refresh_tokens import revocation_index
 
 
 # ==================== CONFIGURAÇÕES ====================
@@ -26,6 +33,11 @@ security = HTTPBearer(
 )
 
 
+# Cache de payloads já verificados, chaveado pelo SHA-256 do token
+# Cada entrada expira junto com o token (claim exp)
+jwt_decode_cache = TTLCache(max_size=settings.JWT_DECODE_CACHE_SIZE)
+
+
 # ==================== FUNÇÕES DE SENHA ====================
 
 def get_password_hash(password: str) -> str:
@@ -61,12 +73,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+async def get_password_hash_async(password: str) -> str:
+    """
+    Versão assíncrona de get_password_hash para uso nos handlers
+    Executa o bcrypt no pool de hash, sem bloquear o event loop
+    """
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def get_password_hashes_async(passwords: List[str]) -> List[str]:
+    """
+    Gera os hashes de várias senhas em paralelo no pool de hash
+    (cadastros em lote). Aguarda vagas no pool em vez de responder 503.
+    """
+    return await password_hasher.run_many(get_password_hash, [(p,) for p in passwords])
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versão assíncrona de verify_password para uso nos handlers
+    Executa o bcrypt no pool de hash, sem bloquear o event loop
+    """
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
 # ==================== FUNÇÕES JWT ====================
 
 def create_access_token(
     user_id: int,
     email: str,
-    perfil: str
+    perfil: str,
+    token_version: int = 0,
+    familia: Optional[str] = None
 ) -> str:
     """
     Cria um access token JWT com informações do usuário (scopes)
@@ -78,6 +116,8 @@ def create_access_token(
     - iat: Data/hora de criação (issued at)
     - exp: Data/hora de expiração
     - type: Tipo do token (access)
+    - ver: Versão de token do usuário (incrementada para revogar tokens)
+    - fam: Família do refresh token da sessão (revogada no logout)
     """
     now = datetime.now(timezone.utc)
     expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -92,8 +132,11 @@ def create_access_token(
         "perfil": perfil,               # Role/Perfil
         "iat": iat,                     # Issued at (unix timestamp)
         "exp": exp,                     # Expiration time (unix timestamp)
-        "type": "access"              # Tipo do token
+        "type": "access",             # Tipo do token
+        "ver": token_version            # Versão de token (revogação)
     }
+    if familia:
+        payload["fam"] = familia        # Sessão (família de refresh tokens)
 
     # Codifica o token usando PyJWT. Algumas versões retornam 'bytes'.
     token = jwt.encode(
@@ -109,9 +152,17 @@ def create_access_token(
     return token
 
 
-def create_refresh_token(user_id: int) -> str:
+def create_refresh_token(
+    user_id: int,
+    token_version: int = 0,
+    jti: Optional[str] = None,
+    familia: Optional[str] = None
+) -> str:
     """
-    Cria um refresh token JWT (apenas com ID do usuário)
+    Cria um refresh token JWT (apenas com ID e versão de token do usuário)
+    
+    jti e familia identificam o token no store de rotação
+    (ver app.core.refresh_tokens.registrar_refresh_token)
     """
     now = datetime.now(timezone.utc)
     # Usar horas para expiração do refresh token
@@ -124,8 +175,13 @@ def create_refresh_token(user_id: int) -> str:
         "sub": str(user_id),
         "iat": iat,
         "exp": exp,
-        "type": "refresh"
+        "type": "refresh",
+        "ver": token_version
     }
+    if jti:
+        payload["jti"] = jti
+    if familia:
+        payload["fam"] = familia
 
     token = jwt.encode(
         payload,
@@ -143,9 +199,19 @@ def decode_token(token: str) -> Dict[str, Any]:
     """
     Decodifica e valida um token JWT
     
+    Tokens já verificados ficam num cache LRU (jwt_decode_cache) até o
+    seu exp, evitando repetir a verificação HMAC e o parse do JSON a
+    cada requisição com o mesmo access token.
+    
     Raises:
         HTTPException: Se o token for inválido ou expirado
     """
+    chave = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = jwt_decode_cache.get(chave)
+    if payload is not None:
+        # Cópia para que o chamador não altere a entrada do cache
+        return dict(payload)
+    
     try:
         # Decodifica e valida o token; PyJWT lançará exceções específicas em caso de
         # token expirado ou inválido.
@@ -154,7 +220,13 @@ def decode_token(token: str) -> Dict[str, Any]:
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        return payload
+        
+        # Só tokens válidos entram no cache, e apenas até expirarem
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            jwt_decode_cache.set(chave, payload, ttl=exp - time.time())
+        
+        return dict(payload)
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -174,7 +246,67 @@ def decode_token(token: str) -> Dict[str, Any]:
 
 # ==================== DEPENDÊNCIAS DE AUTENTICAÇÃO ====================
 
+def _token_revogado_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token revogado. Faça login novamente.",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def _load_user(session: AsyncSession, user_id: int) -> User:
+    """
+    Carrega o usuário do cache em memória ou, em caso de miss, do banco
+    
+    O cache é por processo: um acerto é conferido contra o mapa de
+    versões de token, que enxerga trocas de senha e desativações feitas
+    em outros workers (ver app/core/user_cache.py).
+    """
+    user = get_cached_user(user_id)
+    if user is not None:
+        versao_atual = await token_versions.get(session, user_id)
+        if versao_atual != (user.token_version if user.ativo else INATIVO):
+            invalidate_user(user_id)
+            user = None
+    
+    if user is None:
+        statement = select(User).where(User.id == user_id)
+        result = await session.execute(statement)
+        user = result.scalar_one_or_none()
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuário não encontrado.",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        
+        cache_user(user)
+        # A linha acabou de ser lida: evita a busca pontual no próximo acerto
+        token_versions.set(user.id, user.token_version, user.ativo)
+    
+    return user
+
+
+def _user_from_claims(payload: Dict[str, Any]) -> User:
+    """
+    Monta um User (não persistido) apenas com as claims do token
+    
+    Usado no modo AUTH_CLAIMS_ONLY. Contém somente id, email, perfil e
+    token_version; campos como cpf e criado_em não vêm do banco.
+    """
+    return User(
+        id=int(payload["sub"]),
+        email=payload.get("email", ""),
+        perfil=UserRole(payload["perfil"]),
+        token_version=payload.get("ver", 0),
+        senha_hash="",
+        ativo=True
+    )
+
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session)
 ) -> User:
@@ -184,9 +316,15 @@ async def get_current_user(
     Fluxo:
     1. Extrai o token do header Authorization: Bearer <token>
     2. Decodifica e valida o token
-    3. Busca o usuário no banco de dados
-    4. Verifica se o usuário está ativo
-    5. Retorna o objeto User completo
+    3. Busca o usuário no cache em memória ou, em caso de miss, no banco
+    4. Verifica se o usuário está ativo e se o token não foi revogado
+    5. Registra o ID em request.state.id_usuario (roteamento das leituras)
+    6. Retorna o objeto User completo
+    
+    Com AUTH_CLAIMS_ONLY=True os passos 3 e 4 usam apenas as claims do
+    token e o mapa de versões em memória (sem consultar `usuarios`);
+    o User retornado contém só id, email, perfil e token_version.
+    Use get_current_user_full quando precisar da linha completa.
     """
     # Extrai o token do header
     token = credentials.credentials
@@ -211,18 +349,42 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Busca o usuário no banco
-    statement = select(User).where(User.id == int(user_id))
-    result = await session.execute(statement)
-    user = result.scalar_one_or_none()
+    token_version = payload.get("ver", 0)
     
-    if not user:
+    # Sessão encerrada por logout ou reuso de refresh token (checagem em memória)
+    if revocation_index.is_revoked(payload.get("fam")):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuário não encontrado.",
+            detail="Sessão encerrada. Faça login novamente.",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    # Modo claims-only: confia em sub/perfil do token e só confere a versão
+    if settings.AUTH_CLAIMS_ONLY and payload.get("perfil"):
+        versao_atual = await token_versions.get(session, int(user_id))
+        
+        if versao_atual is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuário não encontrado.",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        
+        if versao_atual == INATIVO:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário inativo. Entre em contato com o administrador."
+            )
+        
+        if versao_atual != token_version:
+            raise _token_revogado_exception()
+        
+        request.state.id_usuario = int(user_id)
+        return _user_from_claims(payload)
+    
+    # Busca o usuário no cache; em caso de miss, consulta o banco
+    user = await _load_user(session, int(user_id))
+    
     # Verifica se o usuário está ativo
     if not user.ativo:
         raise HTTPException(
@@ -230,9 +392,31 @@ async def get_current_user(
             detail="Usuário inativo. Entre em contato com o administrador."
         )
     
+    # Verifica se o token não foi revogado (troca de senha, desativação)
+    if user.token_version != token_version:
+        raise _token_revogado_exception()
+    
+    request.state.id_usuario = user.id
     return user
 
 
+async def get_current_user_full(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+) -> User:
+    """
+    Dependência que garante a linha completa do usuário
+    
+    Idêntica a get_current_user no modo padrão. No modo AUTH_CLAIMS_ONLY
+    carrega o usuário (cache ou banco) para rotas que precisam de campos
+    que não estão no token (cpf, criado_em, senha_hash...).
+    """
+    if not settings.AUTH_CLAIMS_ONLY:
+        return current_user
+    
+    return await _load_user(session, current_user.id)
+
+
 async def get_current_active_admin(
     current_user: User = Depends(get_current_user)
 ) -> User:
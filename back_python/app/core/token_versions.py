@@ -0,0 +1,107 @@
+"""
+Mapa em memória de versões de token por usuário
+
+Cada usuário tem uma coluna `token_version` que é embutida nos tokens
+(claim "ver"). Incrementar a versão revoga todos os tokens emitidos antes.
+
+No modo AUTH_CLAIMS_ONLY, get_current_user não carrega a linha do usuário:
+confere apenas a claim "ver" contra este mapa. O mapa é um array de
+inteiros indexado pelo ID do usuário (4 bytes por usuário) e é recarregado
+por completo a cada TOKEN_VERSION_REFRESH_SECONDS, o que limita o atraso
+da revogação entre workers diferentes. Requisições que encontram o mapa
+vencido enquanto ele é recarregado aguardam a mesma recarga (uma única
+consulta por vez).
+"""
+import asyncio
+import time
+from array import array
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+
+
+# Valores especiais no array
+DESCONHECIDO = -2  # ID ainda não carregado (usuário criado após o último reload)
+INATIVO = -1       # Usuário desativado (soft delete)
+
+
+class TokenVersionMap:
+    """Versão atual de token de cada usuário, indexada pelo ID"""
+
+    def __init__(self, refresh_seconds: int = 30):
+        self.refresh_seconds = refresh_seconds
+        self._versions = array("i")
+        self._loaded_at: Optional[float] = None
+        self._reload_lock = asyncio.Lock()
+        self.reloads = 0
+        self.point_loads = 0
+
+    def _ensure_size(self, user_id: int) -> None:
+        if user_id >= len(self._versions):
+            self._versions.extend([DESCONHECIDO] * (user_id + 1 - len(self._versions)))
+
+    def set(self, user_id: int, token_version: int, ativo: bool = True) -> None:
+        """Atualiza a versão local (chamar após alterar senha/ativo)"""
+        self._ensure_size(user_id)
+        self._versions[user_id] = token_version if ativo else INATIVO
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        )
+
+    async def reload(self, session: AsyncSession) -> None:
+        """Recarrega o mapa inteiro com uma única consulta"""
+        result = await session.execute(
+            select(User.id, User.token_version, User.ativo)
+        )
+        versions = array("i")
+        for user_id, token_version, ativo in result.all():
+            if user_id >= len(versions):
+                versions.extend([DESCONHECIDO] * (user_id + 1 - len(versions)))
+            versions[user_id] = token_version if ativo else INATIVO
+
+        self._versions = versions
+        self._loaded_at = time.monotonic()
+        self.reloads += 1
+
+    async def get(self, session: AsyncSession, user_id: int) -> Optional[int]:
+        """
+        Retorna a versão atual do usuário, INATIVO, ou None se não existir
+        """
+        if self._is_stale():
+            async with self._reload_lock:
+                # Outra requisição pode ter recarregado enquanto esta aguardava
+                if self._is_stale():
+                    await self.reload(session)
+
+        if user_id < len(self._versions) and self._versions[user_id] != DESCONHECIDO:
+            return self._versions[user_id]
+
+        # Usuário criado depois do último reload: busca pontual
+        self.point_loads += 1
+        result = await session.execute(
+            select(User.token_version, User.ativo).where(User.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        self.set(user_id, row.token_version, row.ativo)
+        return self._versions[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "users": sum(1 for v in self._versions if v != DESCONHECIDO),
+            "bytes": self._versions.itemsize * len(self._versions),
+            "reloads": self.reloads,
+            "point_loads": self.point_loads,
+        }
+
+
+token_versions = TokenVersionMap(refresh_seconds=settings.TOKEN_VERSION_REFRESH_SECONDS)
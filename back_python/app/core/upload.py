@@ -0,0 +1,249 @@
+"""
+Recebimento de uploads multipart/form-data em streaming
+
+O UploadFile do FastAPI só chega ao handler depois que o Starlette leu
+o corpo inteiro da requisição. Aqui o corpo é processado conforme chega
+(request.stream()): os bytes do arquivo vão para um temporário em
+blocos, com o SHA-256 e o tamanho calculados no caminho. O upload é
+recusado assim que:
+
+- o Content-Length declarado passa do limite (antes de ler o corpo) -> 413
+- os bytes recebidos passam do limite -> 413
+- os primeiros bytes não são de um formato de imagem aceito -> 415
+
+Uso nos routers:
+
+    async with receber_multipart(request, "arquivo", limite) as (campos, arquivo):
+        ...
+        await blob_store.salvar_arquivo(arquivo.caminho, arquivo.chave)
+
+O temporário é apagado ao sair do bloco se não tiver sido movido.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import multipart
+from multipart.multipart import parse_options_header
+from fastapi import HTTPException, Request, status
+
+from app.core.blob_store import blob_store, detectar_mime
+
+# Limite para a soma dos campos de texto do formulário
+LIMITE_CAMPOS = 64 * 1024
+# Bytes necessários para reconhecer o formato (ver detectar_mime)
+TAMANHO_CABECALHO = 16
+
+
+@dataclass
+class ArquivoRecebido:
+    """Arquivo do formulário já gravado num temporário"""
+    caminho: str
+    nome: Optional[str]
+    chave: str = ""  # SHA-256
+    tamanho: int = 0
+    mime: Optional[str] = None
+
+
+@dataclass
+class _Parte:
+    nome: str = ""
+    arquivo: Optional[str] = None  # filename, se for parte de arquivo
+    dados: bytearray = field(default_factory=bytearray)
+    disposicao: bytes = b""
+
+
+class _ReceptorMultipart:
+    """Callbacks do python-multipart; a E/S fica com receber_multipart"""
+
+    def __init__(self, campo_arquivo: str):
+        self.campo_arquivo = campo_arquivo
+        self.campos: Dict[str, str] = {}
+        self.tamanho_campos = 0
+        self.parte = _Parte()
+        self.parte_arquivo: Optional[_Parte] = None
+        self.nome_cabecalho = b""
+        self.valor_cabecalho = b""
+        # Blocos do arquivo recebidos no último write() do parser
+        self.blocos: List[bytes] = []
+        # Boundary final recebido (corpo truncado não chega a on_end)
+        self.concluido = False
+
+    def on_part_begin(self) -> None:
+        self.parte = _Parte()
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self.nome_cabecalho += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self.valor_cabecalho += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self.nome_cabecalho.lower() == b"content-disposition":
+            self.parte.disposicao = self.valor_cabecalho
+        self.nome_cabecalho = b""
+        self.valor_cabecalho = b""
+
+    def on_headers_finished(self) -> None:
+        _, opcoes = parse_options_header(self.parte.disposicao)
+        if b"name" not in opcoes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parte do formulário sem o campo 'name'"
+            )
+        self.parte.nome = opcoes[b"name"].decode("utf-8", "replace")
+        if b"filename" in opcoes:
+            if self.parte.nome != self.campo_arquivo or self.parte_arquivo is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Envie um único arquivo, no campo '{self.campo_arquivo}'"
+                )
+            self.parte.arquivo = opcoes[b"filename"].decode("utf-8", "replace")
+            self.parte_arquivo = self.parte
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self.parte.arquivo is not None:
+            self.blocos.append(data[start:end])
+            return
+
+        self.tamanho_campos += end - start
+        if self.tamanho_campos > LIMITE_CAMPOS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Campos do formulário muito grandes"
+            )
+        self.parte.dados += data[start:end]
+
+    def on_part_end(self) -> None:
+        if self.parte.arquivo is None:
+            self.campos[self.parte.nome] = self.parte.dados.decode("utf-8", "replace")
+
+    def on_end(self) -> None:
+        self.concluido = True
+
+    def callbacks(self) -> dict:
+        return {
+            nome: getattr(self, nome)
+            for nome in (
+                "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+                "on_headers_finished", "on_part_data", "on_part_end", "on_end",
+            )
+        }
+
+
+def _criar_temporario():
+    fd, caminho = tempfile.mkstemp(dir=blob_store.dir_temporario(), prefix=".upload-")
+    return caminho, os.fdopen(fd, "wb")
+
+
+def _gravar_blocos(arquivo, sha256, blocos: List[bytes]) -> None:
+    # Roda numa thread: hashlib libera o GIL em blocos grandes
+    for bloco in blocos:
+        sha256.update(bloco)
+        arquivo.write(bloco)
+
+
+@asynccontextmanager
+async def receber_multipart(
+    request: Request,
+    campo_arquivo: str,
+    limite: int
+) -> AsyncIterator[Tuple[Dict[str, str], Optional[ArquivoRecebido]]]:
+    """
+    Lê o formulário em streaming: (campos de texto, arquivo ou None)
+
+    Raises:
+        HTTPException 400: corpo não é multipart/form-data válido
+        HTTPException 413: arquivo acima de `limite` bytes
+        HTTPException 415: arquivo não é JPEG, PNG, GIF ou WEBP
+    """
+    tipo, parametros = parse_options_header(request.headers.get("content-type", ""))
+    if tipo != b"multipart/form-data" or b"boundary" not in parametros:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Envie o formulário como multipart/form-data"
+        )
+
+    declarado = request.headers.get("content-length")
+    if declarado and declarado.isdigit() and int(declarado) > limite + LIMITE_CAMPOS:
+        raise _muito_grande(limite)
+
+    receptor = _ReceptorMultipart(campo_arquivo)
+    parser = multipart.MultipartParser(parametros[b"boundary"], receptor.callbacks())
+
+    arquivo_recebido: Optional[ArquivoRecebido] = None
+    arquivo = None
+    sha256 = hashlib.sha256()
+    cabecalho = b""
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except multipart.exceptions.FormParserError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Formulário multipart malformado"
+                )
+            if not receptor.blocos:
+                continue
+
+            if arquivo is None:
+                caminho, arquivo = await asyncio.to_thread(_criar_temporario)
+                arquivo_recebido = ArquivoRecebido(caminho=caminho, nome=receptor.parte_arquivo.arquivo)
+
+            arquivo_recebido.tamanho += sum(len(bloco) for bloco in receptor.blocos)
+            if arquivo_recebido.tamanho > limite:
+                raise _muito_grande(limite)
+
+            if arquivo_recebido.mime is None and len(cabecalho) < TAMANHO_CABECALHO:
+                cabecalho += b"".join(receptor.blocos)[:TAMANHO_CABECALHO - len(cabecalho)]
+                if len(cabecalho) >= TAMANHO_CABECALHO:
+                    arquivo_recebido.mime = _validar_formato(cabecalho)
+
+            await asyncio.to_thread(_gravar_blocos, arquivo, sha256, receptor.blocos)
+            receptor.blocos = []
+
+        # finalize() não verifica o fim da mensagem (python-multipart)
+        parser.finalize()
+        if not receptor.concluido:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Formulário multipart malformado"
+            )
+
+        if arquivo is not None:
+            await asyncio.to_thread(arquivo.close)
+            arquivo_recebido.chave = sha256.hexdigest()
+            if arquivo_recebido.mime is None:
+                # Arquivo menor que o cabeçalho
+                arquivo_recebido.mime = _validar_formato(cabecalho)
+
+        yield receptor.campos, arquivo_recebido
+    finally:
+        if arquivo is not None:
+            if not arquivo.closed:
+                await asyncio.to_thread(arquivo.close)
+            if os.path.exists(arquivo_recebido.caminho):
+                await asyncio.to_thread(os.remove, arquivo_recebido.caminho)
+
+
+def _muito_grande(limite: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Arquivo maior que o limite de {limite / (1024 * 1024):.1f} MB"
+    )
+
+
+def _validar_formato(cabecalho: bytes) -> str:
+    mime = detectar_mime(cabecalho)
+    if mime is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Formato de imagem não suportado (aceitos: JPEG, PNG, GIF e WEBP)"
+        )
+    return mime
@@ -0,0 +1,48 @@
+"""
+Cache do usuário autenticado
+
+Evita o SELECT em `usuarios` a cada requisição autenticada.
+Guarda um snapshot (dict) da linha do usuário e devolve uma instância
+nova e desvinculada de sessão a cada acerto, para que nenhum handler
+compartilhe o mesmo objeto entre requisições.
+
+IMPORTANTE: todo código que altera um usuário (senha, ativo, vínculos)
+deve chamar `invalidate_user` após o commit.
+
+O cache é local ao processo, e `invalidate_user` só limpa o do worker
+que fez a alteração. Nos demais, cada acerto é conferido contra o mapa
+de versões de token (app/core/token_versions.py): troca de senha e
+desativação revogam o snapshot em até TOKEN_VERSION_REFRESH_SECONDS.
+Alterações que não mudam a versão (perfil, email, vínculos) podem
+levar até USER_CACHE_TTL_SECONDS para aparecer nos outros workers.
+"""
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def get_cached_user(user_id: int) -> Optional[User]:
+    """Retorna o usuário do cache ou None em caso de miss"""
+    data = user_cache.get(user_id)
+    if data is None:
+        return None
+    return User(**data)
+
+
+def cache_user(user: User) -> None:
+    """Armazena um snapshot do usuário carregado do banco"""
+    user_cache.set(user.id, user.model_dump())
+
+
+def invalidate_user(user_id: Optional[int]) -> None:
+    """Descarta o usuário do cache (chamar após alterações)"""
+    if user_id is not None:
+        user_cache.invalidate(user_id)
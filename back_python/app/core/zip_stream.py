@@ -0,0 +1,85 @@
+"""
+Arquivo ZIP gerado em streaming
+
+O ZIP é montado enquanto é enviado: cada entrada é copiada em blocos da
+origem para a resposta, e só os bytes já escritos e ainda não enviados
+ficam em memória (no máximo um bloco). O tamanho do álbum não altera o
+consumo de memória além de uma entrada por arquivo no diretório central.
+
+As entradas são gravadas sem compressão (ZIP_STORED): JPEG, PNG, GIF e
+WEBP já são comprimidos, e o deflate só gastaria CPU. Como a saída não
+permite seek, o zipfile grava o CRC e os tamanhos num data descriptor
+depois de cada entrada. Pelo mesmo motivo o formato do cabeçalho local
+(ZIP64 ou não) é decidido antes dos bytes: por isso cada entrada
+informa o seu tamanho, e as maiores que ZIP64_LIMIT (4 GiB) já abrem
+com ZIP64.
+"""
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterable, List, Tuple, Type
+
+
+@dataclass
+class EntradaZip:
+    """Arquivo do ZIP: `abrir()` devolve os `tamanho` bytes em blocos"""
+    nome: str
+    modificado_em: datetime
+    tamanho: int
+    abrir: Callable[[], AsyncIterator[bytes]]
+
+
+class _Saida:
+    """Destino do zipfile (sem tell/seek): acumula o que já foi escrito até ser enviado"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self) -> None:
+        pass
+
+    def colher(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+async def stream_zip(
+    entradas: Iterable[EntradaZip],
+    ignorar: Tuple[Type[BaseException], ...] = ()
+) -> AsyncIterator[bytes]:
+    """
+    Bytes do ZIP com `entradas`, na ordem dada
+
+    - ignorar: exceções que, levantadas antes do primeiro bloco de uma
+      entrada (ex.: arquivo inexistente), fazem a entrada ser omitida
+      em vez de interromper o download
+    """
+    saida = _Saida()
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_STORED) as arquivo_zip:
+        for entrada in entradas:
+            blocos = entrada.abrir()
+            try:
+                primeiro = await anext(blocos, b"")
+            except ignorar as e:
+                print(f"⚠️  {entrada.nome} omitido do ZIP: {e!r}")
+                continue
+
+            # Datas antes de 1980 não cabem no formato ZIP
+            data = max(entrada.modificado_em, datetime(1980, 1, 1))
+            info = zipfile.ZipInfo(entrada.nome, date_time=data.timetuple()[:6])
+            info.file_size = entrada.tamanho
+            zip64 = entrada.tamanho > zipfile.ZIP64_LIMIT
+            with arquivo_zip.open(info, "w", force_zip64=zip64) as destino:
+                destino.write(primeiro)
+                async for bloco in blocos:
+                    destino.write(bloco)
+                    if dados := saida.colher():
+                        yield dados
+            if dados := saida.colher():
+                yield dados
+    yield saida.colher()
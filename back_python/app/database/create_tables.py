@@ -11,7 +11,8 @@ from app.database.session import engine
 from app.models import (
     User, UserRole,
     Aluno, Professor, Disciplina, Turma, AlunoTurma,
-    Noticia, Evento, Galeria, Calendario
+    Noticia, Evento, Galeria, Blob, Calendario,
+    RefreshToken, TentativaLogin
 )
 
 
@@ -35,7 +36,10 @@ async def create_tables():
     print("  - noticias")
     print("  - eventos")
     print("  - galeria")
+    print("  - blobs")
     print("  - calendario")
+    print("  - refresh_tokens")
+    print("  - tentativas_login")
 
 
 if __name__ == "__main__":
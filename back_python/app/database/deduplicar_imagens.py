@@ -0,0 +1,186 @@
+"""
+Deduplicação das imagens da galeria e limpeza do blob store
+
+Job de execução única (ou periódica, fora do horário de pico):
+
+1. Migra para o blob store as imagens ainda na coluna BYTEA
+   (migrar_imagens). Linhas com o mesmo conteúdo passam a apontar para
+   um único arquivo
+2. Recalcula `blobs.referencias` a partir da galeria (linhas não
+   excluídas por chave), registrando imagens anteriores à tabela
+   `blobs` e corrigindo contadores divergentes
+3. Remove do blob store, com os derivados, os blobs sem referências
+   há mais de --carencia-horas (o soft delete só zera o contador). Os
+   uploads registram o blob antes de gravar o arquivo, então um upload
+   cuja transação falhou também é limpo aqui
+
+O relatório mostra os bytes retirados do banco, a economia pelo
+compartilhamento (cópias que deixaram de ser guardadas) e os bytes
+liberados no blob store.
+
+Uso:
+    python -m app.database.deduplicar_imagens [--lote 20] [--carencia-horas 24]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+from sqlalchemy import case, delete, func, select, update
+
+from app.core.blob_store import BlobNaoEncontrado, blob_store
+from app.core.derivados import gerador_derivados
+from app.database.migrar_imagens import migrar_imagens
+from app.database.session import async_session, engine
+from app.models.blob import Blob
+from app.models.galeria import Galeria
+
+
+def _mib(total: int) -> str:
+    return f"{total / 1024 / 1024:.1f} MiB"
+
+
+async def recontar_referencias() -> Tuple[int, int, int]:
+    """
+    Ajusta `blobs.referencias` às linhas da galeria
+
+    Returns:
+        (contadores corrigidos, linhas que compartilham conteúdo,
+         bytes economizados pelo compartilhamento)
+    """
+    ativas = func.sum(case((Galeria.is_deleted == False, 1), else_=0))
+    corrigidos = 0
+    compartilhadas = 0
+    economia = 0
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(
+                Galeria.imagem_chave, ativas,
+                func.max(Galeria.imagem_tamanho), func.max(Galeria.imagem_mime)
+            )
+            .where(Galeria.imagem_chave.is_not(None))
+            .group_by(Galeria.imagem_chave)
+        )
+        # Uma entrada por conteúdo distinto (sem bytes)
+        contagens: Dict[str, Tuple[int, int, str]] = {
+            chave: (int(referencias or 0), tamanho or 0, mime)
+            for chave, referencias, tamanho, mime in result.all()
+        }
+
+        result = await session.execute(select(Blob.chave, Blob.referencias))
+        existentes = dict(result.all())
+        agora = datetime.utcnow()
+
+        for chave, (referencias, tamanho, mime) in contagens.items():
+            if referencias > 1:
+                compartilhadas += referencias
+                economia += (referencias - 1) * tamanho
+
+            if chave not in existentes:
+                session.add(Blob(chave=chave, tamanho=tamanho, mime=mime, referencias=referencias))
+                corrigidos += 1
+            elif existentes[chave] != referencias:
+                await session.execute(
+                    update(Blob).where(Blob.chave == chave)
+                    .values(referencias=referencias, atualizado_em=agora)
+                )
+                corrigidos += 1
+
+        # Blobs sem nenhuma linha na galeria
+        for chave in existentes.keys() - contagens.keys():
+            if existentes[chave] != 0:
+                await session.execute(
+                    update(Blob).where(Blob.chave == chave)
+                    .values(referencias=0, atualizado_em=agora)
+                )
+                corrigidos += 1
+
+        await session.commit()
+
+    return corrigidos, compartilhadas, economia
+
+
+async def _remover_arquivos(chave: str) -> int:
+    """Remove o blob e seus derivados; retorna os bytes liberados"""
+    liberados = 0
+    for arquivo in [chave, *gerador_derivados.chaves(chave)]:
+        try:
+            liberados += await blob_store.tamanho(arquivo)
+        except BlobNaoEncontrado:
+            continue
+        await blob_store.remover(arquivo)
+    return liberados
+
+
+async def remover_sem_referencias(carencia_horas: float) -> Tuple[int, int]:
+    """
+    Remove blobs com zero referências desde antes da carência
+
+    Returns:
+        (blobs removidos, bytes liberados)
+    """
+    limite = datetime.utcnow() - timedelta(hours=carencia_horas)
+    removidos = 0
+    liberados = 0
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(Blob.chave).where(Blob.referencias == 0, Blob.atualizado_em < limite)
+        )
+        candidatos = result.scalars().all()
+
+        for chave in candidatos:
+            # A condição é repetida no DELETE: um upload do mesmo conteúdo
+            # entre a consulta e aqui reserva ou volta a referenciar o blob
+            result = await session.execute(
+                delete(Blob).where(
+                    Blob.chave == chave, Blob.referencias == 0, Blob.atualizado_em < limite
+                )
+            )
+            await session.commit()
+            if result.rowcount:
+                liberados += await _remover_arquivos(chave)
+                removidos += 1
+
+    return removidos, liberados
+
+
+async def deduplicar(lote: int, carencia_horas: float) -> None:
+    print("1/3 Migrando imagens da coluna BYTEA para o blob store...")
+    migradas, bytes_migrados = await migrar_imagens(lote)
+
+    print("2/3 Recontando referências...")
+    corrigidos, compartilhadas, economia = await recontar_referencias()
+
+    print(f"3/3 Removendo blobs sem referências há mais de {carencia_horas:g} h...")
+    removidos, liberados = await remover_sem_referencias(carencia_horas)
+
+    print()
+    print(f"  Imagens migradas do banco:        {migradas} ({_mib(bytes_migrados)} retirados do BYTEA)")
+    print(f"  Contadores de referência ajustados: {corrigidos}")
+    print(f"  Linhas compartilhando conteúdo:   {compartilhadas} ({_mib(economia)} em cópias não armazenadas)")
+    print(f"  Blobs sem referência removidos:   {removidos} ({_mib(liberados)} liberados)")
+    print(f"✅ Espaço recuperado: {_mib(economia + liberados)}")
+
+
+async def _main(lote: int, carencia_horas: float):
+    try:
+        await deduplicar(lote, carencia_horas)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplica as imagens da galeria e limpa o blob store")
+    parser.add_argument("--lote", type=int, default=20, help="Imagens por transação na migração")
+    parser.add_argument(
+        "--carencia-horas", type=float, default=24,
+        help="Tempo mínimo sem referências antes de remover um blob"
+    )
+    args = parser.parse_args()
+    asyncio.run(_main(args.lote, args.carencia_horas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Índices gerenciados das tabelas com soft delete
+
+Quase todas as consultas filtram `is_deleted = false` (ou
+`servidor.ativo = true`) e ordenam pelas chaves da paginação. Os índices
+abaixo são parciais (só as linhas ativas) e compostos na mesma ordem do
+filtro + ORDER BY de cada router, para que a listagem e o keyset
+(WHERE (chaves) < cursor) leiam o índice em ordem, sem sort.
+
+Ao mudar o filtro ou as chaves de `Paginacao` de um router, atualize o
+índice correspondente aqui.
+
+create_all só cria índices de tabelas novas; os que faltam em bancos
+existentes são criados pelo comando abaixo (--create), com CREATE INDEX
+CONCURRENTLY: a tabela continua aceitando escritas durante a criação.
+A criação na inicialização (DB_ENSURE_INDEXES) usa CREATE INDEX comum,
+que bloqueia escritas na tabela até terminar, e serve só para bancos
+de desenvolvimento.
+
+No PostgreSQL também são criados os índices GIN de trigramas da busca
+por nome (app/core/busca.py), que dependem das extensões pg_trgm e
+unaccent e da função IMMUTABLE f_unaccent. Sem permissão para criar as
+extensões esses índices são ignorados e o modo trigram não fica
+disponível.
+
+Verificação (índices definidos e ausentes, e índices sem uso segundo
+pg_stat_user_indexes):
+
+    python -m app.database.indexes --check
+    python -m app.database.indexes --create
+"""
+import argparse
+import asyncio
+from contextlib import nullcontext
+from typing import List, Set, Tuple
+
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateIndex
+
+from app.models import AlunoTurma, Disciplina, Galeria, Noticia, Professor, Servidor, Turma
+
+
+def _ativos(coluna: str = "is_deleted", valor: str = "false") -> dict:
+    """Predicado do índice parcial (PostgreSQL e SQLite)"""
+    condicao = text(f"{coluna} = {valor}")
+    return {"postgresql_where": condicao, "sqlite_where": condicao}
+
+
+# ==================== DEFINIÇÕES ====================
+
+INDICES: List[Index] = [
+    # GET /aluno-turma/ (sem filtro, por turma e por aluno) e /turmas/ do aluno
+    Index(
+        "ix_aluno_turma_ativos_criado_em",
+        AlunoTurma.criado_em.desc(), AlunoTurma.id.desc(),
+        **_ativos()
+    ),
+    Index(
+        "ix_aluno_turma_ativos_turma",
+        AlunoTurma.id_turma, AlunoTurma.criado_em.desc(), AlunoTurma.id.desc(),
+        **_ativos()
+    ),
+    Index(
+        "ix_aluno_turma_ativos_aluno",
+        AlunoTurma.id_aluno, AlunoTurma.criado_em.desc(), AlunoTurma.id.desc(),
+        **_ativos()
+    ),
+
+    # GET /galeria/ (todas e por evento)
+    Index(
+        "ix_galeria_ativos_data",
+        Galeria.data.desc(), Galeria.id_imagem.desc(),
+        **_ativos()
+    ),
+    Index(
+        "ix_galeria_ativos_evento_data",
+        Galeria.id_evento, Galeria.data.desc(), Galeria.id_imagem.desc(),
+        **_ativos()
+    ),
+
+    # Imagens da galeria por chave do blob store (coluna adicionada depois
+    # da criação da tabela, por isso o índice fica aqui e não no model)
+    Index(
+        "ix_galeria_imagem_chave",
+        Galeria.imagem_chave
+    ),
+
+    # GET /noticias/
+    Index(
+        "ix_noticias_ativos_data",
+        Noticia.data.desc(), Noticia.id_noticia.desc(),
+        **_ativos()
+    ),
+
+    # GET /turmas/ (todas e do professor logado)
+    Index(
+        "ix_turma_ativos_ano_nome",
+        Turma.ano_letivo.desc(), Turma.nome, Turma.id_turma,
+        **_ativos()
+    ),
+    Index(
+        "ix_turma_ativos_professor_ano_nome",
+        Turma.id_professor, Turma.ano_letivo.desc(), Turma.nome, Turma.id_turma,
+        **_ativos()
+    ),
+
+    # GET /disciplinas/
+    Index(
+        "ix_disciplina_ativos_nome",
+        Disciplina.nome, Disciplina.id_disciplina,
+        **_ativos()
+    ),
+
+    # GET /professores/ e /servidores/ (ordem pela chave primária, só ativos)
+    Index(
+        "ix_professor_ativos_id",
+        Professor.id_professor,
+        **_ativos()
+    ),
+    Index(
+        "ix_servidor_ativos_id",
+        Servidor.id_servidor,
+        **_ativos("ativo", "true")
+    ),
+]
+
+
+# Busca por nome sem acento (somente PostgreSQL): (nome, tabela, definição)
+INDICES_BUSCA: List[Tuple[str, str, str]] = [
+    ("ix_aluno_nome_trgm", "aluno",
+     "USING gin (f_unaccent(nome) gin_trgm_ops) WHERE is_deleted = false"),
+    ("ix_professor_nome_trgm", "professor",
+     "USING gin (f_unaccent(nome) gin_trgm_ops) WHERE is_deleted = false"),
+    ("ix_servidor_nome_trgm", "servidor",
+     "USING gin (f_unaccent(nome) gin_trgm_ops) WHERE ativo = true"),
+    ("ix_turma_nome_trgm", "turma",
+     "USING gin (f_unaccent(nome) gin_trgm_ops) WHERE is_deleted = false"),
+    ("ix_disciplina_nome_trgm", "disciplina",
+     "USING gin (f_unaccent(nome) gin_trgm_ops) WHERE is_deleted = false"),
+]
+
+# unaccent() é STABLE e não pode ser usada em índices; o wrapper com
+# dicionário explícito é IMMUTABLE
+_F_UNACCENT = """
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+"""
+
+
+def preparar_busca_textual(sync_conn) -> bool:
+    """
+    Garante pg_trgm, unaccent e f_unaccent (PostgreSQL)
+
+    Returns:
+        False se não for PostgreSQL ou faltar permissão para as extensões
+    """
+    if sync_conn.dialect.name != "postgresql":
+        return False
+
+    if sync_conn.execute(text("SELECT to_regprocedure('f_unaccent(text)')")).scalar():
+        return True
+
+    # Em autocommit não há transação para o SAVEPOINT
+    autocommit = sync_conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    try:
+        with nullcontext() if autocommit else sync_conn.begin_nested():
+            sync_conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            sync_conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+            sync_conn.execute(text(_F_UNACCENT))
+    except DBAPIError as e:
+        print(f"⚠️  Busca por trigramas indisponível (pg_trgm/unaccent): {e.orig}")
+        return False
+    return True
+
+
+def _indices_invalidos(sync_conn) -> Set[str]:
+    """Índices INVALID, deixados por um CREATE INDEX CONCURRENTLY interrompido (PostgreSQL)"""
+    if sync_conn.dialect.name != "postgresql":
+        return set()
+    result = sync_conn.execute(text("""
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid
+    """))
+    return set(result.scalars().all())
+
+
+def _ddl_indice(indice: Index, dialect, concorrente: bool) -> str:
+    ddl = str(CreateIndex(indice, if_not_exists=True).compile(dialect=dialect))
+    if concorrente:
+        ddl = ddl.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY ", 1)
+    return ddl
+
+
+def garantir_indices(sync_conn, concorrente: bool = False) -> List[str]:
+    """
+    Cria os índices de INDICES (e de INDICES_BUSCA no PostgreSQL) que ainda não existem
+
+    - concorrente: no PostgreSQL usa CREATE INDEX CONCURRENTLY (não
+      bloqueia escritas). Exige uma conexão em autocommit; índices
+      INVALID de uma tentativa anterior são removidos e recriados
+
+    Returns:
+        Nomes dos índices criados
+    """
+    concorrente = concorrente and sync_conn.dialect.name == "postgresql"
+    modo = "CONCURRENTLY " if concorrente else ""
+    inspector = inspect(sync_conn)
+    tabelas = set(inspector.get_table_names())
+    invalidos = _indices_invalidos(sync_conn) if concorrente else set()
+    criados = []
+
+    def ausente(nome: str, tabela: str) -> bool:
+        if nome in invalidos:
+            sync_conn.execute(text(f"DROP INDEX {modo}IF EXISTS {nome}"))
+            return True
+        return nome not in {i["name"] for i in inspector.get_indexes(tabela)}
+
+    for indice in INDICES:
+        tabela = indice.table.name
+        if tabela in tabelas and ausente(indice.name, tabela):
+            sync_conn.execute(text(_ddl_indice(indice, sync_conn.dialect, concorrente)))
+            criados.append(indice.name)
+
+    if preparar_busca_textual(sync_conn):
+        for nome, tabela, definicao in INDICES_BUSCA:
+            if tabela in tabelas and ausente(nome, tabela):
+                sync_conn.execute(text(f"CREATE INDEX {modo}IF NOT EXISTS {nome} ON {tabela} {definicao}"))
+                criados.append(nome)
+
+    return criados
+
+
+async def criar_indices(engine: AsyncEngine) -> List[str]:
+    """
+    Cria os índices ausentes sem bloquear escritas (usado por --create)
+
+    CREATE INDEX CONCURRENTLY não roda dentro de transação, então a
+    conexão fica em autocommit e cada índice é criado isoladamente.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        return await conn.run_sync(garantir_indices, True)
+
+
+# ==================== VERIFICAÇÃO ====================
+
+def _indices_ausentes(sync_conn) -> List[str]:
+    inspector = inspect(sync_conn)
+    esperados = [(indice.name, indice.table.name) for indice in INDICES]
+    if sync_conn.dialect.name == "postgresql":
+        esperados += [(nome, tabela) for nome, tabela, _ in INDICES_BUSCA]
+
+    existentes = {
+        i["name"]
+        for tabela in {tabela for _, tabela in esperados}
+        for i in inspector.get_indexes(tabela)
+    } - _indices_invalidos(sync_conn)
+    return [nome for nome, _ in esperados if nome not in existentes]
+
+
+def _indices_sem_uso(sync_conn) -> List[tuple]:
+    """
+    Índices não únicos com idx_scan = 0 desde o último reset das estatísticas
+
+    Índices únicos e chaves primárias ficam de fora: garantem restrições
+    mesmo sem serem lidos por consultas.
+    """
+    result = sync_conn.execute(text("""
+        SELECT s.relname, s.indexrelname, pg_relation_size(s.indexrelid)
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        WHERE s.idx_scan = 0
+          AND NOT i.indisunique
+          AND NOT i.indisprimary
+        ORDER BY pg_relation_size(s.indexrelid) DESC
+    """))
+    return list(result.all())
+
+
+async def _verificar(criar: bool) -> int:
+    from app.database.session import engine
+
+    try:
+        if criar:
+            for nome in await criar_indices(engine):
+                print(f"✅ Criado: {nome}")
+
+        async with engine.begin() as conn:
+            ausentes = await conn.run_sync(_indices_ausentes)
+            print(f"Índices ausentes: {len(ausentes)}")
+            for nome in ausentes:
+                print(f"  ❌ ausente: {nome}")
+
+            if conn.dialect.name == "postgresql":
+                sem_uso = await conn.run_sync(_indices_sem_uso)
+                print(f"\nÍndices sem uso (idx_scan = 0): {len(sem_uso)}")
+                for tabela, nome, tamanho in sem_uso:
+                    print(f"  ⚠️  {tabela}.{nome} ({tamanho / 1024:.0f} KiB)")
+            else:
+                print("\nEstatísticas de uso disponíveis apenas no PostgreSQL")
+    finally:
+        await engine.dispose()
+
+    return 1 if ausentes else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificação dos índices gerenciados")
+    parser.add_argument("--check", action="store_true", help="Relata índices ausentes e sem uso")
+    parser.add_argument("--create", action="store_true", help="Cria os índices ausentes (CONCURRENTLY) antes de verificar")
+    args = parser.parse_args()
+
+    if not (args.check or args.create):
+        parser.error("informe --check e/ou --create")
+
+    raise SystemExit(asyncio.run(_verificar(criar=args.create)))
+
+
+if __name__ == "__main__":
+    main()
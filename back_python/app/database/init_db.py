@@ -1,14 +1,49 @@
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel
+from app.core.config import settings
+from app.database.indexes import garantir_indices
 from app.database.session import engine
 from app.models.user import User  # noqa: F401
 
 
+# Colunas adicionadas a tabelas já existentes
+# create_all só cria tabelas novas; estas colunas são adicionadas
+# em bancos criados antes delas existirem (tabela, coluna, DDL)
+COLUNAS_ADICIONAIS = [
+    ("usuarios", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("galeria", "imagem_chave", "VARCHAR(64)"),
+    ("galeria", "imagem_tamanho", "INTEGER"),
+    ("galeria", "imagem_mime", "VARCHAR(100)"),
+]
+
+
+def _add_missing_columns(sync_conn) -> None:
+    """Adiciona as colunas de COLUNAS_ADICIONAIS que ainda não existem"""
+    inspector = inspect(sync_conn)
+    tabelas = set(inspector.get_table_names())
+
+    for tabela, coluna, ddl in COLUNAS_ADICIONAIS:
+        if tabela not in tabelas:
+            continue
+        existentes = {c["name"] for c in inspector.get_columns(tabela)}
+        if coluna not in existentes:
+            sync_conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {ddl}"))
+
+
 async def create_db_and_tables():
     """
     Cria todas as tabelas no banco de dados
-    
+
     Importante: Importar todos os models antes de chamar esta função
     """
     async with engine.begin() as conn:
         # Cria todas as tabelas definidas com SQLModel
         await conn.run_sync(SQLModel.metadata.create_all)
+
+        # Adiciona colunas novas em tabelas já existentes
+        await conn.run_sync(_add_missing_columns)
+
+        # Cria índices gerenciados ausentes (app/database/indexes.py); em
+        # produção use o comando --create, que não bloqueia escritas
+        if settings.DB_ENSURE_INDEXES:
+            await conn.run_sync(garantir_indices)
@@ -0,0 +1,98 @@
+"""
+Migra as imagens da galeria da coluna BYTEA para o blob store
+
+Percorre a tabela em lotes pela chave primária (keyset, WHERE
+id_imagem > último id do lote anterior), de modo que no máximo `--lote`
+imagens ficam em memória por vez. Cada lote é gravado no blob store e
+confirmado numa transação própria: a migração pode ser interrompida e
+retomada, pois só processa linhas com bytes e sem `imagem_chave`.
+
+Cada linha não excluída conta uma referência ao blob (tabela `blobs`):
+linhas com o mesmo conteúdo passam a compartilhar um único arquivo.
+
+Por padrão a coluna `imagem` é zerada após a cópia. Depois da migração
+o espaço da tabela é devolvido com VACUUM FULL galeria (PostgreSQL).
+
+Uso:
+    python -m app.database.migrar_imagens [--lote 20] [--manter-bytes]
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, update
+
+from app.core.blob_store import blob_store, detectar_mime
+from app.database.session import async_session, engine
+from app.models.galeria import Galeria
+from app.repositories.blobs import BlobRepository
+
+
+async def migrar_imagens(lote: int = 20, manter_bytes: bool = False) -> tuple:
+    """
+    Returns:
+        (imagens migradas, bytes copiados)
+    """
+    migradas = 0
+    total_bytes = 0
+    ultimo_id = 0
+
+    while True:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Galeria.id_imagem, Galeria.is_deleted, Galeria.imagem)
+                .where(
+                    Galeria.id_imagem > ultimo_id,
+                    Galeria.imagem.is_not(None),
+                    Galeria.imagem_chave.is_(None)
+                )
+                .order_by(Galeria.id_imagem)
+                .limit(lote)
+            )
+            linhas = result.all()
+            if not linhas:
+                break
+
+            blobs = BlobRepository(session)
+            for id_imagem, is_deleted, dados in linhas:
+                chave, tamanho = await blob_store.salvar(dados)
+                valores = {
+                    "imagem_chave": chave,
+                    "imagem_tamanho": tamanho,
+                    "imagem_mime": detectar_mime(dados[:16]) or "application/octet-stream",
+                }
+                if not is_deleted:
+                    await blobs.adicionar_referencia(chave, tamanho, valores["imagem_mime"])
+                if not manter_bytes:
+                    valores["imagem"] = None
+                await session.execute(
+                    update(Galeria).where(Galeria.id_imagem == id_imagem).values(**valores)
+                )
+                migradas += 1
+                total_bytes += tamanho
+
+            await session.commit()
+
+        ultimo_id = linhas[-1][0]
+        print(f"  ... {migradas} imagens ({total_bytes / 1024 / 1024:.1f} MiB), último id {ultimo_id}")
+
+    return migradas, total_bytes
+
+
+async def _main(lote: int, manter_bytes: bool):
+    try:
+        migradas, total_bytes = await migrar_imagens(lote, manter_bytes)
+    finally:
+        await engine.dispose()
+    print(f"✅ {migradas} imagens migradas para o blob store ({total_bytes / 1024 / 1024:.1f} MiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra imagens da galeria (BYTEA) para o blob store")
+    parser.add_argument("--lote", type=int, default=20, help="Imagens por transação")
+    parser.add_argument("--manter-bytes", action="store_true", help="Não zera a coluna imagem após copiar")
+    args = parser.parse_args()
+    asyncio.run(_main(args.lote, args.manter_bytes))
+
+
+if __name__ == "__main__":
+    main()
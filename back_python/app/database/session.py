@@ -1,15 +1,126 @@
+import time
+import uuid
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from fastapi import Request
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_session as sessao_async_de
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import Histogram
+
+
+# ==================== POOL DE CONEXÕES ====================
+
+class PoolMonitorado(AsyncAdaptedQueuePool):
+    """
+    Pool padrão do engine assíncrono com medição do checkout
+
+    Registra quanto tempo cada requisição esperou por uma conexão
+    (inclui abrir conexões novas e o pre-ping) e quantas desistiram
+    por timeout ("QueuePool limit ... reached").
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.espera = Histogram([1, 5, 10, 50, 100, 500, 1000, 5000, 30000])
+        self.timeouts = 0
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.espera.observe((time.perf_counter() - inicio) * 1000)
+
+
+def _engine_kwargs(url: str) -> Dict[str, Any]:
+    """Parâmetros de pool e do driver conforme o banco configurado"""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite local: pool padrão do SQLAlchemy
+        return {}
+
+    kwargs: Dict[str, Any] = {
+        "poolclass": PoolMonitorado,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if make_url(url).get_driver_name() == "asyncpg":
+        if settings.DB_PGBOUNCER:
+            # PgBouncer em modo transaction: cada comando pode ir para outra
+            # conexão do servidor, então não há prepared statements nomeados
+            # reaproveitáveis; desliga os caches e usa nomes únicos
+            kwargs["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            kwargs["connect_args"] = {
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            }
+
+    return kwargs
 
 
 # Engine assíncrono do banco de dados
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,  # Log de SQL queries em modo debug
-    future=True
+    future=True,
+    **_engine_kwargs(settings.DATABASE_URL)
 )
 
+# Engine da réplica de leitura (opcional); sem DATABASE_READ_URL é o próprio primário
+if settings.DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_URL,
+        echo=settings.DEBUG,
+        future=True,
+        **_engine_kwargs(settings.DATABASE_READ_URL)
+    )
+else:
+    read_engine = engine
+
+
+def _pool_stats(eng) -> Dict[str, Any]:
+    pool = eng.sync_engine.pool
+    if not isinstance(pool, PoolMonitorado):
+        return {"pool": type(pool).__name__, "status": pool.status()}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "timeouts": pool.timeouts,
+        "checkout_wait": pool.espera.snapshot(),
+    }
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Estado atual dos pools (primário e réplica) e histograma de espera no checkout"""
+    stats = {"primary": _pool_stats(engine)}
+    if read_engine is not engine:
+        stats["replica"] = _pool_stats(read_engine)
+        stats["replica"]["reads_routed_to_primary"] = leituras_no_primario
+    return stats
+
+
 # Session factory
 async_session = sessionmaker(
     engine,
@@ -18,12 +129,159 @@ async_session = sessionmaker(
 )
 
 
-async def get_session() -> AsyncSession:
+# ==================== ROTEAMENTO DE LEITURAS ====================
+# Réplicas têm atraso de replicação: um usuário que acabou de gravar
+# pode não ver a própria escrita. Após cada commit com escritas, as
+# leituras do mesmo cliente vão para o primário durante
+# READ_AFTER_WRITE_SECONDS (read-your-writes). O controle é por processo.
+
+_escritas_recentes: Dict[str, float] = {}
+leituras_no_primario = 0
+
+
+def _chave_cliente(request: Request) -> str:
+    """
+    Identifica o cliente para a janela read-your-writes
+
+    Usa o ID do usuário autenticado (request.state.id_usuario, definido
+    por get_current_user depois de validar o token); sem autenticação,
+    usa o IP.
+    """
+    id_usuario = getattr(request.state, "id_usuario", None)
+    if id_usuario is not None:
+        return f"usuario:{id_usuario}"
+    return f"ip:{request.client.host if request.client else ''}"
+
+
+def _registrar_escrita(chave: Optional[str]) -> None:
+    if not chave or read_engine is engine:
+        return
+
+    agora = time.monotonic()
+    if len(_escritas_recentes) > 10_000:
+        for antiga in [k for k, ate in _escritas_recentes.items() if ate <= agora]:
+            del _escritas_recentes[antiga]
+    _escritas_recentes[chave] = agora + settings.READ_AFTER_WRITE_SECONDS
+
+
+def _escreveu_recentemente(chave: str) -> bool:
+    ate = _escritas_recentes.get(chave)
+    return ate is not None and ate > time.monotonic()
+
+
+class _SessaoLeitura(Session):
+    """
+    Sessão das leituras: escolhe réplica ou primário no primeiro comando
+
+    A escolha não é feita ao criar a sessão porque a dependência da
+    sessão é resolvida antes de get_current_user, que é quem identifica
+    o usuário da requisição.
+    """
+
+    def get_bind(self, *args, **kwargs):
+        global leituras_no_primario
+
+        escolhido = self.info.get("engine")
+        if escolhido is None:
+            escolhido = read_engine
+            request = self.info.get("request")
+            if (
+                read_engine is not engine
+                and request is not None
+                and _escreveu_recentemente(_chave_cliente(request))
+            ):
+                escolhido = engine
+                leituras_no_primario += 1
+            self.info["engine"] = escolhido
+            # session.bind (AsyncSession) passa a refletir a escolha
+            sessao = sessao_async_de(self)
+            if sessao is not None:
+                sessao.bind = escolhido
+        return escolhido.sync_engine
+
+
+async_read_session = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    sync_session_class=_SessaoLeitura,
+    expire_on_commit=False
+)
+
+
+async def get_session(request: Request) -> AsyncSession:
     """
-    Dependência que fornece uma sessão do banco de dados
+    Dependência que fornece uma sessão do banco de dados (primário)
     
     Yields:
         AsyncSession: Sessão assíncrona do SQLModel
     """
     async with async_session() as session:
+        # Após o commit, identifica o cliente que escreveu (read-your-writes)
+        session.info["request"] = request
         yield session
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """
+    Dependência de sessão para handlers somente leitura (GET)
+    
+    Usa a réplica (DATABASE_READ_URL) quando configurada, exceto logo
+    após uma escrita do mesmo cliente. Não faça escritas nesta sessão.
+    
+    Yields:
+        AsyncSession: Sessão assíncrona do SQLModel
+    """
+    async with async_read_session() as session:
+        session.info["request"] = request
+        yield session
+
+
+# ==================== NOTIFICAÇÃO DE ESCRITAS ====================
+# Caches em memória (contagens, respostas) precisam saber quais tabelas
+# foram alteradas. As sessões acumulam os nomes das tabelas escritas
+# (flush de objetos e UPDATE/DELETE/INSERT em massa) e, após o commit,
+# chamam os ouvintes registrados com esse conjunto.
+
+_ouvintes_escrita: List[Callable[[Set[str]], None]] = []
+
+
+def on_table_write(ouvinte: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """Registra `ouvinte(tabelas)` para ser chamado após cada commit com escritas"""
+    _ouvintes_escrita.append(ouvinte)
+    return ouvinte
+
+
+def _marcar_tabelas(session: Session, tabelas) -> None:
+    session.info.setdefault("tabelas_escritas", set()).update(tabelas)
+
+
+@event.listens_for(Session, "after_flush")
+def _coletar_tabelas_flush(session: Session, flush_context) -> None:
+    _marcar_tabelas(session, {
+        obj.__table__.name
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if hasattr(obj, "__table__")
+    })
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _coletar_tabelas_dml(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabela = getattr(orm_execute_state.statement, "table", None)
+        if tabela is not None:
+            _marcar_tabelas(orm_execute_state.session, {tabela.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_escritas(session: Session) -> None:
+    tabelas = session.info.pop("tabelas_escritas", None)
+    if tabelas:
+        request = session.info.get("request")
+        _registrar_escrita(_chave_cliente(request) if request is not None else None)
+        for ouvinte in _ouvintes_escrita:
+            ouvinte(tabelas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_escritas(session: Session) -> None:
+    session.info.pop("tabelas_escritas", None)
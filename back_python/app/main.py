@@ -1,27 +1,52 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.database.init_db import create_db_and_tables
-from app.routers import auth, users, alunos, professores, servidores, noticias, galeria, turmas, disciplinas, aluno_turma
+from app.database.session import async_session, engine
+from app.core.busca import suporte_trigram
+from app.core.password_hasher import password_hasher
+from app.core.refresh_tokens import carregar_indice_revogacao, tarefa_manutencao_refresh_tokens
+from app.core.autocomplete import indice_nomes, tarefa_reconstrucao_autocomplete
+from app.core.derivados import gerador_derivados
+from app.routers import auth, users, alunos, professores, servidores, noticias, galeria, turmas, disciplinas, aluno_turma, autocomplete, search, metrics
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Gerencia o ciclo de vida da aplicação
-    - Startup: Cria as tabelas no banco
-    - Shutdown: Cleanup (se necessário)
+    - Startup: Cria as tabelas no banco, carrega índices em memória
+      e inicia as tarefas de manutenção
+    - Shutdown: Cancela as tarefas e encerra os pools
     """
     # Startup
     print("🚀 Iniciando aplicação...")
     await create_db_and_tables()
     print("✅ Banco de dados inicializado")
+    await suporte_trigram.verificar(engine)
+    
+    async with async_session() as session:
+        await carregar_indice_revogacao(session)
+        await indice_nomes.carregar(session)
+    
+    gerador_derivados.iniciar()
+    
+    tarefas = [
+        asyncio.create_task(tarefa_manutencao_refresh_tokens()),
+        asyncio.create_task(tarefa_reconstrucao_autocomplete())
+    ]
     
     yield
     
     # Shutdown
     print("👋 Encerrando aplicação...")
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    password_hasher.shutdown()
+    gerador_derivados.shutdown()
 
 
 # Inicializa o FastAPI
@@ -58,6 +83,11 @@ app.include_router(disciplinas.router, prefix="/api/v1", tags=["Disciplinas"])
 app.include_router(aluno_turma.router, prefix="/api/v1", tags=["Aluno-Turma"])
 app.include_router(noticias.router, prefix="/api/v1", tags=["Notícias"])
 app.include_router(galeria.router, prefix="/api/v1", tags=["Galeria"])
+app.include_router(autocomplete.router, prefix="/api/v1", tags=["Autocomplete"])
+app.include_router(search.router, prefix="/api/v1", tags=["Busca"])
+
+# Observabilidade
+app.include_router(metrics.router, prefix="/api/v1", tags=["Métricas"])
 
 
 @app.get("/", tags=["Root"])
@@ -8,7 +8,10 @@ from app.models.aluno_turma import AlunoTurma
 from app.models.noticia import Noticia
 from app.models.evento import Evento
 from app.models.galeria import Galeria
+from app.models.blob import Blob
 from app.models.calendario import Calendario
+from app.models.refresh_token import RefreshToken
+from app.models.tentativa_login import TentativaLogin
 
 __all__ = [
     "User",
@@ -22,5 +25,8 @@ __all__ = [
     "Noticia",
     "Evento",
     "Galeria",
+    "Blob",
     "Calendario",
+    "RefreshToken",
+    "TentativaLogin",
 ]
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class Blob(SQLModel, table=True):
+    """
+    Conteúdo guardado no blob store (app/core/blob_store.py)
+
+    Linhas da galeria com a mesma imagem apontam para o mesmo blob.
+    `referencias` conta as linhas não excluídas que o usam; com zero
+    referências o arquivo pode ser removido por
+    `python -m app.database.deduplicar_imagens`.
+    """
+    __tablename__ = "blobs"
+
+    chave: str = Field(primary_key=True, max_length=64)  # SHA-256
+    tamanho: int = Field(nullable=False)  # bytes
+    mime: Optional[str] = Field(default=None, max_length=100)
+    referencias: int = Field(default=0, nullable=False)
+
+    # Timestamps (atualizado_em muda a cada referência ganha/perdida)
+    criado_em: datetime = Field(default_factory=datetime.utcnow)
+    atualizado_em: datetime = Field(default_factory=datetime.utcnow)
@@ -12,7 +12,13 @@ class Galeria(SQLModel, table=True):
     
     id_imagem: Optional[int] = Field(default=None, primary_key=True)
     id_evento: Optional[int] = Field(foreign_key="eventos.id_evento", nullable=True)
-    imagem: Optional[bytes] = None  # BYTEA no PostgreSQL
+    # Legado: bytes no banco (BYTEA). Novas imagens vão para o blob store;
+    # linhas antigas são movidas por `python -m app.database.migrar_imagens`
+    imagem: Optional[bytes] = None
+    # Imagem no blob store (app/core/blob_store.py)
+    imagem_chave: Optional[str] = Field(default=None, max_length=64)  # SHA-256
+    imagem_tamanho: Optional[int] = None  # bytes
+    imagem_mime: Optional[str] = Field(default=None, max_length=100)
     descricao: Optional[str] = Field(default=None, max_length=255)
     data: date = Field(default_factory=date.today)
     
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class RefreshToken(SQLModel, table=True):
+    """
+    Modelo de Refresh Token emitido
+
+    Cada login inicia uma família; cada /auth/refresh marca o token atual
+    como usado e emite outro da mesma família (rotação). Apresentar um
+    token já usado indica vazamento: a família inteira é revogada.
+    """
+    __tablename__ = "refresh_tokens"
+
+    jti: str = Field(primary_key=True, max_length=32)
+    familia: str = Field(index=True, nullable=False, max_length=32)
+    id_usuario: int = Field(foreign_key="usuarios.id", index=True, nullable=False)
+    expira_em: datetime = Field(index=True, nullable=False)
+
+    # Rotação e revogação
+    usado_em: Optional[datetime] = None
+    revogado_em: Optional[datetime] = None
+
+    # Timestamps
+    criado_em: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field
+
+
+class TentativaLogin(SQLModel, table=True):
+    """
+    Contador de tentativas de autenticação por chave e janela
+
+    Usado pelo backend "database" do limitador de login, compartilhado
+    entre os workers. Cada linha guarda quantas tentativas a chave
+    (e-mail ou IP) fez na janela `janela` (timestamp // tamanho da janela).
+    """
+    __tablename__ = "tentativas_login"
+
+    chave: str = Field(primary_key=True, max_length=320)
+    janela: int = Field(primary_key=True, index=True)
+    contagem: int = Field(default=0, nullable=False)
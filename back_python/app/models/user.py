@@ -40,6 +40,9 @@ class User(SQLModel, table=True):
     # Soft delete - usuário inativo não pode fazer login
     ativo: bool = Field(default=True)
     
+    # Versão dos tokens emitidos (claim "ver"); incrementar revoga todos
+    token_version: int = Field(default=0, nullable=False)
+    
     # Timestamps
     criado_em: datetime = Field(default_factory=datetime.utcnow)
     atualizado_em: Optional[datetime] = Field(default=None)
@@ -0,0 +1,15 @@
+"""
+Repositórios de acesso a dados compartilhados entre routers
+"""
+
+from app.repositories.usuario import (
+    UsuarioRepository,
+    get_usuario_repository,
+    get_usuario_repository_leitura
+)
+
+__all__ = [
+    "UsuarioRepository",
+    "get_usuario_repository",
+    "get_usuario_repository_leitura",
+]
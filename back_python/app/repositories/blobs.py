@@ -0,0 +1,97 @@
+"""
+Contagem de referências dos blobs da galeria
+
+O blob store guarda cada conteúdo uma única vez (chave = SHA-256), então
+várias linhas da galeria podem apontar para o mesmo arquivo. A tabela
+`blobs` conta quantas linhas não excluídas usam cada chave: o soft
+delete de uma linha só decrementa o contador, e o arquivo só é removido
+(por `python -m app.database.deduplicar_imagens`) quando nenhuma linha
+ativa o referencia.
+
+As operações rodam na sessão do handler: o contador é confirmado na
+mesma transação que altera a galeria. A exceção é `reservar_blob`,
+confirmada antes de o arquivo ser gravado: se a transação do handler
+falhar, o arquivo fica registrado com zero referências e é removido
+pela limpeza após a carência, em vez de ficar órfão no blob store.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import async_session
+from app.models.blob import Blob
+
+
+class BlobRepository:
+    """Incremento/decremento atômico de `blobs.referencias`"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _insert(self):
+        dialeto = self.session.bind.dialect.name
+        if dialeto == "postgresql":
+            return postgresql.insert(Blob)
+        if dialeto == "sqlite":
+            return sqlite.insert(Blob)
+        raise RuntimeError(f"Contagem de referências de blobs não suporta o dialeto {dialeto}")
+
+    async def reservar(self, chave: str, tamanho: int, mime: Optional[str]) -> None:
+        """
+        Registra `chave` sem referências, ou renova o atualizado_em do registro
+
+        A renovação reinicia a carência: a limpeza não remove o arquivo
+        enquanto ele está sendo gravado.
+        """
+        agora = datetime.utcnow()
+        stmt = self._insert().values(
+            chave=chave, tamanho=tamanho, mime=mime,
+            referencias=0, criado_em=agora, atualizado_em=agora
+        )
+        stmt = stmt.on_conflict_do_update(index_elements=["chave"], set_={"atualizado_em": agora})
+        await self.session.execute(stmt)
+
+    async def adicionar_referencia(self, chave: str, tamanho: int, mime: Optional[str]) -> None:
+        """Mais uma linha usa `chave` (cria o registro do blob se for novo)"""
+        agora = datetime.utcnow()
+        stmt = self._insert().values(
+            chave=chave, tamanho=tamanho, mime=mime,
+            referencias=1, criado_em=agora, atualizado_em=agora
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["chave"],
+            set_={"referencias": stmt.table.c.referencias + 1, "atualizado_em": agora}
+        )
+        await self.session.execute(stmt)
+
+    async def remover_referencia(self, chave: str) -> None:
+        """Uma linha deixou de usar `chave` (troca de imagem ou soft delete)"""
+        await self.session.execute(
+            update(Blob)
+            .where(Blob.chave == chave, Blob.referencias > 0)
+            .values(referencias=Blob.referencias - 1, atualizado_em=datetime.utcnow())
+        )
+
+    async def trocar_referencia(
+        self,
+        antiga: Optional[str],
+        nova: str,
+        tamanho: int,
+        mime: Optional[str]
+    ) -> None:
+        """A linha passou a usar `nova` no lugar de `antiga`"""
+        if antiga == nova:
+            return
+        await self.adicionar_referencia(nova, tamanho, mime)
+        if antiga:
+            await self.remover_referencia(antiga)
+
+
+async def reservar_blob(chave: str, tamanho: int, mime: Optional[str]) -> None:
+    """Registra o blob numa transação própria (chamar antes de gravar o arquivo)"""
+    async with async_session() as session:
+        await BlobRepository(session).reservar(chave, tamanho, mime)
+        await session.commit()
@@ -0,0 +1,68 @@
+"""
+Repositório de dados do usuário vinculado a uma pessoa
+
+Os routers de alunos, professores e servidores exibem o email do
+usuário vinculado (`email_usuario`). Buscar o usuário linha a linha
+gera N+1 consultas por página; este repositório carrega os emails de
+todos os IDs pedidos com um único `IN` e memoriza o resultado durante
+a requisição.
+"""
+from typing import Dict, Iterable, Optional
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import get_session, get_read_session
+from app.models.user import User
+
+
+class UsuarioRepository:
+    """
+    Carregador em lote dos emails de usuários (escopo: uma requisição)
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._emails: Dict[int, Optional[str]] = {}
+
+    async def emails_por_id(self, ids: Iterable[Optional[int]]) -> Dict[int, Optional[str]]:
+        """
+        Retorna {id_usuario: email} para os IDs informados
+
+        IDs None são ignorados; IDs inexistentes mapeiam para None.
+        Apenas os IDs ainda não carregados nesta requisição vão ao banco,
+        todos numa única consulta.
+        """
+        ids = {id_usuario for id_usuario in ids if id_usuario is not None}
+        pendentes = ids - self._emails.keys()
+
+        if pendentes:
+            result = await self.session.execute(
+                select(User.id, User.email).where(User.id.in_(pendentes))
+            )
+            self._emails.update(dict.fromkeys(pendentes))
+            self._emails.update(result.all())
+
+        return {id_usuario: self._emails[id_usuario] for id_usuario in ids}
+
+    async def email_por_id(self, id_usuario: Optional[int]) -> Optional[str]:
+        """Email de um único usuário (None se não houver vinculação)"""
+        if id_usuario is None:
+            return None
+        emails = await self.emails_por_id([id_usuario])
+        return emails[id_usuario]
+
+
+async def get_usuario_repository(
+    session: AsyncSession = Depends(get_session)
+) -> UsuarioRepository:
+    """Dependência: um repositório por requisição, na mesma sessão do handler"""
+    return UsuarioRepository(session)
+
+
+async def get_usuario_repository_leitura(
+    session: AsyncSession = Depends(get_read_session)
+) -> UsuarioRepository:
+    """Variante para handlers somente leitura (mesma sessão de get_read_session)"""
+    return UsuarioRepository(session)
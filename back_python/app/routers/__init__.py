@@ -2,7 +2,7 @@
 Routers do sistema escolar
 """
 
-from app.routers import auth, users, alunos, professores, servidores, noticias, galeria, turmas
+from app.routers import auth, users, alunos, professores, servidores, noticias, galeria, turmas, metrics
 
 __all__ = [
     "auth",
@@ -13,4 +13,5 @@ __all__ = [
     "noticias",
     "galeria",
     "turmas",
+    "metrics",
 ]
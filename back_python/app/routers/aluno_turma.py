@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
 from app.models.aluno_turma import AlunoTurma
 from app.models.aluno import Aluno
 from app.models.turma import Turma
@@ -17,10 +17,25 @@ from app.schemas.aluno_turma import (
     AlunoTurmaSimpleResponse
 )
 from app.core.security import get_current_user
+from app.core.pagination import ModoTotal, Paginacao
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca
 
 router = APIRouter(prefix="/aluno-turma", tags=["Aluno-Turma"])
 
 
+def _paginacao_matriculas(
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    modo_total: ModoTotal
+) -> Paginacao:
+    """Matrículas mais recentes primeiro; ID desempata matrículas do mesmo instante"""
+    return Paginacao(
+        [(AlunoTurma.criado_em, True), (AlunoTurma.id, True)],
+        limit=limit, offset=offset, cursor=cursor, total=modo_total
+    )
+
+
 @router.post(
     "/",
     response_model=AlunoTurmaResponse,
@@ -103,9 +118,11 @@ async def matricular_aluno(
 async def list_matriculas(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
     id_aluno: int = Query(None, description="Filtrar por ID do aluno"),
     id_turma: int = Query(None, description="Filtrar por ID da turma"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -135,19 +152,16 @@ async def list_matriculas(
     if id_turma:
         count_query = count_query.where(AlunoTurma.id_turma == id_turma)
     
-    result = await session.execute(count_query)
-    total = result.scalar()
-    
     # Buscar registros com paginação
-    query = query.offset(offset).limit(limit).order_by(AlunoTurma.criado_em.desc())
-    result = await session.execute(query)
-    matriculas = result.scalars().all()
+    pagina = _paginacao_matriculas(limit, offset, cursor, modo_total)
+    matriculas, total, next_cursor = await pagina.executar(session, query, count_query)
     
     return AlunoTurmaListResponse(
         items=matriculas,
         total=total,
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -158,7 +172,7 @@ async def list_matriculas(
 )
 async def get_matricula(
     matricula_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -243,7 +257,9 @@ async def get_turmas_do_aluno(
     aluno_id: int,
     offset: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -275,19 +291,17 @@ async def get_turmas_do_aluno(
         AlunoTurma.id_aluno == aluno_id,
         AlunoTurma.is_deleted == False
     )
-    result = await session.execute(count_query)
-    total = result.scalar()
     
     # Buscar com paginação
-    query = query.offset(offset).limit(limit).order_by(AlunoTurma.criado_em.desc())
-    result = await session.execute(query)
-    matriculas = result.scalars().all()
+    pagina = _paginacao_matriculas(limit, offset, cursor, modo_total)
+    matriculas, total, next_cursor = await pagina.executar(session, query, count_query)
     
     return AlunoTurmaListResponse(
         items=matriculas,
         total=total,
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -300,7 +314,9 @@ async def get_alunos_da_turma(
     turma_id: int,
     offset: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -332,14 +348,20 @@ async def get_alunos_da_turma(
         AlunoTurma.id_turma == turma_id,
         AlunoTurma.is_deleted == False
     )
-    result = await session.execute(count_query)
-    total = result.scalar()
     
     # Buscar com paginação
-    query = query.offset(offset).limit(limit).order_by(AlunoTurma.criado_em.desc())
-    result = await session.execute(query)
-    matriculas = result.scalars().all()
+    pagina = _paginacao_matriculas(limit, offset, cursor, modo_total)
+    matriculas, total, next_cursor = await pagina.executar(session, query, count_query)
     
+    return AlunoTurmaListResponse(
+        items=matriculas,
+        total=total,
+        offset=offset,
+        limit=limit,
+        next_cursor=next_cursor
+    )
+
+
 @router.get(
     "/turma/{turma_id}/alunos-detalhado",
     response_model=List[AlunoTurmaSimpleResponse],
@@ -350,7 +372,8 @@ async def get_alunos_da_turma_detalhado(
     # offset: int = Query(0, ge=0),
     # limit: int = Query(10, ge=1, le=100),
     nome_aluno: str = Query(None, description="Filtrar por nome dentro da turma"),
-    session: AsyncSession = Depends(get_session),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -402,15 +425,16 @@ async def get_alunos_da_turma_detalhado(
     )
 
     # Filtro Opcional por nome do aluno
+    busca = BuscaNome(session, modo_busca)
     if nome_aluno:
-        query = query.where(Aluno.nome.ilike(f"%{nome_aluno}%"))
+        query = query.where(busca.filtro(Aluno.nome, nome_aluno))
 
-    # Ordenação
-    query = query.order_by(Aluno.nome.asc()) 
+    # Ordenação (no modo trigram, os mais parecidos primeiro)
+    query = query.order_by(*busca.ordem(), Aluno.nome.asc()) 
     # .offset(offset).limit(limit)
 
     # Execução
-    result = await session.execute(query)
+    result = await busca.executar(query)
     rows = result.all()
 
     # Montagem da Resposta
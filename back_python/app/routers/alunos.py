@@ -1,10 +1,21 @@
+import re
+import secrets
+import string
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.database.session import get_session
+from sqlalchemy import select, func, or_
+from sqlalchemy.exc import IntegrityError
+from app.database.session import get_session, get_read_session
+from app.repositories.usuario import (
+    UsuarioRepository,
+    get_usuario_repository,
+    get_usuario_repository_leitura
+)
 from app.models.aluno import Aluno
+from app.models.aluno_turma import AlunoTurma
+from app.models.turma import Turma
 from app.models.user import User, UserRole
 from app.schemas.aluno import (
     AlunoCreate,
@@ -12,12 +23,35 @@ from app.schemas.aluno import (
     AlunoResponse,
     AlunoListResponse,
     VincularUsuarioCreate,
-    VincularUsuarioExistente
+    VincularUsuarioExistente,
+    ProvisionarUsuariosRequest,
+    ProvisionamentoItem,
+    ProvisionamentoResponse
+)
+from app.core.security import (
+    get_current_user,
+    get_password_hash_async,
+    get_password_hashes_async
 )
-from app.core.security import get_current_user, get_password_hash
+from app.core.autocomplete import indice_nomes
+from app.core.user_cache import invalidate_user
+from app.core.pagination import ModoTotal, Paginacao
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca
 
 router = APIRouter(prefix="/alunos", tags=["Alunos"])
 
+# Matrículas usadas como parte local do email no provisionamento em lote
+_MATRICULA_EMAIL = re.compile(r"^[a-z0-9._-]+$")
+
+
+def _gerar_senha(tamanho: int = 10) -> str:
+    """Senha aleatória com letras e números (regras de senha do sistema)"""
+    alfabeto = string.ascii_letters + string.digits
+    while True:
+        senha = "".join(secrets.choice(alfabeto) for _ in range(tamanho))
+        if any(c.isdigit() for c in senha) and any(c.isalpha() for c in senha):
+            return senha
+
 
 @router.post(
     "/",
@@ -76,6 +110,7 @@ async def create_aluno(
     aluno = Aluno(**aluno_data.model_dump())
     session.add(aluno)
     await session.commit()
+    indice_nomes.atualizar(aluno)
     await session.refresh(aluno)
     
     # Preparar resposta com email_usuario como None
@@ -95,7 +130,10 @@ async def create_aluno(
 async def list_alunos(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -120,38 +158,29 @@ async def list_alunos(
     if current_user.perfil == UserRole.ALUNO:
         count_query = count_query.where(Aluno.id_usuario == current_user.id)
     
-    result = await session.execute(count_query)
-    total = result.scalar()
-    
-    # Buscar registros com paginação
-    query = query.offset(offset).limit(limit).order_by(Aluno.id_aluno)
-    result = await session.execute(query)
-    alunos = result.scalars().all()
+    # Buscar registros com paginação (offset ou cursor)
+    pagina = Paginacao(
+        [(Aluno.id_aluno, False)],
+        limit=limit, offset=offset, cursor=cursor, total=modo_total
+    )
+    alunos, total, next_cursor = await pagina.executar(session, query, count_query)
     
-    # Enriquecer com email do usuário quando existir
-    alunos_response = []
-    for aluno in alunos:
-        email_usuario = None
-        if aluno.id_usuario:
-            user_result = await session.execute(
-                select(User).where(User.id == aluno.id_usuario)
-            )
-            usuario = user_result.scalar_one_or_none()
-            if usuario:
-                email_usuario = usuario.email
-        
-        alunos_response.append(
-            AlunoResponse(
-                **aluno.model_dump(),
-                email_usuario=email_usuario
-            )
+    # Enriquecer com email do usuário quando existir (uma consulta por página)
+    emails = await usuarios.emails_por_id(aluno.id_usuario for aluno in alunos)
+    alunos_response = [
+        AlunoResponse(
+            **aluno.model_dump(),
+            email_usuario=emails.get(aluno.id_usuario)
         )
+        for aluno in alunos
+    ]
     
     return AlunoListResponse(
         items=alunos_response,
         total=total,
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -165,7 +194,8 @@ async def get_alunos(  # Renomeado para plural
     cpf: str = Query(None, description="CPF do aluno"),
     nome: str = Query(None, description="Nome do aluno (busca parcial)"),
     matricula: str = Query(None, description="Matrícula do aluno"),
-    session: AsyncSession = Depends(get_session),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -186,12 +216,13 @@ async def get_alunos(  # Renomeado para plural
     )
     
     # Aplicar filtros
+    busca = BuscaNome(session, modo_busca)
     if aluno_id:
         query = query.where(Aluno.id_aluno == aluno_id)
     if cpf:
         query = query.where(Aluno.cpf == cpf)
     if nome:
-        query = query.where(Aluno.nome.ilike(f"%{nome}%"))
+        query = query.where(busca.filtro(Aluno.nome, nome))
     if matricula:
         query = query.where(Aluno.matricula == matricula)
     
@@ -201,8 +232,8 @@ async def get_alunos(  # Renomeado para plural
     if current_user.perfil == UserRole.ALUNO:
         query = query.where(Aluno.id_usuario == current_user.id)
     
-    # Executar busca
-    result = await session.execute(query)
+    # Executar busca (no modo trigram, os mais parecidos primeiro)
+    result = await busca.executar(query.order_by(*busca.ordem(), Aluno.id_aluno))
     
     # 4. Método correto para listas: .all()
     rows = result.all()
@@ -232,7 +263,8 @@ async def get_alunos(  # Renomeado para plural
 )
 async def get_aluno_by_id(
     aluno_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -265,14 +297,7 @@ async def get_aluno_by_id(
         )
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if aluno.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == aluno.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(aluno.id_usuario)
     
     return AlunoResponse(
         **aluno.model_dump(),
@@ -289,6 +314,7 @@ async def update_aluno(
     aluno_id: int,
     aluno_data: AlunoUpdate,
     session: AsyncSession = Depends(get_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -326,17 +352,11 @@ async def update_aluno(
     aluno.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(aluno)
     await session.refresh(aluno)
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if aluno.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == aluno.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(aluno.id_usuario)
     
     return AlunoResponse(
         **aluno.model_dump(),
@@ -390,6 +410,7 @@ async def delete_aluno(
     aluno.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(aluno)
     
     return None
 
@@ -488,7 +509,7 @@ async def vincular_usuario_aluno(
     novo_usuario = User(
         cpf=usuario_data.cpf,
         email=usuario_data.email,
-        senha_hash=get_password_hash(usuario_data.senha),
+        senha_hash=await get_password_hash_async(usuario_data.senha),
         perfil=UserRole.ALUNO,
         ativo=True
     )
@@ -500,6 +521,8 @@ async def vincular_usuario_aluno(
     aluno.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(aluno)
+    invalidate_user(novo_usuario.id)
     await session.refresh(aluno)
     
     return AlunoResponse(
@@ -508,6 +531,218 @@ async def vincular_usuario_aluno(
     )
 
 
+@router.post(
+    "/provisionar-usuarios",
+    response_model=ProvisionamentoResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Criar usuários em lote para alunos"
+)
+async def provisionar_usuarios_alunos(
+    dados: ProvisionarUsuariosRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Criar e vincular usuários para todos os alunos de uma turma
+    (ou de uma lista de IDs) em uma única operação.
+    
+    - Email de login: `<matricula>@<dominio_email>`
+    - Verificação de email/CPF em uso feita com uma única consulta
+    - Hashes de senha gerados em paralelo no pool de hash
+    - Todos os usuários são gravados em uma única transação
+    
+    Alunos que já possuem usuário são ignorados; conflitos de email/CPF
+    são reportados por aluno sem interromper o lote.
+    
+    **Permissão**: Apenas ADMIN
+    """
+    # Verificar permissão
+    if current_user.perfil != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem vincular usuários"
+        )
+    
+    if (dados.id_turma is None) == (dados.ids_aluno is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe id_turma OU ids_aluno"
+        )
+    
+    if dados.senha_inicial is not None and not (
+        any(char.isdigit() for char in dados.senha_inicial)
+        and any(char.isalpha() for char in dados.senha_inicial)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Senha deve conter pelo menos uma letra e um número"
+        )
+    
+    # Buscar os alunos do lote
+    itens: List[ProvisionamentoItem] = []
+    if dados.id_turma is not None:
+        result = await session.execute(
+            select(Turma.id_turma).where(
+                Turma.id_turma == dados.id_turma,
+                Turma.is_deleted == False
+            )
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Turma não encontrada"
+            )
+        
+        result = await session.execute(
+            select(Aluno)
+            .join(AlunoTurma, AlunoTurma.id_aluno == Aluno.id_aluno)
+            .where(
+                AlunoTurma.id_turma == dados.id_turma,
+                AlunoTurma.is_deleted == False,
+                Aluno.is_deleted == False
+            )
+            .order_by(Aluno.id_aluno)
+        )
+        alunos = list(result.scalars().unique().all())
+    else:
+        ids = list(dict.fromkeys(dados.ids_aluno))
+        result = await session.execute(
+            select(Aluno).where(
+                Aluno.id_aluno.in_(ids),
+                Aluno.is_deleted == False
+            )
+        )
+        por_id = {aluno.id_aluno: aluno for aluno in result.scalars().all()}
+        alunos = [por_id[id_aluno] for id_aluno in ids if id_aluno in por_id]
+        itens.extend(
+            ProvisionamentoItem(id_aluno=id_aluno, status="erro", motivo="Aluno não encontrado")
+            for id_aluno in ids if id_aluno not in por_id
+        )
+    
+    # Separar quem já tem usuário e montar os emails
+    candidatos = []
+    for aluno in alunos:
+        if aluno.id_usuario is not None:
+            itens.append(ProvisionamentoItem(
+                id_aluno=aluno.id_aluno,
+                matricula=aluno.matricula,
+                status="ignorado",
+                id_usuario=aluno.id_usuario,
+                motivo="Aluno já possui usuário vinculado"
+            ))
+            continue
+        
+        matricula = aluno.matricula.strip().lower()
+        if not _MATRICULA_EMAIL.match(matricula):
+            itens.append(ProvisionamentoItem(
+                id_aluno=aluno.id_aluno,
+                matricula=aluno.matricula,
+                status="erro",
+                motivo="Matrícula contém caracteres inválidos para email"
+            ))
+            continue
+        
+        candidatos.append((aluno, f"{matricula}@{dados.dominio_email.lower()}"))
+    
+    # Verificação de unicidade em uma única consulta
+    emails = [email for _, email in candidatos]
+    cpfs = [aluno.cpf for aluno, _ in candidatos]
+    emails_em_uso, cpfs_em_uso = set(), set()
+    if candidatos:
+        result = await session.execute(
+            select(User.email, User.cpf).where(
+                or_(User.email.in_(emails), User.cpf.in_(cpfs))
+            )
+        )
+        for email, cpf in result.all():
+            emails_em_uso.add(email)
+            cpfs_em_uso.add(cpf)
+    
+    # Emails/CPFs já reservados neste lote: matrículas que só diferem em
+    # maiúsculas/espaços geram o mesmo email, e o CPF pode se repetir
+    emails_no_lote, cpfs_no_lote = set(), set()
+    provisionar = []
+    for aluno, email in candidatos:
+        motivo = None
+        if email in emails_em_uso:
+            motivo = "Este email já está em uso"
+        elif aluno.cpf in cpfs_em_uso:
+            motivo = "CPF já vinculado a outro usuário"
+        elif email in emails_no_lote:
+            motivo = "Email repetido neste lote (matrícula equivalente a de outro aluno)"
+        elif aluno.cpf in cpfs_no_lote:
+            motivo = "CPF repetido neste lote"
+
+        if motivo:
+            itens.append(ProvisionamentoItem(
+                id_aluno=aluno.id_aluno,
+                matricula=aluno.matricula,
+                status="erro",
+                email=email,
+                motivo=motivo
+            ))
+        else:
+            emails_no_lote.add(email)
+            cpfs_no_lote.add(aluno.cpf)
+            provisionar.append((aluno, email))
+    
+    # Hash das senhas em paralelo (aguarda vagas no pool em vez de 503)
+    senhas = [
+        dados.senha_inicial if dados.senha_inicial is not None else _gerar_senha()
+        for _ in provisionar
+    ]
+    hashes = await get_password_hashes_async(senhas)
+    
+    # Criar usuários e vincular, tudo em uma transação
+    novos_usuarios = []
+    for (aluno, email), senha_hash in zip(provisionar, hashes):
+        novo_usuario = User(
+            cpf=aluno.cpf,
+            email=email,
+            senha_hash=senha_hash,
+            perfil=UserRole.ALUNO,
+            ativo=True
+        )
+        session.add(novo_usuario)
+        novos_usuarios.append(novo_usuario)
+    
+    if novos_usuarios:
+        agora = datetime.utcnow()
+        try:
+            await session.flush()  # Gerar IDs dos usuários
+            for (aluno, _), novo_usuario in zip(provisionar, novos_usuarios):
+                aluno.id_usuario = novo_usuario.id
+                aluno.atualizado_em = agora
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Conflito de email/CPF com um cadastro simultâneo. Nenhum usuário foi criado; tente novamente."
+            )
+    
+    for (aluno, email), novo_usuario, senha in zip(provisionar, novos_usuarios, senhas):
+        invalidate_user(novo_usuario.id)
+        indice_nomes.atualizar(aluno)
+        itens.append(ProvisionamentoItem(
+            id_aluno=aluno.id_aluno,
+            matricula=aluno.matricula,
+            status="criado",
+            email=email,
+            id_usuario=novo_usuario.id,
+            senha_gerada=senha if dados.senha_inicial is None else None
+        ))
+    
+    itens.sort(key=lambda item: item.id_aluno)
+    return ProvisionamentoResponse(
+        total=len(itens),
+        criados=sum(1 for item in itens if item.status == "criado"),
+        ignorados=sum(1 for item in itens if item.status == "ignorado"),
+        erros=sum(1 for item in itens if item.status == "erro"),
+        itens=itens
+    )
+
+
 @router.put(
     "/{aluno_id}/vincular-usuario-existente",
     response_model=AlunoResponse,
@@ -593,6 +828,8 @@ async def vincular_usuario_existente_aluno(
     aluno.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(aluno)
+    invalidate_user(usuario.id)
     await session.refresh(aluno)
     
     return AlunoResponse(
@@ -650,10 +887,13 @@ async def desvincular_usuario_aluno(
         )
     
     # Desvincular usuário
+    id_usuario_anterior = aluno.id_usuario
     aluno.id_usuario = None
     aluno.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(aluno)
+    invalidate_user(id_usuario_anterior)
     await session.refresh(aluno)
     
     return AlunoResponse(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 import jwt
@@ -8,14 +8,20 @@ from app.schemas.auth import Token, LoginRequest, TokenRefresh, TokenData
 from app.schemas.user import UserCreate, UserResponse
 from app.models.user import User
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
     get_current_active_admin,
-    get_current_user,
+    get_current_user_full,
     decode_token
 )
+from app.core.refresh_tokens import (
+    registrar_refresh_token,
+    rotacionar_refresh_token,
+    revogar_familia
+)
+from app.core.rate_limiter import login_rate_limiter
 from app.core.config import settings
 
 
@@ -25,6 +31,7 @@ router = APIRouter(prefix="/auth", tags=["Autenticação"])
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def sign_up(
     user_data: UserCreate,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     #current_user: User = Depends(get_current_active_admin)
 ):
@@ -39,7 +46,12 @@ async def sign_up(
     - Hash da senha com bcrypt
     
     **Autorização:** Requer perfil ADMIN.
+    
+    **Limite:** tentativas por IP/e-mail limitadas (429 + Retry-After).
     """
+    # Limita tentativas antes de qualquer hash de senha
+    await login_rate_limiter.check(request, user_data.email, escopo="signup")
+    
     # Verifica se o e-mail já existe
     statement = select(User).where(User.email == user_data.email)
     result = await session.execute(statement)
@@ -52,7 +64,7 @@ async def sign_up(
         )
     
     # Cria o usuário com senha hasheada
-    senha_hash = get_password_hash(user_data.senha)
+    senha_hash = await get_password_hash_async(user_data.senha)
     
     new_user = User(
         email=user_data.email,
@@ -72,6 +84,7 @@ async def sign_up(
 @router.post("/login", response_model=Token)
 async def login(
     login_data: LoginRequest,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -83,15 +96,21 @@ async def login(
     
     **Segurança:**
     - Verifica se o usuário está ativo (is_active=True)
-    - Compara o hash da senha com bcrypt
+    - Compara o hash da senha com bcrypt (fora do event loop)
+    - Retorna 503 com Retry-After se o pool de hash estiver saturado
+    - Retorna 429 com Retry-After se houver tentativas demais para o
+      e-mail ou IP (checado antes do bcrypt)
     """
+    # Limita tentativas antes de consultar o banco e executar o bcrypt
+    await login_rate_limiter.check(request, login_data.email)
+    
     # Busca o usuário por e-mail
     statement = select(User).where(User.email == login_data.email)
     result = await session.execute(statement)
     user = result.scalar_one_or_none()
     
     # Valida credenciais
-    if not user or not verify_password(login_data.senha, user.senha_hash):
+    if not user or not await verify_password_async(login_data.senha, user.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="E-mail ou senha incorretos",
@@ -105,13 +124,24 @@ async def login(
             detail="Usuário inativo. Entre em contato com o administrador."
         )
     
+    # Registra o refresh token inicial de uma nova família (sessão)
+    jti, familia = registrar_refresh_token(session, user.id)
+    await session.commit()
+    
     # Gera os tokens JWT com informações do usuário
     access_token = create_access_token(
         user_id=user.id,
         email=user.email,
-        perfil=user.perfil.value  # Converte Enum para string
+        perfil=user.perfil.value,  # Converte Enum para string
+        token_version=user.token_version,
+        familia=familia
+    )
+    refresh_token = create_refresh_token(
+        user_id=user.id,
+        token_version=user.token_version,
+        jti=jti,
+        familia=familia
     )
-    refresh_token = create_refresh_token(user_id=user.id)
     
     return {
         "access_token": access_token,
@@ -133,9 +163,13 @@ async def refresh_token(
     **Fluxo:**
     1. Cliente envia o refresh_token
     2. Sistema valida o token
-    3. Retorna novo access_token e refresh_token
+    3. Marca o refresh_token como usado (uso único - rotação)
+    4. Retorna novo access_token e refresh_token
     
-    **Segurança:** Apenas tokens do tipo "refresh" são aceitos.
+    **Segurança:**
+    - Apenas tokens do tipo "refresh" são aceitos.
+    - Reutilizar um refresh_token já usado encerra a sessão inteira
+      (todos os tokens da mesma família são revogados).
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -148,8 +182,10 @@ async def refresh_token(
         payload = decode_token(token_data.refresh_token)
         user_id: str = payload.get("sub")
         token_type: str = payload.get("type")
+        jti: str = payload.get("jti")
+        familia: str = payload.get("fam")
         
-        if user_id is None or token_type != "refresh":
+        if user_id is None or token_type != "refresh" or not jti or not familia:
             raise credentials_exception
             
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
@@ -163,13 +199,29 @@ async def refresh_token(
     if not user or not user.ativo:
         raise credentials_exception
     
+    # Refresh tokens emitidos antes de uma troca de senha são rejeitados
+    if payload.get("ver", 0) != user.token_version:
+        raise credentials_exception
+    
+    # Rotação: invalida o token apresentado e registra o próximo da família
+    await rotacionar_refresh_token(session, jti, familia)
+    new_jti, _ = registrar_refresh_token(session, user.id, familia=familia)
+    await session.commit()
+    
     # Gera novos tokens com informações atualizadas do usuário
     new_access_token = create_access_token(
         user_id=user.id,
         email=user.email,
-        perfil=user.perfil.value
+        perfil=user.perfil.value,
+        token_version=user.token_version,
+        familia=familia
+    )
+    new_refresh_token = create_refresh_token(
+        user_id=user.id,
+        token_version=user.token_version,
+        jti=new_jti,
+        familia=familia
     )
-    new_refresh_token = create_refresh_token(user_id=user.id)
     
     return {
         "access_token": new_access_token,
@@ -178,9 +230,36 @@ async def refresh_token(
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_data: TokenRefresh,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    ## Logout
+    
+    Encerra a sessão do refresh_token informado: todos os refresh tokens
+    da mesma família são revogados e os access tokens emitidos para ela
+    deixam de ser aceitos.
+    """
+    payload = decode_token(token_data.refresh_token)
+    familia = payload.get("fam")
+    
+    if payload.get("type") != "refresh" or not familia:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não foi possível validar o refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    await revogar_familia(session, familia)
+    
+    return None
+
+
 @router.get("/me/token", response_model=TokenData)
 async def get_token_info(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_full)
 ):
     """
     ## Informações do Token (Scopes)
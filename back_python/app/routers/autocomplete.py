@@ -0,0 +1,64 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from app.models.user import User, UserRole
+from app.schemas.autocomplete import AutocompleteItem, AutocompleteResponse, TipoAutocomplete
+from app.core.security import get_current_user
+from app.core.autocomplete import indice_nomes
+
+router = APIRouter(prefix="/autocomplete", tags=["Autocomplete"])
+
+
+# Tipos visíveis por perfil (mesmas regras dos endpoints /buscar)
+TIPOS_POR_PERFIL = {
+    UserRole.ADMIN: list(TipoAutocomplete),
+    UserRole.PROFESSOR: list(TipoAutocomplete),
+    UserRole.SERVIDOR: list(TipoAutocomplete),
+    UserRole.ALUNO: [TipoAutocomplete.ALUNO, TipoAutocomplete.TURMA, TipoAutocomplete.DISCIPLINA],
+}
+
+
+@router.get(
+    "/",
+    response_model=AutocompleteResponse,
+    summary="Sugestões de nomes enquanto o usuário digita"
+)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Início do nome ou de um sobrenome (acentos ignorados)"),
+    tipos: Optional[List[TipoAutocomplete]] = Query(None, description="Tipos a incluir (padrão: todos os visíveis ao perfil)"),
+    limit: int = Query(10, ge=1, le=50, description="Máximo de sugestões"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sugestões de alunos, professores, servidores, turmas e disciplinas
+    cujo nome (ou um sobrenome) começa com `q`.
+
+    Responde a partir de um índice em memória, sem consultar o banco.
+    Alterações feitas em outro worker aparecem após a próxima
+    reconstrução do índice (AUTOCOMPLETE_REBUILD_SECONDS).
+
+    **Permissão**: Todos os usuários autenticados
+    - ADMIN, PROFESSOR e SERVIDOR: todos os tipos
+    - ALUNO: apenas o próprio cadastro de aluno, turmas e disciplinas
+    """
+    visiveis = TIPOS_POR_PERFIL.get(current_user.perfil, [])
+
+    if tipos:
+        proibidos = [tipo.value for tipo in tipos if tipo not in visiveis]
+        if proibidos:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Você não tem permissão para buscar: {', '.join(proibidos)}"
+            )
+    else:
+        tipos = visiveis
+
+    itens = indice_nomes.buscar(
+        q,
+        [tipo.value for tipo in tipos],
+        limite=limit,
+        somente_usuario_aluno=current_user.id if current_user.perfil == UserRole.ALUNO else None
+    )
+
+    return AutocompleteResponse(
+        items=[AutocompleteItem(tipo=item.tipo, id=item.id, nome=item.nome) for item in itens]
+    )
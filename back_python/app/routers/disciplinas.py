@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
 from app.models.disciplina import Disciplina
 from app.models.user import User, UserRole
 from app.schemas.disciplina import (
@@ -13,6 +13,9 @@ from app.schemas.disciplina import (
     DisciplinaListResponse
 )
 from app.core.security import get_current_user
+from app.core.autocomplete import indice_nomes
+from app.core.pagination import Paginacao
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca
 
 router = APIRouter(prefix="/disciplinas", tags=["Disciplinas"])
 
@@ -57,6 +60,7 @@ async def create_disciplina(
     disciplina = Disciplina(**disciplina_data.model_dump())
     session.add(disciplina)
     await session.commit()
+    indice_nomes.atualizar(disciplina)
     await session.refresh(disciplina)
     
     return disciplina
@@ -70,7 +74,8 @@ async def create_disciplina(
 async def list_disciplinas(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -90,15 +95,20 @@ async def list_disciplinas(
     total = result.scalar()
     
     # Buscar registros com paginação
-    query = query.offset(offset).limit(limit).order_by(Disciplina.nome)
-    result = await session.execute(query)
-    disciplinas = result.scalars().all()
+    # Desempate por ID para uma ordem estável (necessária no modo cursor)
+    pagina = Paginacao(
+        [(Disciplina.nome, False), (Disciplina.id_disciplina, False)],
+        limit=limit, offset=offset, cursor=cursor
+    )
+    result = await session.execute(pagina.aplicar(query))
+    disciplinas, next_cursor = pagina.resultado(result.scalars().all())
     
     return DisciplinaListResponse(
         items=disciplinas,
         total=total,
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -110,7 +120,8 @@ async def list_disciplinas(
 async def get_disciplina(
     disciplina_id: int = Query(None, description="ID da disciplina"),
     nome: str = Query(None, description="Nome da disciplina (busca parcial)"),
-    session: AsyncSession = Depends(get_session),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -119,6 +130,7 @@ async def get_disciplina(
     **Parâmetros de busca** (forneça pelo menos um):
     - **disciplina_id**: Busca exata por ID
     - **nome**: Busca parcial por nome (LIKE)
+    - **busca**: `ilike` ou `trigram` (ignora acentos, ordena por similaridade)
     
     **Permissão**: ADMIN, PROFESSOR e ALUNO
     """
@@ -133,14 +145,15 @@ async def get_disciplina(
     query = select(Disciplina).where(Disciplina.is_deleted == False)
     
     # Aplicar filtros conforme parâmetros fornecidos
+    busca = BuscaNome(session, modo_busca)
     if disciplina_id:
         query = query.where(Disciplina.id_disciplina == disciplina_id)
     if nome:
-        query = query.where(Disciplina.nome.ilike(f"%{nome}%"))
+        query = query.where(busca.filtro(Disciplina.nome, nome))
     
-    # Executar busca
-    result = await session.execute(query)
-    disciplina = result.scalar_one_or_none()
+    # Executar busca (vários resultados: a mais parecida / de menor ID)
+    result = await busca.executar(query.order_by(*busca.ordem(), Disciplina.id_disciplina))
+    disciplina = result.scalars().first()
     
     if not disciplina:
         raise HTTPException(
@@ -158,7 +171,7 @@ async def get_disciplina(
 )
 async def get_disciplina_by_id(
     disciplina_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -230,6 +243,7 @@ async def update_disciplina(
     disciplina.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(disciplina)
     await session.refresh(disciplina)
     
     return disciplina
@@ -281,5 +295,6 @@ async def delete_disciplina(
     disciplina.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(disciplina)
     
     return None
@@ -1,13 +1,22 @@
 from datetime import datetime
+from enum import Enum
 import base64
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import hashlib
+from functools import partial
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.database.session import get_session
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import defer
+from app.database.session import get_session, get_read_session
+from app.models.evento import Evento
 from app.models.galeria import Galeria
 from app.models.user import User, UserRole
 from app.schemas.galeria import (
+    GaleriaBase,
     GaleriaCreate,
     GaleriaUpdate,
     GaleriaResponse,
@@ -15,9 +24,254 @@ from app.schemas.galeria import (
     GaleriaListResponse
 )
 from app.core.security import get_current_user
+from app.core.pagination import ModoTotal, Paginacao
+from app.core.blob_store import BlobNaoEncontrado, blob_store, calcular_chave, detectar_mime
+from app.core.config import settings
+from app.core.derivados import MIME_POR_EXTENSAO, chave_derivado, extensao_miniatura, gerador_derivados
+from app.core.upload import ArquivoRecebido, receber_multipart
+from app.core.zip_stream import EntradaZip, stream_zip
+from app.core.response_cache import cache_respostas
+from app.repositories.blobs import BlobRepository, reservar_blob
 
 router = APIRouter(prefix="/galeria", tags=["Galeria"])
 
+# Tamanho de cada SELECT substr(...) ao transmitir imagens legadas (BYTEA)
+CHUNK_LEGADO = 256 * 1024
+
+
+class FormatoImagem(str, Enum):
+    """Formato pedido em ?formato= (original = mesmo formato do arquivo enviado)"""
+    ORIGINAL = "original"
+    WEBP = "webp"
+
+
+# Cache-Control das imagens: com ?v=<image_hash> a URL identifica o
+# conteúdo e pode ficar em cache indefinidamente; sem ele o navegador
+# revalida a cada uso (If-None-Match -> 304)
+CACHE_IMUTAVEL = "private, max-age=31536000, immutable"
+CACHE_REVALIDAR = "private, no-cache"
+
+# Extensão dos arquivos no ZIP do álbum
+EXTENSAO_POR_MIME = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+
+# Corpo dos endpoints de upload na documentação (o corpo é lido em
+# streaming por receber_multipart, não por parâmetros Form/File)
+FORMULARIO_UPLOAD = {
+    "requestBody": {
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "arquivo": {"type": "string", "format": "binary"},
+                        "id_evento": {"type": "integer"},
+                        "descricao": {"type": "string", "maxLength": 255},
+                        "data": {"type": "string", "format": "date"},
+                    },
+                }
+            }
+        },
+        "required": True,
+    }
+}
+
+
+# has_image e image_size calculados no banco: as consultas de metadados
+# não transferem a coluna legada `imagem` (BYTEA)
+POSSUI_IMAGEM = or_(Galeria.imagem_chave.is_not(None), Galeria.imagem.is_not(None)).label("has_image")
+TAMANHO_IMAGEM = func.coalesce(Galeria.imagem_tamanho, func.length(Galeria.imagem)).label("image_size")
+
+
+def _select_metadados():
+    """
+    select(Galeria, has_image, image_size) sem carregar os bytes
+
+    A coluna `imagem` fica adiada com raiseload: acessá-la no objeto
+    levanta erro em vez de disparar outra consulta.
+    """
+    return (
+        select(Galeria, POSSUI_IMAGEM, TAMANHO_IMAGEM)
+        .options(defer(Galeria.imagem, raiseload=True))
+    )
+
+
+# Colunas recarregadas após o commit: todas, menos os bytes legados
+COLUNAS_METADADOS = [coluna.key for coluna in Galeria.__table__.columns if coluna.key != "imagem"]
+
+
+async def _recarregar(session: AsyncSession, galeria: Galeria) -> None:
+    """refresh() sem a coluna `imagem` (linhas novas não têm as opções de _select_metadados)"""
+    await session.refresh(galeria, attribute_names=COLUNAS_METADADOS)
+
+
+def _resposta(galeria: Galeria, has_image: bool, image_size: Optional[int]) -> GaleriaResponse:
+    response = GaleriaResponse.model_validate(galeria)
+    response.has_image = has_image
+    response.image_size = image_size
+    response.image_hash = galeria.imagem_chave
+    return response
+
+
+async def _definir_imagem(
+    session: AsyncSession,
+    galeria: Galeria,
+    chave: str,
+    tamanho: int,
+    mime: str
+) -> None:
+    """
+    Aponta a linha para o blob `chave` (referências contadas na mesma transação)
+
+    Os derivados são agendados pela rota, só depois do commit: antes
+    dele a troca ainda pode ser desfeita.
+    """
+    await BlobRepository(session).trocar_referencia(galeria.imagem_chave, chave, tamanho, mime)
+    galeria.imagem_chave = chave
+    galeria.imagem_tamanho = tamanho
+    galeria.imagem_mime = mime
+    galeria.imagem = None
+
+
+async def _salvar_imagem(session: AsyncSession, galeria: Galeria, imagem_base64: str) -> None:
+    """Decodifica o Base64, grava no blob store e guarda chave/tamanho/mime"""
+    try:
+        imagem_bytes = base64.b64decode(imagem_base64)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Erro ao decodificar imagem Base64: {str(e)}"
+        )
+    
+    chave = calcular_chave(imagem_bytes)
+    mime = detectar_mime(imagem_bytes[:16]) or "application/octet-stream"
+    await reservar_blob(chave, len(imagem_bytes), mime)
+    _, tamanho = await blob_store.salvar(imagem_bytes)
+    await _definir_imagem(session, galeria, chave, tamanho, mime)
+
+
+async def _guardar_arquivo(session: AsyncSession, galeria: Galeria, arquivo: ArquivoRecebido) -> None:
+    """Move o upload recebido para o blob store e guarda chave/tamanho/mime"""
+    await reservar_blob(arquivo.chave, arquivo.tamanho, arquivo.mime)
+    await blob_store.salvar_arquivo(arquivo.caminho, arquivo.chave)
+    await _definir_imagem(session, galeria, arquivo.chave, arquivo.tamanho, arquivo.mime)
+
+
+def _extensao_solicitada(
+    galeria: Galeria,
+    size: Optional[int],
+    formato: FormatoImagem
+) -> Optional[str]:
+    """
+    Extensão do derivado pedido, ou None para o original
+
+    Raises:
+        HTTPException 400: tamanho fora de GALERIA_DERIVADOS_TAMANHOS
+        HTTPException 409: imagem legada (sem derivados)
+    """
+    if size is None and formato == FormatoImagem.ORIGINAL:
+        return None
+    
+    if size is not None and size not in gerador_derivados.tamanhos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tamanho inválido. Disponíveis: {', '.join(map(str, gerador_derivados.tamanhos))}"
+        )
+    
+    if not galeria.imagem_chave:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Miniaturas e WebP disponíveis apenas após migrar a imagem para o blob store"
+        )
+    
+    return "webp" if formato == FormatoImagem.WEBP else extensao_miniatura(galeria.imagem_mime)
+
+
+def _etag(
+    galeria: Galeria,
+    size: Optional[int],
+    formato: FormatoImagem,
+    sufixo: str = ""
+) -> Optional[str]:
+    """
+    ETag forte da versão pedida, a partir do hash guardado (sem ler os bytes)
+
+    None para imagens legadas, que não têm hash até serem migradas.
+    """
+    extensao = _extensao_solicitada(galeria, size, formato)
+    if not galeria.imagem_chave:
+        return None
+    if extensao is None:
+        return f'"{galeria.imagem_chave}{sufixo}"'
+    return f'"{chave_derivado(galeria.imagem_chave, size, extensao)}{sufixo}"'
+
+
+def _etag_confere(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match casa com `etag` (comparação fraca, como manda a RFC 9110)"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = [candidato.strip().removeprefix("W/") for candidato in if_none_match.split(",")]
+    return etag in candidatos
+
+
+def _cabecalhos_cache(galeria: Galeria, etag: Optional[str], versao: Optional[str]) -> dict:
+    """ETag e Cache-Control (imutável quando ?v= é o hash atual da imagem)"""
+    if not etag:
+        return {"Cache-Control": CACHE_REVALIDAR}
+    imutavel = versao is not None and versao == galeria.imagem_chave
+    return {"ETag": etag, "Cache-Control": CACHE_IMUTAVEL if imutavel else CACHE_REVALIDAR}
+
+
+async def _versao_solicitada(
+    galeria: Galeria,
+    size: Optional[int],
+    formato: FormatoImagem
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (chave no blob store, mime) da versão pedida: o original ou um derivado
+
+    A chave é None para o original de imagens legadas (bytes no banco).
+
+    Raises:
+        HTTPException 400/409: ver _extensao_solicitada
+        HTTPException 422: o arquivo não pôde ser processado
+    """
+    extensao = _extensao_solicitada(galeria, size, formato)
+    if extensao is None:
+        return galeria.imagem_chave, galeria.imagem_mime
+    
+    try:
+        chave = await gerador_derivados.obter(galeria.imagem_chave, size, extensao)
+    except BlobNaoEncontrado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Arquivo da imagem não encontrado no armazenamento"
+        )
+    if chave is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Não foi possível gerar a versão solicitada desta imagem"
+        )
+    return chave, MIME_POR_EXTENSAO[extensao]
+
+
+def _validar_campos(schema, campos: dict):
+    """Valida os campos de texto do formulário com o schema (422 como no JSON)"""
+    try:
+        return schema(**{
+            nome: valor for nome, valor in campos.items()
+            if nome in schema.model_fields and nome != "imagem_base64" and valor != ""
+        })
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
 
 @router.post(
     "/",
@@ -44,30 +298,67 @@ async def create_galeria(
             detail="Apenas administradores e professores podem adicionar imagens"
         )
     
-    # Converter Base64 para bytes
-    imagem_bytes = None
+    # Criar registro (bytes da imagem vão para o blob store)
+    galeria_dict = galeria_data.model_dump(exclude={"imagem_base64"})
+    galeria = Galeria(**galeria_dict)
     if galeria_data.imagem_base64:
-        try:
-            imagem_bytes = base64.b64decode(galeria_data.imagem_base64)
-        except Exception as e:
+        await _salvar_imagem(session, galeria, galeria_data.imagem_base64)
+    
+    session.add(galeria)
+    await session.commit()
+    await _recarregar(session, galeria)
+    if galeria.imagem_chave:
+        gerador_derivados.agendar(galeria.imagem_chave)
+    
+    # Preparar resposta (sem dados binários)
+    return _resposta(galeria, galeria.imagem_chave is not None, galeria.imagem_tamanho)
+
+
+@router.post(
+    "/upload",
+    response_model=GaleriaResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Enviar nova imagem (multipart/form-data)",
+    openapi_extra=FORMULARIO_UPLOAD
+)
+async def upload_galeria(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Adicionar imagem à galeria enviando o arquivo em multipart/form-data.
+    
+    Campos: `arquivo` (obrigatório), `id_evento`, `descricao` e `data`.
+    
+    O arquivo é gravado em blocos conforme chega, sem Base64 e sem ficar
+    inteiro em memória. Limite: GALERIA_UPLOAD_MAX_BYTES. Formatos
+    aceitos (verificados pelo conteúdo): JPEG, PNG, GIF e WEBP.
+    
+    **Permissão**: ADMIN e PROFESSOR
+    """
+    # Verificar permissão (antes de ler o corpo)
+    if current_user.perfil not in [UserRole.ADMIN, UserRole.PROFESSOR]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores e professores podem adicionar imagens"
+        )
+    
+    async with receber_multipart(request, "arquivo", settings.GALERIA_UPLOAD_MAX_BYTES) as (campos, arquivo):
+        if arquivo is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Erro ao decodificar imagem Base64: {str(e)}"
+                detail="Envie a imagem no campo 'arquivo'"
             )
-    
-    # Criar registro
-    galeria_dict = galeria_data.model_dump(exclude={"imagem_base64"})
-    galeria = Galeria(**galeria_dict, imagem=imagem_bytes)
+        galeria = Galeria(**_validar_campos(GaleriaBase, campos).model_dump())
+        await _guardar_arquivo(session, galeria, arquivo)
     
     session.add(galeria)
     await session.commit()
-    await session.refresh(galeria)
-    
-    # Preparar resposta (sem dados binários)
-    response = GaleriaResponse.model_validate(galeria)
-    response.has_image = galeria.imagem is not None
+    await _recarregar(session, galeria)
+    gerador_derivados.agendar(galeria.imagem_chave)
     
-    return response
+    return _resposta(galeria, True, galeria.imagem_tamanho)
 
 
 @router.get(
@@ -78,47 +369,55 @@ async def create_galeria(
 async def list_galeria(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
     id_evento: int = Query(None, description="Filtrar por ID do evento"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Listar imagens da galeria com paginação.
     
+    Respostas em cache por parâmetros (app/core/response_cache.py),
+    invalidadas a cada escrita na galeria.
+    
     **Permissão**: Todos os usuários autenticados
     """
-    # Construir query base (apenas registros não deletados)
-    query = select(Galeria).where(Galeria.is_deleted == False)
-    count_query = select(func.count()).select_from(Galeria).where(
-        Galeria.is_deleted == False
-    )
+    async def carregar(session: AsyncSession) -> GaleriaListResponse:
+        # Construir query base (apenas registros não deletados)
+        query = _select_metadados().where(Galeria.is_deleted == False)
+        count_query = select(func.count()).select_from(Galeria).where(
+            Galeria.is_deleted == False
+        )
+        
+        # Filtrar por evento se especificado
+        if id_evento:
+            query = query.where(Galeria.id_evento == id_evento)
+            count_query = count_query.where(Galeria.id_evento == id_evento)
+        
+        # Buscar registros com paginação
+        pagina = Paginacao(
+            [(Galeria.data, True), (Galeria.id_imagem, True)],
+            limit=limit, offset=offset, cursor=cursor, total=modo_total
+        )
+        linhas, total, next_cursor = await pagina.executar(
+            session, query, count_query, escalar=False, entidade=lambda linha: linha[0]
+        )
+        
+        # Preparar respostas (sem dados binários)
+        items = [_resposta(*linha) for linha in linhas]
+        
+        return GaleriaListResponse(
+            items=items,
+            total=total,
+            offset=offset,
+            limit=limit,
+            next_cursor=next_cursor
+        )
     
-    # Filtrar por evento se especificado
-    if id_evento:
-        query = query.where(Galeria.id_evento == id_evento)
-        count_query = count_query.where(Galeria.id_evento == id_evento)
-    
-    # Contar total
-    result = await session.execute(count_query)
-    total = result.scalar()
-    
-    # Buscar registros com paginação
-    query = query.offset(offset).limit(limit).order_by(Galeria.data.desc(), Galeria.id_imagem.desc())
-    result = await session.execute(query)
-    galerias = result.scalars().all()
-    
-    # Preparar respostas (sem dados binários)
-    items = []
-    for galeria in galerias:
-        response = GaleriaResponse.model_validate(galeria)
-        response.has_image = galeria.imagem is not None
-        items.append(response)
-    
-    return GaleriaListResponse(
-        items=items,
-        total=total,
-        offset=offset,
-        limit=limit
+    return await cache_respostas.obter(
+        ("list_galeria", offset, limit, cursor, modo_total, id_evento),
+        [Galeria.__tablename__], session, carregar
     )
 
 
@@ -129,7 +428,7 @@ async def list_galeria(
 )
 async def get_galeria(
     galeria_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -140,23 +439,20 @@ async def get_galeria(
     **Permissão**: Todos os usuários autenticados
     """
     result = await session.execute(
-        select(Galeria).where(
+        _select_metadados().where(
             Galeria.id_imagem == galeria_id,
             Galeria.is_deleted == False
         )
     )
-    galeria = result.scalar_one_or_none()
+    linha = result.one_or_none()
     
-    if not galeria:
+    if not linha:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Imagem não encontrada"
         )
     
-    response = GaleriaResponse.model_validate(galeria)
-    response.has_image = galeria.imagem is not None
-    
-    return response
+    return _resposta(*linha)
 
 
 @router.get(
@@ -166,36 +462,74 @@ async def get_galeria(
 )
 async def get_galeria_image(
     galeria_id: int,
-    session: AsyncSession = Depends(get_session),
+    response: Response,
+    size: Optional[int] = Query(None, description="Miniatura: lado máximo em px (ver GALERIA_DERIVADOS_TAMANHOS)"),
+    formato: FormatoImagem = Query(FormatoImagem.ORIGINAL, description="original ou webp"),
+    if_none_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Baixar imagem da galeria em formato Base64.
     
+    Mantido por compatibilidade: prefira /galeria/{galeria_id}/raw, que
+    envia os bytes sem Base64 e em blocos.
+    
+    `size` e `formato=webp` retornam uma miniatura / versão WebP.
+    
+    Responde 304 quando If-None-Match confere com o ETag (hash da
+    imagem + descrição), sem ler a imagem.
+    
     **Permissão**: Todos os usuários autenticados
     """
     result = await session.execute(
-        select(Galeria).where(
+        _select_metadados().where(
             Galeria.id_imagem == galeria_id,
             Galeria.is_deleted == False
         )
     )
-    galeria = result.scalar_one_or_none()
+    linha = result.one_or_none()
     
-    if not galeria:
+    if not linha:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Imagem não encontrada"
         )
+    galeria, has_image, _ = linha
     
-    if not galeria.imagem:
+    if not has_image:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Esta imagem não possui arquivo associado"
         )
     
+    # O JSON inclui a descrição: ela também entra no ETag (e a resposta
+    # não é imutável, pois a descrição pode mudar)
+    descricao = hashlib.sha256((galeria.descricao or "").encode("utf-8")).hexdigest()[:16]
+    etag = _etag(galeria, size, formato, sufixo=f".b64.{descricao}")
+    cabecalhos = _cabecalhos_cache(galeria, etag, None)
+    if _etag_confere(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    
+    # Bytes do blob store (ou da coluna legada, se ainda não migrada)
+    chave, _ = await _versao_solicitada(galeria, size, formato)
+    if chave:
+        try:
+            imagem_bytes = await blob_store.ler(chave)
+        except BlobNaoEncontrado:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Arquivo da imagem não encontrado no armazenamento"
+            )
+    else:
+        result = await session.execute(
+            select(Galeria.imagem).where(Galeria.id_imagem == galeria_id)
+        )
+        imagem_bytes = result.scalar()
+    
     # Converter bytes para Base64
-    imagem_base64 = base64.b64encode(galeria.imagem).decode('utf-8')
+    imagem_base64 = base64.b64encode(imagem_bytes).decode('utf-8')
     
     return GaleriaImageResponse(
         id_imagem=galeria.id_imagem,
@@ -204,6 +538,252 @@ async def get_galeria_image(
     )
 
 
+def _faixa_solicitada(cabecalho: Optional[str], tamanho: int) -> Optional[Tuple[int, int]]:
+    """
+    (início, fim inclusive) pedidos no cabeçalho Range, ou None para o arquivo inteiro
+
+    Aceita uma única faixa: bytes=a-b, bytes=a- ou bytes=-n (últimos n
+    bytes). Múltiplas faixas ou sintaxe inválida são ignoradas, e a
+    resposta é o arquivo inteiro (RFC 9110).
+
+    Raises:
+        HTTPException 416: faixa começa depois do fim do arquivo
+    """
+    if not cabecalho or not cabecalho.startswith("bytes=") or "," in cabecalho:
+        return None
+
+    inicio_txt, separador, fim_txt = cabecalho[len("bytes="):].strip().partition("-")
+    numeros = [txt for txt in (inicio_txt, fim_txt) if txt]
+    if not separador or not numeros or not all(txt.isdigit() for txt in numeros):
+        return None
+
+    if inicio_txt:
+        inicio = int(inicio_txt)
+        fim = int(fim_txt) if fim_txt else tamanho - 1
+        if fim_txt and fim < inicio:
+            return None
+    else:
+        # Sufixo: últimos n bytes (bytes=-0 não pede nada)
+        inicio = max(tamanho - int(fim_txt), 0) if int(fim_txt) else tamanho
+        fim = tamanho - 1
+
+    if inicio >= tamanho:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Faixa solicitada fora do arquivo",
+            headers={"Content-Range": f"bytes */{tamanho}"}
+        )
+    return inicio, min(fim, tamanho - 1)
+
+
+async def _stream_legado(bind, galeria_id: int, inicio: int, fim: int) -> AsyncIterator[bytes]:
+    """
+    Bytes de uma imagem ainda na coluna BYTEA, em blocos de CHUNK_LEGADO
+
+    Cada bloco é um SELECT substr(imagem, ...): o banco envia só o
+    trecho pedido. Usa sessão própria porque a da requisição é fechada
+    antes do corpo da resposta ser enviado.
+    """
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        posicao = inicio
+        while posicao <= fim:
+            result = await session.execute(
+                select(func.substr(Galeria.imagem, posicao + 1, min(CHUNK_LEGADO, fim - posicao + 1)))
+                .where(Galeria.id_imagem == galeria_id)
+            )
+            bloco = result.scalar()
+            if not bloco:
+                break
+            yield bloco
+            posicao += len(bloco)
+
+
+@router.get(
+    "/{galeria_id}/raw",
+    summary="Baixar imagem em binário (com suporte a Range)",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"image/*": {}}, "description": "Imagem completa"},
+        206: {"content": {"image/*": {}}, "description": "Trecho pedido no cabeçalho Range"},
+        416: {"description": "Faixa fora do arquivo"},
+    }
+)
+async def get_galeria_raw(
+    galeria_id: int,
+    size: Optional[int] = Query(None, description="Miniatura: lado máximo em px (ver GALERIA_DERIVADOS_TAMANHOS)"),
+    formato: FormatoImagem = Query(FormatoImagem.ORIGINAL, description="original ou webp"),
+    v: Optional[str] = Query(None, description="image_hash da imagem: a resposta pode ficar em cache permanente"),
+    if_none_match: Optional[str] = Header(None),
+    range_: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Baixar a imagem em binário, transmitida em blocos.
+
+    Evita o custo do Base64 de /galeria/{galeria_id}/image (cerca de 33%
+    a mais de dados e a imagem inteira em memória). Atende `Range:
+    bytes=início-fim` com 206 Partial Content.
+    
+    - size: miniatura que cabe num quadrado de size×size px (valores
+      de GALERIA_DERIVADOS_TAMANHOS)
+    - formato=webp: versão WebP (da miniatura ou do tamanho original)
+    
+    Derivados são gerados em segundo plano no upload; se ainda não
+    existirem, são gerados nesta requisição.
+    
+    Cache: o ETag é o hash do conteúdo, e If-None-Match que confere
+    recebe 304 sem ler a imagem. Use `v=<image_hash>` (campo dos
+    metadados) para uma URL que pode ficar em cache permanentemente
+    (Cache-Control: immutable); ao trocar a imagem, o hash e a URL mudam.
+
+    **Permissão**: Todos os usuários autenticados
+    """
+    result = await session.execute(
+        _select_metadados().where(
+            Galeria.id_imagem == galeria_id,
+            Galeria.is_deleted == False
+        )
+    )
+    linha = result.one_or_none()
+    
+    if not linha:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Imagem não encontrada"
+        )
+    galeria, has_image, image_size = linha
+    
+    if not has_image:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Esta imagem não possui arquivo associado"
+        )
+    
+    etag = _etag(galeria, size, formato)
+    cabecalhos = _cabecalhos_cache(galeria, etag, v)
+    if _etag_confere(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    
+    chave, mime = await _versao_solicitada(galeria, size, formato)
+    if chave:
+        try:
+            tamanho = await blob_store.tamanho(chave)
+        except BlobNaoEncontrado:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Arquivo da imagem não encontrado no armazenamento"
+            )
+    else:
+        # Imagem legada: tipo pelos primeiros bytes da coluna
+        tamanho = image_size
+        result = await session.execute(
+            select(func.substr(Galeria.imagem, 1, 16)).where(Galeria.id_imagem == galeria_id)
+        )
+        mime = detectar_mime(result.scalar() or b"")
+    
+    # If-Range: a faixa só vale se o cliente ainda tem a mesma versão
+    if if_range is not None and if_range != etag:
+        range_ = None
+    faixa = _faixa_solicitada(range_, tamanho)
+    inicio, fim = faixa or (0, tamanho - 1)
+    
+    headers = {
+        **cabecalhos,
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(fim - inicio + 1),
+    }
+    if faixa:
+        headers["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+    
+    if chave:
+        corpo = blob_store.stream(chave, inicio, fim)
+    else:
+        corpo = _stream_legado(session.bind, galeria_id, inicio, fim)
+    
+    return StreamingResponse(
+        corpo,
+        status_code=status.HTTP_206_PARTIAL_CONTENT if faixa else status.HTTP_200_OK,
+        media_type=mime or "application/octet-stream",
+        headers=headers
+    )
+
+
+@router.get(
+    "/evento/{id_evento}/zip",
+    summary="Baixar todas as imagens de um evento em ZIP",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/zip": {}}, "description": "Álbum do evento"}}
+)
+async def get_galeria_evento_zip(
+    id_evento: int,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Baixar as imagens (não excluídas) de um evento num único arquivo ZIP.
+    
+    O ZIP é montado e enviado em blocos, direto do blob store: o consumo
+    de memória não depende do tamanho do álbum. As imagens vão sem
+    compressão (já são comprimidas), com nome `<data>_<id_imagem>.<ext>`.
+    
+    **Permissão**: Todos os usuários autenticados
+    """
+    result = await session.execute(
+        select(Evento.id_evento).where(
+            Evento.id_evento == id_evento,
+            Evento.is_deleted == False
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evento não encontrado"
+        )
+    
+    # Só metadados: os bytes são lidos durante o envio
+    result = await session.execute(
+        select(
+            Galeria.id_imagem,
+            Galeria.imagem_chave,
+            Galeria.imagem_mime,
+            TAMANHO_IMAGEM,
+            func.substr(Galeria.imagem, 1, 16),
+            Galeria.data,
+            Galeria.criado_em
+        )
+        .where(
+            Galeria.id_evento == id_evento,
+            Galeria.is_deleted == False,
+            POSSUI_IMAGEM
+        )
+        .order_by(Galeria.data, Galeria.id_imagem)
+    )
+    
+    entradas = []
+    for id_imagem, chave, mime, tamanho, inicio_legado, data, criado_em in result.all():
+        if chave:
+            abrir = partial(blob_store.stream, chave)
+        else:
+            # Imagem legada: tipo pelos primeiros bytes da coluna
+            mime = detectar_mime(inicio_legado or b"")
+            abrir = partial(_stream_legado, session.bind, id_imagem, 0, tamanho - 1)
+        extensao = EXTENSAO_POR_MIME.get(mime, "bin")
+        entradas.append(EntradaZip(
+            nome=f"{data.isoformat()}_{id_imagem}.{extensao}",
+            modificado_em=criado_em,
+            tamanho=tamanho,
+            abrir=abrir
+        ))
+    
+    return StreamingResponse(
+        stream_zip(entradas, ignorar=(BlobNaoEncontrado,)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="evento-{id_evento}.zip"'}
+    )
+
+
 @router.put(
     "/{galeria_id}",
     response_model=GaleriaResponse,
@@ -229,18 +809,19 @@ async def update_galeria(
     
     # Buscar imagem
     result = await session.execute(
-        select(Galeria).where(
+        _select_metadados().where(
             Galeria.id_imagem == galeria_id,
             Galeria.is_deleted == False
         )
     )
-    galeria = result.scalar_one_or_none()
+    linha = result.one_or_none()
     
-    if not galeria:
+    if not linha:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Imagem não encontrada"
         )
+    galeria, has_image, image_size = linha
     
     # Atualizar campos
     update_data = galeria_data.model_dump(exclude_unset=True, exclude={"imagem_base64"})
@@ -249,23 +830,78 @@ async def update_galeria(
     
     # Atualizar imagem se fornecida
     if galeria_data.imagem_base64:
-        try:
-            galeria.imagem = base64.b64decode(galeria_data.imagem_base64)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Erro ao decodificar imagem Base64: {str(e)}"
-            )
+        await _salvar_imagem(session, galeria, galeria_data.imagem_base64)
+        has_image, image_size = True, galeria.imagem_tamanho
     
     galeria.atualizado_em = datetime.utcnow()
     
     await session.commit()
-    await session.refresh(galeria)
+    await _recarregar(session, galeria)
+    if galeria_data.imagem_base64:
+        gerador_derivados.agendar(galeria.imagem_chave)
     
-    response = GaleriaResponse.model_validate(galeria)
-    response.has_image = galeria.imagem is not None
+    return _resposta(galeria, has_image, image_size)
+
+
+@router.put(
+    "/{galeria_id}/upload",
+    response_model=GaleriaResponse,
+    summary="Substituir imagem (multipart/form-data)",
+    openapi_extra=FORMULARIO_UPLOAD
+)
+async def upload_update_galeria(
+    galeria_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Atualizar imagem da galeria enviando o arquivo em multipart/form-data.
     
-    return response
+    Mesmos campos e limites de POST /galeria/upload; todos opcionais.
+    
+    **Permissão**: ADMIN e PROFESSOR
+    """
+    # Verificar permissão (antes de ler o corpo)
+    if current_user.perfil not in [UserRole.ADMIN, UserRole.PROFESSOR]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores e professores podem atualizar imagens"
+        )
+    
+    # Buscar imagem
+    result = await session.execute(
+        _select_metadados().where(
+            Galeria.id_imagem == galeria_id,
+            Galeria.is_deleted == False
+        )
+    )
+    linha = result.one_or_none()
+    
+    if not linha:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Imagem não encontrada"
+        )
+    galeria, has_image, image_size = linha
+    
+    async with receber_multipart(request, "arquivo", settings.GALERIA_UPLOAD_MAX_BYTES) as (campos, arquivo):
+        update_data = _validar_campos(GaleriaUpdate, campos).model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(galeria, field, value)
+        
+        if arquivo is not None:
+            await _guardar_arquivo(session, galeria, arquivo)
+            has_image, image_size = True, arquivo.tamanho
+    
+    galeria.atualizado_em = datetime.utcnow()
+    
+    await session.commit()
+    await _recarregar(session, galeria)
+    if arquivo is not None:
+        gerador_derivados.agendar(galeria.imagem_chave)
+    
+    return _resposta(galeria, has_image, image_size)
 
 
 @router.delete(
@@ -293,9 +929,11 @@ async def delete_galeria(
             detail="Apenas administradores e professores podem deletar imagens"
         )
     
-    # Buscar imagem
+    # Buscar imagem (sem os bytes)
     result = await session.execute(
-        select(Galeria).where(
+        select(Galeria)
+        .options(defer(Galeria.imagem, raiseload=True))
+        .where(
             Galeria.id_imagem == galeria_id,
             Galeria.is_deleted == False
         )
@@ -308,10 +946,13 @@ async def delete_galeria(
             detail="Imagem não encontrada"
         )
     
-    # Soft delete
+    # Soft delete (o arquivo continua no blob store enquanto outras
+    # linhas o referenciarem)
     galeria.is_deleted = True
     galeria.deleted_at = datetime.utcnow()
     galeria.atualizado_em = datetime.utcnow()
+    if galeria.imagem_chave:
+        await BlobRepository(session).remover_referencia(galeria.imagem_chave)
     
     await session.commit()
     
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+
+from app.models.user import User
+from app.core.security import require_role, jwt_decode_cache
+from app.core.user_cache import user_cache
+from app.core.password_hasher import password_hasher
+from app.core.token_versions import token_versions
+from app.core.refresh_tokens import revocation_index
+from app.core.rate_limiter import login_rate_limiter
+from app.core.pagination import contagem_cache
+from app.core.response_cache import cache_respostas
+from app.core.autocomplete import indice_nomes
+from app.core.derivados import gerador_derivados
+from app.database.session import pool_stats
+
+
+router = APIRouter(prefix="/metrics", tags=["Métricas"])
+
+
+@router.get("/", response_model=dict)
+async def get_metrics(
+    current_user: User = Depends(require_role("ADMIN"))
+):
+    """
+    ## Métricas internas da aplicação
+    
+    Contadores dos caches e serviços em memória deste processo
+    (cada worker do uvicorn possui os seus).
+    
+    **Autorização:** Requer role ADMIN.
+    """
+    return {
+        "jwt_decode_cache": jwt_decode_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_versions": token_versions.stats(),
+        "revocation_index": revocation_index.stats(),
+        "login_rate_limiter": login_rate_limiter.stats(),
+        "count_cache": contagem_cache.stats(),
+        "response_cache": cache_respostas.stats(),
+        "autocomplete": indice_nomes.stats(),
+        "image_derivatives": gerador_derivados.stats(),
+        "db_pool": pool_stats()
+    }
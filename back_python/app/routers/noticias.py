@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
 from app.models.noticia import Noticia
 from app.models.user import User, UserRole
 from app.schemas.noticia import (
@@ -13,6 +13,8 @@ from app.schemas.noticia import (
     NoticiaListResponse
 )
 from app.core.security import get_current_user
+from app.core.pagination import ModoTotal, Paginacao
+from app.core.response_cache import cache_respostas
 
 router = APIRouter(prefix="/noticias", tags=["Notícias"])
 
@@ -57,34 +59,46 @@ async def create_noticia(
 async def list_noticias(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Listar notícias do sistema com paginação.
     
+    Respostas em cache por parâmetros (app/core/response_cache.py),
+    invalidadas a cada escrita em notícias.
+    
     **Permissão**: Todos os usuários autenticados
     """
-    # Construir query base (apenas registros não deletados)
-    query = select(Noticia).where(Noticia.is_deleted == False)
+    async def carregar(session: AsyncSession) -> NoticiaListResponse:
+        # Construir query base (apenas registros não deletados)
+        query = select(Noticia).where(Noticia.is_deleted == False)
+        
+        # Contar total
+        count_query = select(func.count()).select_from(Noticia).where(
+            Noticia.is_deleted == False
+        )
+        
+        # Buscar registros com paginação (ordenar por data decrescente)
+        pagina = Paginacao(
+            [(Noticia.data, True), (Noticia.id_noticia, True)],
+            limit=limit, offset=offset, cursor=cursor, total=modo_total
+        )
+        noticias, total, next_cursor = await pagina.executar(session, query, count_query)
+        
+        return NoticiaListResponse(
+            items=noticias,
+            total=total,
+            offset=offset,
+            limit=limit,
+            next_cursor=next_cursor
+        )
     
-    # Contar total
-    count_query = select(func.count()).select_from(Noticia).where(
-        Noticia.is_deleted == False
-    )
-    result = await session.execute(count_query)
-    total = result.scalar()
-    
-    # Buscar registros com paginação (ordenar por data decrescente)
-    query = query.offset(offset).limit(limit).order_by(Noticia.data.desc(), Noticia.id_noticia.desc())
-    result = await session.execute(query)
-    noticias = result.scalars().all()
-    
-    return NoticiaListResponse(
-        items=noticias,
-        total=total,
-        offset=offset,
-        limit=limit
+    return await cache_respostas.obter(
+        ("list_noticias", offset, limit, cursor, modo_total),
+        [Noticia.__tablename__], session, carregar
     )
 
 
@@ -95,7 +109,7 @@ async def list_noticias(
 )
 async def get_noticia(
     noticia_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -103,13 +117,19 @@ async def get_noticia(
     
     **Permissão**: Todos os usuários autenticados
     """
-    result = await session.execute(
-        select(Noticia).where(
-            Noticia.id_noticia == noticia_id,
-            Noticia.is_deleted == False
+    async def carregar(session: AsyncSession) -> Optional[NoticiaResponse]:
+        result = await session.execute(
+            select(Noticia).where(
+                Noticia.id_noticia == noticia_id,
+                Noticia.is_deleted == False
+            )
         )
+        noticia = result.scalar_one_or_none()
+        return NoticiaResponse.model_validate(noticia) if noticia else None
+    
+    noticia = await cache_respostas.obter(
+        ("get_noticia", noticia_id), [Noticia.__tablename__], session, carregar
     )
-    noticia = result.scalar_one_or_none()
     
     if not noticia:
         raise HTTPException(
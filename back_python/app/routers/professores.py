@@ -3,7 +3,12 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
+from app.repositories.usuario import (
+    UsuarioRepository,
+    get_usuario_repository,
+    get_usuario_repository_leitura
+)
 from app.models.professor import Professor
 from app.models.user import User, UserRole
 from app.schemas.professor import (
@@ -14,7 +19,10 @@ from app.schemas.professor import (
     VincularUsuarioCreate,
     VincularUsuarioExistente
 )
-from app.core.security import get_current_user, get_password_hash
+from app.core.security import get_current_user, get_password_hash_async
+from app.core.autocomplete import indice_nomes
+from app.core.user_cache import invalidate_user
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca
 
 router = APIRouter(prefix="/professores", tags=["Professores"])
 
@@ -63,6 +71,7 @@ async def create_professor(
     professor = Professor(**professor_data.model_dump())
     session.add(professor)
     await session.commit()
+    indice_nomes.atualizar(professor)
     await session.refresh(professor)
     
     # Preparar resposta com email_usuario como None
@@ -82,7 +91,8 @@ async def create_professor(
 async def list_professores(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -112,24 +122,15 @@ async def list_professores(
     result = await session.execute(query)
     professores = result.scalars().all()
     
-    # Enriquecer com email do usuário quando existir
-    professores_response = []
-    for professor in professores:
-        email_usuario = None
-        if professor.id_usuario:
-            user_result = await session.execute(
-                select(User).where(User.id == professor.id_usuario)
-            )
-            usuario = user_result.scalar_one_or_none()
-            if usuario:
-                email_usuario = usuario.email
-        
-        professores_response.append(
-            ProfessorResponse(
-                **professor.model_dump(),
-                email_usuario=email_usuario
-            )
+    # Enriquecer com email do usuário quando existir (uma consulta por página)
+    emails = await usuarios.emails_por_id(professor.id_usuario for professor in professores)
+    professores_response = [
+        ProfessorResponse(
+            **professor.model_dump(),
+            email_usuario=emails.get(professor.id_usuario)
         )
+        for professor in professores
+    ]
     
     return ProfessorListResponse(
         items=professores_response,
@@ -148,7 +149,9 @@ async def get_professor(
     professor_id: int = Query(None, description="ID do professor"),
     cpf: str = Query(None, description="CPF do professor"),
     nome: str = Query(None, description="Nome do professor (busca parcial)"),
-    session: AsyncSession = Depends(get_session),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -158,6 +161,7 @@ async def get_professor(
     - **professor_id**: Busca exata por ID
     - **cpf**: Busca exata por CPF
     - **nome**: Busca parcial por nome (LIKE)
+    - **busca**: `ilike` ou `trigram` (ignora acentos, ordena por similaridade)
     
     **Permissão**: ADMIN, PROFESSOR e SERVIDOR
     """
@@ -179,16 +183,17 @@ async def get_professor(
     query = select(Professor).where(Professor.is_deleted == False)
     
     # Aplicar filtros conforme parâmetros fornecidos
+    busca = BuscaNome(session, modo_busca)
     if professor_id:
         query = query.where(Professor.id_professor == professor_id)
     if cpf:
         query = query.where(Professor.cpf == cpf)
     if nome:
-        query = query.where(Professor.nome.ilike(f"%{nome}%"))
+        query = query.where(busca.filtro(Professor.nome, nome))
     
-    # Executar busca
-    result = await session.execute(query)
-    professor = result.scalar_one_or_none()
+    # Executar busca (vários resultados: o mais parecido / de menor ID)
+    result = await busca.executar(query.order_by(*busca.ordem(), Professor.id_professor))
+    professor = result.scalars().first()
     
     if not professor:
         raise HTTPException(
@@ -197,14 +202,7 @@ async def get_professor(
         )
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if professor.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == professor.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(professor.id_usuario)
     
     return ProfessorResponse(
         **professor.model_dump(),
@@ -219,7 +217,8 @@ async def get_professor(
 )
 async def get_professor_by_id(
     professor_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -250,14 +249,7 @@ async def get_professor_by_id(
         )
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if professor.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == professor.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(professor.id_usuario)
     
     return ProfessorResponse(
         **professor.model_dump(),
@@ -274,6 +266,7 @@ async def update_professor(
     professor_id: int,
     professor_data: ProfessorUpdate,
     session: AsyncSession = Depends(get_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -326,17 +319,11 @@ async def update_professor(
     professor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(professor)
     await session.refresh(professor)
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if professor.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == professor.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(professor.id_usuario)
     
     return ProfessorResponse(
         **professor.model_dump(),
@@ -390,6 +377,7 @@ async def delete_professor(
     professor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(professor)
     
     return None
 
@@ -488,7 +476,7 @@ async def vincular_usuario_professor(
     novo_usuario = User(
         cpf=usuario_data.cpf,
         email=usuario_data.email,
-        senha_hash=get_password_hash(usuario_data.senha),
+        senha_hash=await get_password_hash_async(usuario_data.senha),
         perfil=UserRole.PROFESSOR,
         ativo=True
     )
@@ -500,6 +488,7 @@ async def vincular_usuario_professor(
     professor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    invalidate_user(novo_usuario.id)
     await session.refresh(professor)
     
     return ProfessorResponse(
@@ -595,6 +584,7 @@ async def vincular_usuario_existente_professor(
     professor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    invalidate_user(usuario.id)
     await session.refresh(professor)
     
     return ProfessorResponse(
@@ -652,10 +642,12 @@ async def desvincular_usuario_professor(
         )
     
     # Desvincular usuário
+    id_usuario_anterior = professor.id_usuario
     professor.id_usuario = None
     professor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    invalidate_user(id_usuario_anterior)
     await session.refresh(professor)
     
     return ProfessorResponse(
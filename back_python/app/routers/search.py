@@ -0,0 +1,148 @@
+from typing import List, Tuple
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, Integer, String, case, cast, literal, null, or_, select, union_all
+from app.database.session import get_read_session
+from app.models.aluno import Aluno
+from app.models.professor import Professor
+from app.models.servidor import Servidor
+from app.models.user import User
+from app.schemas.search import SearchItem, SearchResponse
+from app.core.security import require_role
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca, formatos_cpf
+
+router = APIRouter(prefix="/search", tags=["Busca"])
+
+
+def _coluna(valor, tipo=String):
+    """Coluna da união: valor da tabela ou NULL tipado"""
+    return cast(null(), tipo) if valor is None else valor
+
+
+def _ramo(
+    tipo: str,
+    id,
+    ativo,
+    identificadores: List[Tuple[str, object]],
+    busca: BuscaNome,
+    termo: str,
+    nome=None,
+    cpf=None,
+    matricula=None,
+    email=None,
+    id_usuario=None
+):
+    """
+    SELECT de uma tabela na forma comum da união
+
+    `identificadores` são condições de igualdade (cpf, matrícula, email)
+    que, quando casam, colocam o resultado antes das buscas por nome.
+    """
+    condicoes = [condicao for _, condicao in identificadores]
+    if nome is not None:
+        condicoes.append(busca.filtro(nome, termo))
+
+    correspondencia = case(
+        *[(condicao, literal(rotulo)) for rotulo, condicao in identificadores],
+        else_=literal("nome")
+    ) if identificadores else literal("nome")
+
+    rank = case(
+        *[(condicao, 0) for _, condicao in identificadores],
+        else_=1
+    ) if identificadores else literal(1)
+
+    return select(
+        literal(tipo).label("tipo"),
+        id.label("id"),
+        _coluna(nome).label("nome"),
+        _coluna(cpf).label("cpf"),
+        _coluna(matricula).label("matricula"),
+        _coluna(email).label("email"),
+        _coluna(id_usuario, Integer).label("id_usuario"),
+        correspondencia.label("correspondencia"),
+        rank.label("rank"),
+        (busca.relevancia(nome, termo) if nome is not None else literal(0.0, Float)).label("relevancia")
+    ).where(ativo, or_(*condicoes))
+
+
+@router.get(
+    "/",
+    response_model=SearchResponse,
+    summary="Busca unificada de pessoas por CPF, matrícula, email ou nome"
+)
+async def search(
+    q: str = Query(..., min_length=2, max_length=150, description="CPF (com ou sem máscara), matrícula, email ou nome"),
+    limit: int = Query(20, ge=1, le=100, description="Máximo de resultados"),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(require_role("ADMIN"))
+):
+    """
+    Procura o termo em usuários, alunos, professores e servidores numa
+    única consulta (UNION ALL), em vez de chamar os quatro /buscar.
+
+    - CPF é comparado com e sem máscara (000.000.000-00 ou 11 dígitos)
+    - Matrícula e email por igualdade
+    - Nome por busca parcial (`busca=trigram` ignora acentos)
+
+    Ordenação: correspondências exatas de CPF/matrícula/email primeiro,
+    depois por similaridade do nome (modo trigram) e ordem alfabética.
+
+    **Permissão**: Apenas ADMIN
+    """
+    termo = q.strip()
+    cpfs = formatos_cpf(termo)
+    busca = BuscaNome(session, modo_busca)
+
+    def por_cpf(coluna):
+        return [("cpf", coluna.in_(cpfs))] if cpfs else []
+
+    def por_email(coluna):
+        return [("email", coluna.in_({termo, termo.lower()}))] if "@" in termo else []
+
+    ramos = [
+        _ramo(
+            "aluno", Aluno.id_aluno, Aluno.is_deleted == False,
+            por_cpf(Aluno.cpf) + [("matricula", Aluno.matricula == termo)],
+            busca, termo,
+            nome=Aluno.nome, cpf=Aluno.cpf, matricula=Aluno.matricula, id_usuario=Aluno.id_usuario
+        ),
+        _ramo(
+            "professor", Professor.id_professor, Professor.is_deleted == False,
+            por_cpf(Professor.cpf) + por_email(Professor.email),
+            busca, termo,
+            nome=Professor.nome, cpf=Professor.cpf, email=Professor.email, id_usuario=Professor.id_usuario
+        ),
+        _ramo(
+            "servidor", Servidor.id_servidor, Servidor.ativo == True,
+            por_cpf(Servidor.cpf) + por_email(Servidor.email),
+            busca, termo,
+            nome=Servidor.nome, cpf=Servidor.cpf, email=Servidor.email, id_usuario=Servidor.id_usuario
+        ),
+    ]
+
+    # Usuários não têm nome: só entram na união com CPF ou email no termo
+    identificadores_usuario = por_cpf(User.cpf) + por_email(User.email)
+    if identificadores_usuario:
+        ramos.insert(0, _ramo(
+            "usuario", User.id, User.ativo == True,
+            identificadores_usuario,
+            busca, termo,
+            cpf=User.cpf, email=User.email, id_usuario=User.id
+        ))
+
+    uniao = union_all(*ramos).subquery()
+    query = (
+        select(uniao)
+        .order_by(uniao.c.rank, uniao.c.relevancia.desc(), uniao.c.nome, uniao.c.tipo, uniao.c.id)
+        .limit(limit)
+    )
+
+    result = await busca.executar(query)
+    return SearchResponse(
+        items=[
+            SearchItem(**{k: v for k, v in linha._mapping.items() if k not in ("rank", "relevancia")})
+            for linha in result.all()
+        ]
+    )
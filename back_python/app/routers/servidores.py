@@ -3,7 +3,12 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
+from app.repositories.usuario import (
+    UsuarioRepository,
+    get_usuario_repository,
+    get_usuario_repository_leitura
+)
 from app.models.servidor import Servidor
 from app.models.user import User, UserRole
 from app.schemas.servidor import (
@@ -14,7 +19,11 @@ from app.schemas.servidor import (
     VincularUsuarioCreate,
     VincularUsuarioExistente
 )
-from app.core.security import get_current_user, get_password_hash
+from app.core.security import get_current_user, get_password_hash_async
+from app.core.autocomplete import indice_nomes
+from app.core.user_cache import invalidate_user
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca
+from app.core.token_versions import token_versions
 
 router = APIRouter(prefix="/servidores", tags=["Servidores"])
 
@@ -63,6 +72,7 @@ async def create_servidor(
     servidor = Servidor(**servidor_data.model_dump())
     session.add(servidor)
     await session.commit()
+    indice_nomes.atualizar(servidor)
     await session.refresh(servidor)
     
     # Preparar resposta com email_usuario como None
@@ -82,7 +92,8 @@ async def create_servidor(
 async def list_servidores(
     offset: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -112,24 +123,15 @@ async def list_servidores(
     result = await session.execute(query)
     servidores = result.scalars().all()
     
-    # Enriquecer com email do usuário quando existir
-    servidores_response = []
-    for servidor in servidores:
-        email_usuario = None
-        if servidor.id_usuario:
-            user_result = await session.execute(
-                select(User).where(User.id == servidor.id_usuario)
-            )
-            usuario = user_result.scalar_one_or_none()
-            if usuario:
-                email_usuario = usuario.email
-        
-        servidores_response.append(
-            ServidorResponse(
-                **servidor.model_dump(),
-                email_usuario=email_usuario
-            )
+    # Enriquecer com email do usuário quando existir (uma consulta por página)
+    emails = await usuarios.emails_por_id(servidor.id_usuario for servidor in servidores)
+    servidores_response = [
+        ServidorResponse(
+            **servidor.model_dump(),
+            email_usuario=emails.get(servidor.id_usuario)
         )
+        for servidor in servidores
+    ]
     
     return ServidorListResponse(
         items=servidores_response,
@@ -148,7 +150,9 @@ async def get_servidor(
     servidor_id: int = Query(None, description="ID do servidor"),
     cpf: str = Query(None, description="CPF do servidor"),
     nome: str = Query(None, description="Nome do servidor (busca parcial)"),
-    session: AsyncSession = Depends(get_session),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -158,6 +162,7 @@ async def get_servidor(
     - **servidor_id**: Busca exata por ID
     - **cpf**: Busca exata por CPF
     - **nome**: Busca parcial por nome (LIKE)
+    - **busca**: `ilike` ou `trigram` (ignora acentos, ordena por similaridade)
     
     **Permissão**: ADMIN, PROFESSOR e SERVIDOR
     """
@@ -179,16 +184,17 @@ async def get_servidor(
     query = select(Servidor).where(Servidor.ativo == True)
     
     # Aplicar filtros conforme parâmetros fornecidos
+    busca = BuscaNome(session, modo_busca)
     if servidor_id:
         query = query.where(Servidor.id_servidor == servidor_id)
     if cpf:
         query = query.where(Servidor.cpf == cpf)
     if nome:
-        query = query.where(Servidor.nome.ilike(f"%{nome}%"))
+        query = query.where(busca.filtro(Servidor.nome, nome))
     
-    # Executar busca
-    result = await session.execute(query)
-    servidor = result.scalar_one_or_none()
+    # Executar busca (vários resultados: o mais parecido / de menor ID)
+    result = await busca.executar(query.order_by(*busca.ordem(), Servidor.id_servidor))
+    servidor = result.scalars().first()
     
     if not servidor:
         raise HTTPException(
@@ -197,14 +203,7 @@ async def get_servidor(
         )
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if servidor.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == servidor.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(servidor.id_usuario)
     
     return ServidorResponse(
         **servidor.model_dump(),
@@ -219,7 +218,8 @@ async def get_servidor(
 )
 async def get_servidor_by_id(
     servidor_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository_leitura),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -250,14 +250,7 @@ async def get_servidor_by_id(
         )
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if servidor.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == servidor.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(servidor.id_usuario)
     
     return ServidorResponse(
         **servidor.model_dump(),
@@ -274,6 +267,7 @@ async def update_servidor(
     servidor_id: int,
     servidor_data: ServidorUpdate,
     session: AsyncSession = Depends(get_session),
+    usuarios: UsuarioRepository = Depends(get_usuario_repository),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -326,17 +320,11 @@ async def update_servidor(
     servidor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(servidor)
     await session.refresh(servidor)
     
     # Buscar email do usuário se existir vinculação
-    email_usuario = None
-    if servidor.id_usuario:
-        user_result = await session.execute(
-            select(User).where(User.id == servidor.id_usuario)
-        )
-        usuario = user_result.scalar_one_or_none()
-        if usuario:
-            email_usuario = usuario.email
+    email_usuario = await usuarios.email_por_id(servidor.id_usuario)
     
     return ServidorResponse(
         **servidor.model_dump(),
@@ -386,6 +374,7 @@ async def delete_servidor(
     servidor.atualizado_em = datetime.utcnow()
     
     # Se houver usuário vinculado, também desativa o usuário
+    usuario = None
     if servidor.id_usuario:
         user_result = await session.execute(
             select(User).where(User.id == servidor.id_usuario)
@@ -393,9 +382,14 @@ async def delete_servidor(
         usuario = user_result.scalar_one_or_none()
         if usuario:
             usuario.ativo = False
+            usuario.token_version += 1
             usuario.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(servidor)
+    invalidate_user(servidor.id_usuario)
+    if usuario:
+        token_versions.set(usuario.id, usuario.token_version, usuario.ativo)
 
 
 # ============================================
@@ -499,7 +493,7 @@ async def vincular_usuario_servidor(
     novo_usuario = User(
         cpf=usuario_data.cpf,
         email=usuario_data.email,
-        senha_hash=get_password_hash(usuario_data.senha),
+        senha_hash=await get_password_hash_async(usuario_data.senha),
         perfil=UserRole.SERVIDOR,
         ativo=True
     )
@@ -511,6 +505,7 @@ async def vincular_usuario_servidor(
     servidor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    invalidate_user(novo_usuario.id)
     await session.refresh(servidor)
     
     return ServidorResponse(
@@ -610,6 +605,7 @@ async def vincular_usuario_existente_servidor(
     servidor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    invalidate_user(usuario.id)
     await session.refresh(servidor)
     
     return ServidorResponse(
@@ -663,10 +659,12 @@ async def desvincular_usuario_servidor(
         )
     
     # Desvincular
+    id_usuario_anterior = servidor.id_usuario
     servidor.id_usuario = None
     servidor.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    invalidate_user(id_usuario_anterior)
     await session.refresh(servidor)
     
     return ServidorResponse(
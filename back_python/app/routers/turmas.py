@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
 from app.models.turma import Turma
 from app.models.professor import Professor
 from app.models.disciplina import Disciplina
@@ -17,6 +17,9 @@ from app.schemas.turma import (
     TurmaListResponseEnriched
 )
 from app.core.security import get_current_user
+from app.core.autocomplete import indice_nomes
+from app.core.pagination import ModoTotal, Paginacao
+from app.core.busca import MODO_BUSCA_PADRAO, BuscaNome, ModoBusca
 
 router = APIRouter(prefix="/turmas", tags=["Turmas"])
 
@@ -46,6 +49,7 @@ async def create_turma(
     turma = Turma(**turma_data.model_dump())
     session.add(turma)
     await session.commit()
+    indice_nomes.atualizar(turma)
     await session.refresh(turma)
     
     return turma
@@ -59,8 +63,10 @@ async def create_turma(
 async def list_turmas(
     offset: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor (paginação keyset; ignora offset)"),
+    modo_total: ModoTotal = Query(ModoTotal.EXACT, alias="total", description="Cálculo do total: exact, cached, estimate ou none"),
     ano_letivo: int = Query(None, description="Filtrar por ano letivo"),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -139,16 +145,19 @@ async def list_turmas(
         query = query.where(Turma.ano_letivo == ano_letivo)
         count_query = count_query.where(Turma.ano_letivo == ano_letivo)
     
-    result = await session.execute(count_query)
-    total = result.scalar()
-    
     # Aplicar paginação e ordenação
-    query = query.offset(offset).limit(limit).order_by(Turma.ano_letivo.desc(), Turma.nome)
-    result = await session.execute(query)
+    # Desempate por ID para uma ordem estável (necessária no modo cursor)
+    pagina = Paginacao(
+        [(Turma.ano_letivo, True), (Turma.nome, False), (Turma.id_turma, False)],
+        limit=limit, offset=offset, cursor=cursor, total=modo_total
+    )
+    rows, total, next_cursor = await pagina.executar(
+        session, query, count_query, escalar=False, entidade=lambda row: row[0]
+    )
     
     # Processar resultados com dados enriquecidos
     turmas_enriquecidas = []
-    for row in result.all():
+    for row in rows:
         turma, prof_nome, disc_nome = row
         turmas_enriquecidas.append(
             TurmaResponseEnriched(
@@ -158,7 +167,13 @@ async def list_turmas(
             )
         )
     
-    return TurmaListResponseEnriched(items=turmas_enriquecidas, total=total, offset=offset, limit=limit)
+    return TurmaListResponseEnriched(
+        items=turmas_enriquecidas,
+        total=total,
+        offset=offset,
+        limit=limit,
+        next_cursor=next_cursor
+    )
 
 @router.get(
     "/buscar",
@@ -172,7 +187,8 @@ async def get_turmas( # Renomeei para plural para semântica correta
     turno: str = Query(None, description="Turno da turma (MANHA, TARDE, NOITE)"),
     nome_professor: str = Query(None, description="Nome do professor (busca parcial)"),
     nome_disciplina: str = Query(None, description="Nome da disciplina (busca parcial)"),
-    session: AsyncSession = Depends(get_session),
+    modo_busca: ModoBusca = Query(MODO_BUSCA_PADRAO, alias="busca", description="Modo da busca por nome: ilike ou trigram (sem acento, por similaridade)"),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -191,25 +207,25 @@ async def get_turmas( # Renomeei para plural para semântica correta
         .outerjoin(Professor, Turma.id_professor == Professor.id_professor)
         .outerjoin(Disciplina, Turma.id_disciplina == Disciplina.id_disciplina)
         .where(Turma.is_deleted == False)
-        .order_by(Turma.serie.desc())
     )
     
     # Aplicar filtros
+    busca = BuscaNome(session, modo_busca)
     if turma_id:
         query = query.where(Turma.id_turma == turma_id)
     if nome:
-        query = query.where(Turma.nome.ilike(f"%{nome}%"))
+        query = query.where(busca.filtro(Turma.nome, nome))
     if serie:
         query = query.where(Turma.serie == serie)
     if turno:
         query = query.where(Turma.turno == turno)
     if nome_professor:
-        query = query.where(Professor.nome.ilike(f"%{nome_professor}%"))
+        query = query.where(busca.filtro(Professor.nome, nome_professor))
     if nome_disciplina:
-        query = query.where(Disciplina.nome.ilike(f"%{nome_disciplina}%"))
+        query = query.where(busca.filtro(Disciplina.nome, nome_disciplina))
         
-    # 2. Executar busca
-    result = await session.execute(query)
+    # 2. Executar busca (no modo trigram, as mais parecidas primeiro)
+    result = await busca.executar(query.order_by(*busca.ordem(), Turma.serie.desc()))
     
     # 3. Buscar TODOS os registros em vez de apenas o primeiro
     rows = result.all()
@@ -238,7 +254,7 @@ async def get_turmas( # Renomeei para plural para semântica correta
 )
 async def get_turma_by_id(
     turma_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -308,6 +324,7 @@ async def update_turma(
     
     turma.atualizado_em = datetime.utcnow()
     await session.commit()
+    indice_nomes.atualizar(turma)
     await session.refresh(turma)
     
     return turma
@@ -347,4 +364,5 @@ async def delete_turma(
     turma.atualizado_em = datetime.utcnow()
     
     await session.commit()
+    indice_nomes.atualizar(turma)
     return None
@@ -1,11 +1,20 @@
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 
-from app.database.session import get_session
+from app.database.session import get_session, get_read_session
 from app.models.user import User
 from app.schemas.user import UserResponse, UserPasswordUpdate
-from app.core.security import get_current_user, require_role, verify_password, get_password_hash
+from app.core.security import (
+    get_current_user,
+    get_current_user_full,
+    require_role,
+    verify_password_async,
+    get_password_hash_async
+)
+from app.core.user_cache import invalidate_user
+from app.core.token_versions import token_versions
 
 
 router = APIRouter(prefix="/users", tags=["Usuários"])
@@ -13,7 +22,7 @@ router = APIRouter(prefix="/users", tags=["Usuários"])
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_full)
 ):
     """
     ## Obter informações do usuário autenticado
@@ -37,7 +46,8 @@ async def admin_only_route(
     
     **Autorização:** Requer role ADMIN.
     """
-    nome_exibicao = current_user.cpf if current_user.cpf else current_user.email
+    # email vem no token (cpf não existe no modo AUTH_CLAIMS_ONLY)
+    nome_exibicao = current_user.email
     return {
         "message": f"Bem-vindo, {nome_exibicao}!",
         "detail": "Você tem acesso total ao sistema como ADMIN",
@@ -53,7 +63,7 @@ async def admin_only_route(
 async def list_users(
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(require_role("ADMIN"))
 ):
     """
@@ -89,28 +99,36 @@ async def change_password(
     
     **Autenticação:** Requer token JWT válido.
     """
+    # current_user pode vir do cache ou só das claims do token, então
+    # carregamos a linha do banco antes de verificar e alterar a senha
+    usuario = await session.get(User, current_user.id)
+    
     # Verificar senha atual
-    if not verify_password(password_data.senha_atual, current_user.senha_hash):
+    if not await verify_password_async(password_data.senha_atual, usuario.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Senha atual incorreta"
         )
     
     # Verificar se a nova senha é diferente da atual
-    if verify_password(password_data.senha_nova, current_user.senha_hash):
+    if await verify_password_async(password_data.senha_nova, usuario.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A nova senha não pode ser igual à senha atual"
         )
     
-    # Atualizar senha
-    current_user.senha_hash = get_password_hash(password_data.senha_nova)
-    session.add(current_user)
+    # Atualizar senha e revogar os tokens emitidos com a senha antiga
+    usuario.senha_hash = await get_password_hash_async(password_data.senha_nova)
+    usuario.token_version += 1
+    usuario.atualizado_em = datetime.utcnow()
+    session.add(usuario)
     await session.commit()
+    invalidate_user(usuario.id)
+    token_versions.set(usuario.id, usuario.token_version, usuario.ativo)
     
     return {
         "message": "Senha alterada com sucesso",
-        "detail": "Sua senha foi atualizada. Use a nova senha no próximo login."
+        "detail": "Sua senha foi atualizada e as sessões anteriores foram encerradas. Faça login com a nova senha."
     }
 
 
@@ -167,12 +185,17 @@ async def admin_change_user_password(
         )
     
     # Atualizar senha
-    target_user.senha_hash = get_password_hash(nova_senha)
+    target_user.senha_hash = await get_password_hash_async(nova_senha)
+    target_user.token_version += 1
+    target_user.atualizado_em = datetime.utcnow()
     session.add(target_user)
     await session.commit()
+    invalidate_user(target_user.id)
+    token_versions.set(target_user.id, target_user.token_version, target_user.ativo)
     
     usuario_alvo = target_user.cpf if target_user.cpf else target_user.email
-    admin_nome = current_user.cpf if current_user.cpf else current_user.email
+    # email vem no token (cpf não existe no modo AUTH_CLAIMS_ONLY)
+    admin_nome = current_user.email
     
     return {
         "message": "Senha alterada com sucesso pelo administrador",
@@ -206,9 +229,13 @@ async def soft_delete_user(
             detail="Usuário não encontrado"
         )
     
-    # Soft delete
+    # Soft delete (revoga também os tokens já emitidos)
     user.ativo = False
+    user.token_version += 1
+    user.atualizado_em = datetime.utcnow()
     session.add(user)
     await session.commit()
+    invalidate_user(user.id)
+    token_versions.set(user.id, user.token_version, user.ativo)
     
     return None
@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -84,9 +84,12 @@ class AlunoResponse(AlunoBase):
 class AlunoListResponse(BaseModel):
     """Schema para listagem paginada de Alunos"""
     items: list[AlunoResponse]
-    total: int
+    # None quando a listagem é pedida com total=none
+    total: Optional[int] = None
     offset: int
     limit: int
+    # Cursor opaco da próxima página (None na última página)
+    next_cursor: Optional[str] = None
 
 
 # ============================================
@@ -119,3 +122,51 @@ class VincularUsuarioExistente(BaseModel):
                 "id_usuario": 15
             }
         }
+
+
+# ============================================
+# SCHEMAS PARA PROVISIONAMENTO EM LOTE
+# ============================================
+
+class ProvisionarUsuariosRequest(BaseModel):
+    """
+    Schema para criar usuários de vários alunos de uma vez
+
+    Informe `id_turma` (todos os alunos da turma) OU `ids_aluno`.
+    O email de cada aluno é gerado como `<matricula>@<dominio_email>`.
+    Sem `senha_inicial`, uma senha aleatória é gerada para cada aluno
+    e devolvida no relatório.
+    """
+    id_turma: Optional[int] = Field(None, gt=0, description="Turma cujos alunos receberão acesso")
+    ids_aluno: Optional[List[int]] = Field(None, min_length=1, max_length=2000, description="IDs dos alunos")
+    dominio_email: str = Field(min_length=3, max_length=100, pattern=r"^[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+    senha_inicial: Optional[str] = Field(None, min_length=6, max_length=72, description="Senha comum a todos")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id_turma": 1,
+                "dominio_email": "aluno.escola.com",
+                "senha_inicial": "mudar123"
+            }
+        }
+
+
+class ProvisionamentoItem(BaseModel):
+    """Resultado do provisionamento de um aluno"""
+    id_aluno: int
+    matricula: Optional[str] = None
+    status: Literal["criado", "ignorado", "erro"]
+    email: Optional[str] = None
+    id_usuario: Optional[int] = None
+    senha_gerada: Optional[str] = None
+    motivo: Optional[str] = None
+
+
+class ProvisionamentoResponse(BaseModel):
+    """Relatório do provisionamento em lote"""
+    total: int
+    criados: int
+    ignorados: int
+    erros: int
+    itens: List[ProvisionamentoItem]
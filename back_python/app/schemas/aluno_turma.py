@@ -47,9 +47,12 @@ class AlunoTurmaResponse(AlunoTurmaBase):
 class AlunoTurmaListResponse(BaseModel):
     """Schema para listagem paginada de Alunos em Turmas"""
     items: list[AlunoTurmaResponse]
-    total: int
+    # None quando a listagem é pedida com total=none
+    total: Optional[int] = None
     offset: int
     limit: int
+    # Cursor opaco da próxima página (None na última página)
+    next_cursor: Optional[str] = None
 
 
 class AlunoTurmaSimpleResponse(BaseModel):
@@ -0,0 +1,28 @@
+from enum import Enum
+from typing import List
+from pydantic import BaseModel
+
+
+# ============================================
+# AUTOCOMPLETE SCHEMAS
+# ============================================
+
+class TipoAutocomplete(str, Enum):
+    """Entidades indexadas pelo autocomplete"""
+    ALUNO = "aluno"
+    PROFESSOR = "professor"
+    SERVIDOR = "servidor"
+    TURMA = "turma"
+    DISCIPLINA = "disciplina"
+
+
+class AutocompleteItem(BaseModel):
+    """Sugestão de nome"""
+    tipo: TipoAutocomplete
+    id: int
+    nome: str
+
+
+class AutocompleteResponse(BaseModel):
+    """Sugestões ordenadas: início do nome primeiro, depois por palavra"""
+    items: List[AutocompleteItem]
@@ -52,3 +52,5 @@ class DisciplinaListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    # Cursor opaco da próxima página (None na última página)
+    next_cursor: Optional[str] = None
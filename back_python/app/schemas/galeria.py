@@ -40,7 +40,9 @@ class GaleriaUpdate(BaseModel):
 class GaleriaResponse(GaleriaBase):
     """Schema de resposta de Galeria (sem dados binários)"""
     id_imagem: int
-    has_image: bool = Field(description="Indica se a imagem existe")
+    has_image: bool = Field(False, description="Indica se a imagem existe")
+    image_size: Optional[int] = Field(None, description="Tamanho da imagem em bytes")
+    image_hash: Optional[str] = Field(None, description="SHA-256 da imagem (use em /raw?v= para cache permanente)")
     criado_em: datetime
     atualizado_em: Optional[datetime] = None
     
@@ -53,6 +55,8 @@ class GaleriaResponse(GaleriaBase):
                 "descricao": "Foto da festa junina",
                 "data": "2025-06-15",
                 "has_image": True,
+                "image_size": 245760,
+                "image_hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
                 "criado_em": "2025-06-15T18:00:00",
                 "atualizado_em": None
             }
@@ -78,6 +82,9 @@ class GaleriaImageResponse(BaseModel):
 class GaleriaListResponse(BaseModel):
     """Schema para listagem paginada de Galeria"""
     items: list[GaleriaResponse]
-    total: int
+    # None quando a listagem é pedida com total=none
+    total: Optional[int] = None
     offset: int
     limit: int
+    # Cursor opaco da próxima página (None na última página)
+    next_cursor: Optional[str] = None
@@ -57,6 +57,9 @@ class NoticiaResponse(NoticiaBase):
 class NoticiaListResponse(BaseModel):
     """Schema para listagem paginada de Notícias"""
     items: list[NoticiaResponse]
-    total: int
+    # None quando a listagem é pedida com total=none
+    total: Optional[int] = None
     offset: int
     limit: int
+    # Cursor opaco da próxima página (None na última página)
+    next_cursor: Optional[str] = None
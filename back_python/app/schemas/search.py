@@ -0,0 +1,32 @@
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+# ============================================
+# BUSCA UNIFICADA SCHEMAS
+# ============================================
+
+class TipoResultado(str, Enum):
+    """Origem do resultado da busca unificada"""
+    USUARIO = "usuario"
+    ALUNO = "aluno"
+    PROFESSOR = "professor"
+    SERVIDOR = "servidor"
+
+
+class SearchItem(BaseModel):
+    """Resultado da busca unificada"""
+    tipo: TipoResultado
+    id: int
+    nome: Optional[str] = None
+    cpf: Optional[str] = None
+    matricula: Optional[str] = None
+    email: Optional[str] = None
+    id_usuario: Optional[int] = None
+    correspondencia: str  # cpf, matricula, email ou nome
+
+
+class SearchResponse(BaseModel):
+    """Resultados ordenados: identificador exato primeiro, depois por nome"""
+    items: List[SearchItem]
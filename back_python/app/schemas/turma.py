@@ -105,7 +105,10 @@ class TurmaListResponse(BaseModel):
 class TurmaListResponseEnriched(BaseModel):
     """Schema para listagem paginada de Turmas com dados enriquecidos"""
     items: list[TurmaResponseEnriched]
-    total: int
+    # None quando a listagem é pedida com total=none
+    total: Optional[int] = None
     offset: int
     limit: int
+    # Cursor opaco da próxima página (None na última página)
+    next_cursor: Optional[str] = None
     message: Optional[str] = None
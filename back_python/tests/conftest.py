@@ -0,0 +1,182 @@
+"""
+Fixtures dos testes
+
+Os testes sobem a aplicação real (TestClient, com o lifespan) sobre um
+SQLite temporário (aiosqlite) e um blob store local temporário. As
+variáveis de ambiente precisam estar definidas antes do primeiro import
+de `app`, por isso ficam no topo deste arquivo.
+
+Cada teste começa com as tabelas vazias e os caches em memória zerados.
+
+Uso:
+    pip install -r requirements-dev.txt
+    pytest
+"""
+import os
+import shutil
+import tempfile
+
+_DIRETORIO = tempfile.mkdtemp(prefix="escola-testes-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DIRETORIO}/testes.db"
+os.environ["DATABASE_READ_URL"] = ""
+os.environ["SECRET_KEY"] = "chave-de-testes-" + "x" * 32
+os.environ["API_KEY"] = "api-key-de-testes"
+os.environ["BLOB_STORE_BACKEND"] = "local"
+os.environ["BLOB_STORE_PATH"] = os.path.join(_DIRETORIO, "blobs")
+os.environ["LOGIN_RATE_LIMIT_BACKEND"] = "memory"
+os.environ["DEBUG"] = "False"
+
+import io  # noqa: E402
+from contextlib import contextmanager  # noqa: E402
+from typing import Callable, Dict, Iterator, List, Tuple  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.autocomplete import indice_nomes  # noqa: E402
+from app.core.pagination import contagem_cache  # noqa: E402
+from app.core.rate_limiter import MemoryBackend, login_rate_limiter  # noqa: E402
+from app.core.refresh_tokens import revocation_index  # noqa: E402
+from app.core.response_cache import cache_respostas  # noqa: E402
+from app.core.security import create_access_token, get_password_hash, jwt_decode_cache  # noqa: E402
+from app.core.token_versions import token_versions  # noqa: E402
+from app.core.user_cache import user_cache  # noqa: E402
+from app.database import session as modulo_session  # noqa: E402
+from app.database.session import async_session, engine  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+SENHA_PADRAO = "senha-de-testes"
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    """Aplicação iniciada uma vez (um único event loop para o engine)"""
+    with TestClient(app) as cliente:
+        yield cliente
+    shutil.rmtree(_DIRETORIO, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def rodar(client) -> Callable:
+    """rodar(funcao_async, *args): executa no event loop da aplicação"""
+    return client.portal.call
+
+
+@pytest.fixture(scope="session")
+def _senha_hash() -> str:
+    # bcrypt é lento de propósito: calculado uma vez por sessão
+    return get_password_hash(SENHA_PADRAO)
+
+
+async def _limpar_banco() -> None:
+    async with engine.begin() as conn:
+        for tabela in reversed(SQLModel.metadata.sorted_tables):
+            await conn.execute(tabela.delete())
+    async with async_session() as session:
+        await indice_nomes.carregar(session)
+        await token_versions.reload(session)
+
+
+@pytest.fixture(autouse=True)
+def estado_limpo(client, rodar) -> Iterator[None]:
+    """Tabelas vazias e caches/limitadores em memória zerados"""
+    rodar(_limpar_banco)
+    for cache in (user_cache, jwt_decode_cache, contagem_cache):
+        cache.clear()
+    cache_respostas.clear()
+    revocation_index.replace({})
+    login_rate_limiter.backend = MemoryBackend(login_rate_limiter.window_seconds)
+    yield
+
+
+@pytest.fixture
+def criar_usuario(rodar, _senha_hash) -> Callable[..., User]:
+    """criar_usuario(email, perfil=ADMIN) -> User persistido (senha SENHA_PADRAO)"""
+    def criar(email: str, perfil: UserRole = UserRole.ADMIN, **campos) -> User:
+        async def inserir() -> User:
+            async with async_session() as session:
+                usuario = User(email=email, senha_hash=_senha_hash, perfil=perfil, **campos)
+                session.add(usuario)
+                await session.commit()
+                await session.refresh(usuario)
+                return usuario
+        return rodar(inserir)
+    return criar
+
+
+def cabecalhos_de(usuario: User) -> Dict[str, str]:
+    """Authorization com um access token válido para `usuario` (sem passar pelo login)"""
+    token = create_access_token(
+        usuario.id, usuario.email, usuario.perfil.value, usuario.token_version
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def imagem_png(cor: Tuple[int, int, int] = (200, 30, 30), tamanho: Tuple[int, int] = (8, 8)) -> bytes:
+    """PNG pequeno; cores diferentes geram conteúdos (e chaves) diferentes"""
+    buffer = io.BytesIO()
+    Image.new("RGB", tamanho, cor).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def admin(criar_usuario) -> User:
+    return criar_usuario("admin@escola.com", UserRole.ADMIN)
+
+
+@pytest.fixture
+def auth(admin) -> Dict[str, str]:
+    """Cabeçalhos de um ADMIN autenticado"""
+    return cabecalhos_de(admin)
+
+
+@pytest.fixture
+def capturar_sql() -> Callable:
+    """
+    with capturar_sql() as comandos: ...
+
+    Lista os comandos SQL enviados ao banco dentro do bloco
+    (evento before_cursor_execute do engine).
+    """
+    @contextmanager
+    def capturar() -> Iterator[List[str]]:
+        comandos: List[str] = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            comandos.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", registrar)
+        try:
+            yield comandos
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", registrar)
+
+    return capturar
+
+
+@pytest.fixture
+def replica(rodar, tmp_path, monkeypatch):
+    """
+    Réplica de leitura: um segundo SQLite com as mesmas tabelas, vazio
+
+    Nada é replicado: o que uma leitura devolve mostra de qual banco veio.
+    """
+    async def criar():
+        motor = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+        async with motor.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        return motor
+
+    motor = rodar(criar)
+    monkeypatch.setattr(modulo_session, "read_engine", motor)
+    # Como em produção, a sessão de leitura nasce ligada à réplica
+    monkeypatch.setitem(modulo_session.async_read_session.kw, "bind", motor)
+    monkeypatch.setattr(modulo_session, "_escritas_recentes", {})
+    monkeypatch.setattr(modulo_session, "leituras_no_primario", 0)
+    yield motor
+    rodar(motor.dispose)
@@ -0,0 +1,84 @@
+"""
+Autocomplete de nomes (índice em memória, app/core/autocomplete.py)
+"""
+from conftest import cabecalhos_de
+from app.core.autocomplete import IndiceNomes
+from app.models.aluno import Aluno
+from app.models.professor import Professor
+from app.models.servidor import Servidor
+from app.models.user import UserRole
+
+ROTA = "/api/v1/autocomplete/"
+
+
+def _indice() -> IndiceNomes:
+    indice = IndiceNomes()
+    indice.atualizar(Aluno(id_aluno=1, nome="João Pedro Silva", matricula="1", cpf="1", nome_responsavel="R", id_usuario=10))
+    indice.atualizar(Aluno(id_aluno=2, nome="Pedro Álvares", matricula="2", cpf="2", nome_responsavel="R"))
+    indice.atualizar(Professor(id_professor=1, nome="Joana Pereira", cpf="3"))
+    indice.atualizar(Servidor(id_servidor=1, nome="Pedrita Souza", cpf="4"))
+    return indice
+
+
+def _nomes(itens) -> list:
+    return [(item.tipo, item.nome) for item in itens]
+
+
+def test_prefixo_sem_acento_e_inicio_do_nome_antes_de_sobrenome():
+    indice = _indice()
+
+    assert _nomes(indice.buscar("PEDR", ["aluno", "professor", "servidor"])) == [
+        ("servidor", "Pedrita Souza"),   # início do nome, em ordem alfabética
+        ("aluno", "Pedro Álvares"),
+        ("aluno", "João Pedro Silva"),   # casou pelo sobrenome
+    ]
+    assert _nomes(indice.buscar("alv", ["aluno"])) == [("aluno", "Pedro Álvares")]
+    assert _nomes(indice.buscar("  joa  ", ["professor"])) == [("professor", "Joana Pereira")]
+    assert indice.buscar("   ", ["aluno"]) == []
+    assert len(indice.buscar("p", ["aluno", "servidor"], limite=2)) == 2
+
+
+def test_atualizacao_e_remocao():
+    indice = _indice()
+
+    indice.atualizar(Aluno(id_aluno=2, nome="Paulo Álvares", matricula="2", cpf="2", nome_responsavel="R"))
+    assert _nomes(indice.buscar("pedro", ["aluno"])) == [("aluno", "João Pedro Silva")]
+    assert _nomes(indice.buscar("paulo", ["aluno"])) == [("aluno", "Paulo Álvares")]
+
+    indice.atualizar(Aluno(id_aluno=2, nome="Paulo Álvares", matricula="2", cpf="2", nome_responsavel="R", is_deleted=True))
+    indice.atualizar(Servidor(id_servidor=1, nome="Pedrita Souza", cpf="4", ativo=False))
+    assert indice.buscar("paulo", ["aluno"]) == []
+    assert indice.buscar("pedrita", ["servidor"]) == []
+    assert indice.stats()["items"]["aluno"] == 1
+
+
+def test_perfil_aluno_ve_apenas_o_proprio_cadastro():
+    indice = _indice()
+
+    assert _nomes(indice.buscar("pedro", ["aluno"], somente_usuario_aluno=10)) == [("aluno", "João Pedro Silva")]
+    assert indice.buscar("pedro", ["aluno"], somente_usuario_aluno=99) == []
+
+
+def test_endpoint_responde_sem_consultar_o_banco(client, auth, capturar_sql):
+    aluno = {
+        "cpf": "12345678901", "matricula": "AC001", "nome": "Márcia Andrade",
+        "nome_responsavel": "Responsável", "data_nascimento": "2010-05-15"
+    }
+    assert client.post("/api/v1/alunos/", json=aluno, headers=auth).status_code == 201
+    client.get(ROTA, params={"q": "x"}, headers=auth)  # aquece o cache do usuário
+
+    with capturar_sql() as comandos:
+        resposta = client.get(ROTA, params={"q": "marc"}, headers=auth)
+
+    assert resposta.status_code == 200
+    assert [(item["tipo"], item["nome"]) for item in resposta.json()["items"]] == [("aluno", "Márcia Andrade")]
+    assert comandos == []
+
+
+def test_tipos_proibidos_para_o_perfil(client, criar_usuario):
+    aluno = cabecalhos_de(criar_usuario("aluno@escola.com", UserRole.ALUNO))
+
+    resposta = client.get(ROTA, params={"q": "a", "tipos": ["professor"]}, headers=aluno)
+
+    assert resposta.status_code == 403
+    assert "professor" in resposta.json()["detail"]
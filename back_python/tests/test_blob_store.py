@@ -0,0 +1,114 @@
+"""
+Blob store endereçado por conteúdo e migração das imagens BYTEA
+"""
+import asyncio
+import base64
+import hashlib
+
+import pytest
+from sqlalchemy import select
+
+from conftest import imagem_png
+from app.core.blob_store import BlobNaoEncontrado, LocalBlobStore, blob_store, detectar_mime
+from app.database.migrar_imagens import migrar_imagens
+from app.database.session import async_session
+from app.models.blob import Blob
+from app.models.galeria import Galeria
+
+
+def test_local_blob_store(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    dados = bytes(range(256)) * 10
+
+    async def cenario():
+        chave, tamanho = await store.salvar(dados)
+        assert (chave, tamanho) == (hashlib.sha256(dados).hexdigest(), len(dados))
+        # Mesmo conteúdo: mesma chave, um único arquivo
+        assert await store.salvar(dados) == (chave, tamanho)
+        assert store.caminho(chave) == str(tmp_path / chave[:2] / chave[2:4] / chave)
+
+        assert await store.ler(chave) == dados
+        assert b"".join([b async for b in store.stream(chave, 10, 19, chunk_size=3)]) == dados[10:20]
+        assert b"".join([b async for b in store.stream(chave, 2500)]) == dados[2500:]
+        assert await store.tamanho(chave) == len(dados)
+
+        await store.remover(chave)
+        await store.remover(chave)  # idempotente
+        assert not await store.existe(chave)
+        with pytest.raises(BlobNaoEncontrado):
+            await store.tamanho(chave)
+        with pytest.raises(BlobNaoEncontrado):
+            await store.ler(chave)
+
+        # Upload já em disco: movido para o destino
+        temporario = tmp_path / "upload.tmp"
+        temporario.write_bytes(b"abc")
+        chave_abc = hashlib.sha256(b"abc").hexdigest()
+        await store.salvar_arquivo(str(temporario), chave_abc)
+        assert not temporario.exists()
+        assert await store.ler(chave_abc) == b"abc"
+
+    asyncio.run(cenario())
+
+
+def test_detectar_mime():
+    assert detectar_mime(imagem_png()[:16]) == "image/png"
+    assert detectar_mime(b"\xff\xd8\xff\xe0" + b"\0" * 12) == "image/jpeg"
+    assert detectar_mime(b"GIF89a" + b"\0" * 10) == "image/gif"
+    assert detectar_mime(b"RIFF\0\0\0\0WEBPVP8 ") == "image/webp"
+    assert detectar_mime(b"%PDF-1.7") is None
+
+
+async def _linhas_e_blobs():
+    async with async_session() as session:
+        linhas = (await session.execute(
+            select(Galeria.id_imagem, Galeria.imagem, Galeria.imagem_chave, Galeria.imagem_tamanho)
+            .order_by(Galeria.id_imagem)
+        )).all()
+        blobs = dict((await session.execute(select(Blob.chave, Blob.referencias))).all())
+    return linhas, blobs
+
+
+def test_imagem_vai_para_o_blob_store_e_conteudo_igual_e_compartilhado(client, rodar, auth):
+    png = imagem_png()
+    corpo = {"descricao": "Festa", "imagem_base64": base64.b64encode(png).decode()}
+
+    primeira = client.post("/api/v1/galeria/", json=corpo, headers=auth).json()
+    segunda = client.post("/api/v1/galeria/", json=corpo, headers=auth).json()
+
+    chave = hashlib.sha256(png).hexdigest()
+    assert primeira["image_hash"] == segunda["image_hash"] == chave
+    assert primeira["image_size"] == len(png)
+
+    linhas, blobs = rodar(_linhas_e_blobs)
+    assert [(imagem, chave_linha) for _, imagem, chave_linha, _ in linhas] == [(None, chave), (None, chave)]
+    assert blobs == {chave: 2}
+    assert rodar(blob_store.ler, chave) == png
+
+
+def test_migracao_das_imagens_bytea(rodar):
+    png_a, png_b = imagem_png((1, 2, 3)), imagem_png((4, 5, 6))
+
+    async def legado():
+        async with async_session() as session:
+            session.add_all([
+                Galeria(descricao="a", imagem=png_a),
+                Galeria(descricao="a (cópia)", imagem=png_a),
+                Galeria(descricao="b (excluída)", imagem=png_b, is_deleted=True),
+            ])
+            await session.commit()
+    rodar(legado)
+
+    migradas, copiados = rodar(migrar_imagens, 2)
+
+    assert (migradas, copiados) == (3, 2 * len(png_a) + len(png_b))
+    linhas, blobs = rodar(_linhas_e_blobs)
+    chave_a, chave_b = hashlib.sha256(png_a).hexdigest(), hashlib.sha256(png_b).hexdigest()
+    assert [(imagem, chave, tamanho) for _, imagem, chave, tamanho in linhas] == [
+        (None, chave_a, len(png_a)), (None, chave_a, len(png_a)), (None, chave_b, len(png_b))
+    ]
+    # Linhas excluídas não contam referência
+    assert blobs == {chave_a: 2}
+    assert rodar(blob_store.ler, chave_b) == png_b
+    # Retomada: nada mais a migrar
+    assert rodar(migrar_imagens, 2) == (0, 0)
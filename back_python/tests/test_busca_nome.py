@@ -0,0 +1,94 @@
+"""
+Busca por nome (app/core/busca.py)
+
+O modo trigram depende do PostgreSQL (pg_trgm/unaccent): aqui é
+verificado o SQL gerado para o dialeto e a volta ao ILIKE no SQLite ou
+sem as extensões.
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from conftest import cabecalhos_de
+from app.core import busca as modulo_busca
+from app.core.busca import BuscaNome, ModoBusca, formatos_cpf, remover_acentos, suporte_trigram
+from app.database.session import async_session, engine
+from app.models.aluno import Aluno
+from app.models.user import UserRole
+
+ROTA = "/api/v1/alunos/buscar"
+
+
+def _sessao(dialeto: str):
+    return SimpleNamespace(bind=SimpleNamespace(dialect=SimpleNamespace(name=dialeto)))
+
+
+async def _popular() -> None:
+    async with async_session() as session:
+        for i, nome in enumerate(["João da Silva", "Joana Souza", "Maria Joaquina", "Pedro Alves"]):
+            session.add(Aluno(
+                matricula=f"B{i:03d}", nome=nome, cpf=f"7{i:010d}", nome_responsavel="Responsável"
+            ))
+        await session.commit()
+
+
+def test_remover_acentos_e_formatos_cpf():
+    assert remover_acentos("João Ângelo Ávila") == "joao angelo avila"
+    assert formatos_cpf("987.654.321-00") == ["98765432100", "987.654.321-00"]
+    assert formatos_cpf("98765432100") == ["98765432100", "987.654.321-00"]
+    assert formatos_cpf("123") == []
+
+
+def test_trigram_no_postgresql_usa_unaccent_e_similaridade(monkeypatch):
+    monkeypatch.setattr(suporte_trigram, "disponivel", True)
+    busca = BuscaNome(_sessao("postgresql"), ModoBusca.TRIGRAM)
+
+    condicao = busca.filtro(Aluno.nome, " João ").compile(dialect=postgresql.dialect())
+    ordem = busca.ordem()[0].compile(dialect=postgresql.dialect())
+
+    assert "f_unaccent(aluno.nome) ILIKE" in str(condicao)
+    assert "<%" in str(condicao)
+    assert "%joao%" in condicao.params.values()
+    assert "word_similarity" in str(ordem) and "DESC" in str(ordem)
+
+
+def test_trigram_fora_do_postgresql_recai_no_ilike():
+    busca = BuscaNome(_sessao("sqlite"), ModoBusca.TRIGRAM)
+
+    assert busca.modo == ModoBusca.ILIKE
+    busca.filtro(Aluno.nome, "jo")
+    assert busca.ordem() == []
+
+
+def test_trigram_sem_extensoes_recai_no_ilike(rodar, monkeypatch):
+    # Sem permissão para CREATE EXTENSION: a verificação da inicialização falha
+    monkeypatch.setattr(modulo_busca, "preparar_busca_textual", lambda conn: False)
+    monkeypatch.setattr(suporte_trigram, "disponivel", True)
+
+    assert rodar(suporte_trigram.verificar, engine) is False
+
+    busca = BuscaNome(_sessao("postgresql"), ModoBusca.TRIGRAM)
+    assert busca.modo == ModoBusca.ILIKE
+    assert "f_unaccent" not in str(busca.filtro(Aluno.nome, "jo").compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize("modo", ["ilike", "trigram"])
+def test_buscar_por_nome_parcial(client, rodar, auth, modo):
+    rodar(_popular)
+
+    resposta = client.get(ROTA, params={"nome": "joa", "busca": modo}, headers=auth)
+
+    # ILIKE (e o trigram fora do PostgreSQL) não ignora acentos: "João" não casa com "joa"
+    assert resposta.status_code == 200
+    assert [aluno["nome"] for aluno in resposta.json()] == ["Joana Souza", "Maria Joaquina"]
+
+
+def test_buscar_sem_parametros_e_aluno_so_ve_o_proprio_registro(client, rodar, auth, criar_usuario):
+    rodar(_popular)
+    assert client.get(ROTA, headers=auth).status_code == 400
+
+    aluno = criar_usuario("aluno@escola.com", UserRole.ALUNO)
+    resposta = client.get(ROTA, params={"nome": "joa"}, headers=cabecalhos_de(aluno))
+    assert resposta.status_code == 200
+    assert resposta.json() == []
@@ -0,0 +1,71 @@
+"""
+Busca unificada (GET /search/): uma única consulta UNION ALL
+"""
+from conftest import cabecalhos_de
+from app.database.session import async_session
+from app.models.aluno import Aluno
+from app.models.professor import Professor
+from app.models.servidor import Servidor
+from app.models.user import User, UserRole
+
+ROTA = "/api/v1/search/"
+
+
+async def _popular() -> None:
+    async with async_session() as session:
+        session.add(User(email="carla@escola.com", senha_hash="x", perfil=UserRole.PROFESSOR, cpf="11122233344"))
+        session.add(Aluno(matricula="2025001", nome="Carlos Souza", cpf="111.222.333-44", nome_responsavel="R"))
+        session.add(Aluno(matricula="2025002", nome="Ana Carla Lima", cpf="55566677788", nome_responsavel="R"))
+        session.add(Aluno(matricula="2025003", nome="Carla Excluída", cpf="99988877766", nome_responsavel="R", is_deleted=True))
+        session.add(Professor(nome="Carla Mendes", cpf="22233344455", email="carla@escola.com"))
+        session.add(Servidor(nome="Carlota Dias", cpf="33344455566", ativo=False))
+        await session.commit()
+
+
+def _resultado(client, auth, q, **params) -> list:
+    resposta = client.get(ROTA, params={"q": q, **params}, headers=auth)
+    assert resposta.status_code == 200, resposta.text
+    return [(item["tipo"], item["correspondencia"], item["nome"]) for item in resposta.json()["items"]]
+
+
+def test_nome_em_todas_as_tabelas_sem_excluidos(client, rodar, auth):
+    rodar(_popular)
+
+    assert _resultado(client, auth, "carl") == [
+        ("aluno", "nome", "Ana Carla Lima"),
+        ("professor", "nome", "Carla Mendes"),
+        ("aluno", "nome", "Carlos Souza"),
+    ]
+
+
+def test_identificadores_exatos_vem_primeiro(client, rodar, auth):
+    rodar(_popular)
+
+    # CPF com ou sem máscara encontra as duas formas armazenadas
+    # (usuários não têm nome: a posição do NULL varia entre bancos)
+    assert sorted(_resultado(client, auth, "111.222.333-44"), key=str) == [
+        ("aluno", "cpf", "Carlos Souza"),
+        ("usuario", "cpf", None),
+    ]
+    assert _resultado(client, auth, "2025002") == [("aluno", "matricula", "Ana Carla Lima")]
+    assert sorted(_resultado(client, auth, "CARLA@escola.com"), key=str) == [
+        ("professor", "email", "Carla Mendes"),
+        ("usuario", "email", None),
+    ]
+
+
+def test_uma_unica_consulta_e_limite(client, rodar, auth, capturar_sql):
+    rodar(_popular)
+    client.get(ROTA, params={"q": "xx"}, headers=auth)  # aquece o cache do usuário
+
+    with capturar_sql() as comandos:
+        resultado = _resultado(client, auth, "carl", limit=2)
+
+    assert len(resultado) == 2
+    assert len(comandos) == 1
+    assert "UNION ALL" in comandos[0]
+
+
+def test_apenas_admin(client, criar_usuario):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    assert client.get(ROTA, params={"q": "carl"}, headers=cabecalhos_de(professor)).status_code == 403
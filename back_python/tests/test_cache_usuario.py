@@ -0,0 +1,107 @@
+"""Cache do usuário autenticado (get_current_user) e TTLCache"""
+import time
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import TTLCache
+from app.core.token_versions import token_versions
+from app.core.user_cache import cache_user, get_cached_user
+from app.database.session import async_session
+from app.models.user import User, UserRole
+
+from conftest import cabecalhos_de
+
+
+def _consultas_usuarios(comandos):
+    return [c for c in comandos if "FROM usuarios" in c]
+
+
+def test_requisicoes_repetidas_nao_consultam_usuarios(client, auth, capturar_sql):
+    assert client.get("/api/v1/users/me", headers=auth).status_code == 200
+
+    with capturar_sql() as comandos:
+        for _ in range(3):
+            assert client.get("/api/v1/users/me", headers=auth).status_code == 200
+
+    assert _consultas_usuarios(comandos) == []
+
+
+def test_troca_de_senha_pelo_admin_invalida_o_cache(client, auth, criar_usuario):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    cabecalhos = cabecalhos_de(professor)
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 200
+
+    resposta = client.put(
+        f"/api/v1/users/{professor.id}/password", params={"nova_senha": "nova123"}, headers=auth
+    )
+    assert resposta.status_code == 200
+
+    # O snapshot em cache tinha a versão de token antiga
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 401
+
+
+def test_desativacao_invalida_o_cache(client, auth, criar_usuario):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    cabecalhos = cabecalhos_de(professor)
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 200
+
+    assert client.delete(f"/api/v1/users/{professor.id}", headers=auth).status_code == 204
+
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 403
+
+
+@pytest.mark.parametrize("valores, status_esperado", [
+    ({"token_version": User.token_version + 1}, 401),
+    ({"ativo": False}, 403),
+])
+def test_alteracao_em_outro_worker_revoga_o_snapshot(
+    client, rodar, auth, criar_usuario, monkeypatch, valores, status_esperado
+):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    cabecalhos = cabecalhos_de(professor)
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 200
+
+    # Outro worker altera o usuário: o invalidate_user dele não chega aqui
+    async def alterar() -> None:
+        async with async_session() as session:
+            await session.execute(update(User).where(User.id == professor.id).values(**valores))
+            await session.commit()
+    rodar(alterar)
+    monkeypatch.setattr(token_versions, "refresh_seconds", 0)
+
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == status_esperado
+
+
+def test_cada_acerto_devolve_uma_instancia_nova(admin):
+    cache_user(admin)
+
+    primeiro = get_cached_user(admin.id)
+    primeiro.email = "alterado@escola.com"
+
+    assert get_cached_user(admin.id).email == "admin@escola.com"
+    assert get_cached_user(admin.id) is not get_cached_user(admin.id)
+
+
+def test_ttl_cache_expira_e_descarta_lru(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: agora[0])
+    cache = TTLCache(max_size=2, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" passa a ser o mais recente
+    cache.set("c", 3)           # descarta "b", o menos usado
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    agora[0] += 10
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_cache_desabilitado():
+    cache = TTLCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
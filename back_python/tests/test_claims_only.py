@@ -0,0 +1,91 @@
+"""Modo AUTH_CLAIMS_ONLY e versões de token (revogação)"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.token_versions import token_versions
+from app.database.session import async_session
+from app.models.user import UserRole
+
+from conftest import cabecalhos_de
+
+
+@pytest.fixture
+def claims_only(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_CLAIMS_ONLY", True)
+
+
+def _consultas_usuarios(comandos):
+    return [c for c in comandos if "FROM usuarios" in c]
+
+
+def test_rota_autorizada_so_pelas_claims(client, claims_only, auth, capturar_sql):
+    assert client.get("/api/v1/users/admin-only", headers=auth).status_code == 200
+
+    with capturar_sql() as comandos:
+        resposta = client.get("/api/v1/users/admin-only", headers=auth)
+
+    assert resposta.status_code == 200
+    assert _consultas_usuarios(comandos) == []
+
+
+def test_perfil_do_token_e_respeitado(client, claims_only, criar_usuario):
+    aluno = criar_usuario("aluno@escola.com", UserRole.ALUNO)
+    assert client.get("/api/v1/users/admin-only", headers=cabecalhos_de(aluno)).status_code == 403
+
+
+def test_troca_de_senha_revoga_tokens_antigos(client, claims_only, auth, criar_usuario):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    cabecalhos = cabecalhos_de(professor)
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 200
+
+    client.put(f"/api/v1/users/{professor.id}/password", params={"nova_senha": "nova123"}, headers=auth)
+
+    assert client.get("/api/v1/users/me", headers=cabecalhos).status_code == 401
+
+
+def test_usuario_desativado_e_bloqueado(client, claims_only, auth, criar_usuario):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    client.delete(f"/api/v1/users/{professor.id}", headers=auth)
+
+    assert client.get("/api/v1/users/admin-only", headers=cabecalhos_de(professor)).status_code == 403
+
+
+def test_usuario_criado_apos_a_recarga_e_buscado_pontualmente(client, claims_only, admin, criar_usuario):
+    # O mapa foi recarregado antes de o professor existir
+    novo = criar_usuario("novo@escola.com", UserRole.PROFESSOR)
+    antes = token_versions.stats()["point_loads"]
+
+    assert client.get("/api/v1/users/me", headers=cabecalhos_de(novo)).status_code == 200
+    assert token_versions.stats()["point_loads"] == antes + 1
+
+
+def test_mensagens_do_admin_usam_o_email(client, claims_only, auth, criar_usuario):
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+
+    resposta = client.put(f"/api/v1/users/{professor.id}/password", params={"nova_senha": "nova123"}, headers=auth)
+    assert "None" not in resposta.json()["detail"]
+    assert "admin@escola.com" in resposta.json()["detail"]
+
+    boas_vindas = client.get("/api/v1/users/admin-only", headers=auth).json()["message"]
+    assert boas_vindas == "Bem-vindo, admin@escola.com!"
+
+
+def test_mapa_vencido_e_recarregado_uma_vez(rodar, admin, capturar_sql, monkeypatch):
+    async def leituras_simultaneas():
+        async def ler():
+            async with async_session() as session:
+                return await token_versions.get(session, admin.id)
+        return await asyncio.gather(*(ler() for _ in range(20)))
+
+    # Mapa vencido: toda requisição o encontraria desatualizado
+    monkeypatch.setattr(token_versions, "_loaded_at", None)
+    antes = token_versions.stats()["reloads"]
+
+    with capturar_sql() as comandos:
+        versoes = rodar(leituras_simultaneas)
+
+    assert versoes == [admin.token_version] * 20
+    assert token_versions.stats()["reloads"] == antes + 1
+    assert len(_consultas_usuarios(comandos)) == 1
@@ -0,0 +1,69 @@
+"""
+Estratégias do `total` das listagens (parâmetro `total`, ModoTotal)
+"""
+import pytest
+
+from app.database.session import async_session
+from app.models.aluno import Aluno
+
+ROTA = "/api/v1/alunos/"
+
+
+async def _popular(quantidade: int = 15, inicio: int = 0) -> None:
+    async with async_session() as session:
+        for i in range(inicio, inicio + quantidade):
+            session.add(Aluno(
+                matricula=f"T{i:04d}", nome=f"Aluno {i}", cpf=f"6{i:010d}", nome_responsavel="Responsável"
+            ))
+        await session.commit()
+
+
+def _contagens(comandos) -> int:
+    """Consultas COUNT separadas (a janela count(*) OVER() não entra)"""
+    return sum(1 for sql in comandos if "count(" in sql.lower() and "over" not in sql.lower())
+
+
+def test_exact_conta_na_propria_consulta_da_pagina(client, rodar, auth, capturar_sql):
+    rodar(_popular)
+    client.get(ROTA, params={"limit": 1}, headers=auth)  # aquece o cache do usuário
+
+    with capturar_sql() as comandos:
+        corpo = client.get(ROTA, params={"limit": 5, "total": "exact"}, headers=auth).json()
+
+    assert corpo["total"] == 15
+    assert _contagens(comandos) == 0
+    assert any("over" in sql.lower() for sql in comandos)
+
+
+def test_exact_com_offset_alem_do_fim_e_com_cursor(client, rodar, auth):
+    rodar(_popular)
+
+    assert client.get(ROTA, params={"offset": 50}, headers=auth).json()["total"] == 15
+    cursor = client.get(ROTA, params={"limit": 5}, headers=auth).json()["next_cursor"]
+    # Com cursor o total continua sendo o da listagem inteira
+    assert client.get(ROTA, params={"cursor": cursor}, headers=auth).json()["total"] == 15
+
+
+def test_cached_reutiliza_a_contagem_ate_uma_escrita(client, rodar, auth, capturar_sql):
+    rodar(_popular)
+    params = {"limit": 5, "total": "cached"}
+
+    with capturar_sql() as comandos:
+        assert client.get(ROTA, params=params, headers=auth).json()["total"] == 15
+        assert client.get(ROTA, params=params, headers=auth).json()["total"] == 15
+    assert _contagens(comandos) == 1
+
+    # Escrita na tabela invalida a contagem guardada
+    rodar(_popular, 3, 100)
+    assert client.get(ROTA, params=params, headers=auth).json()["total"] == 18
+
+
+@pytest.mark.parametrize("modo, esperado", [("none", None), ("estimate", 15)])
+def test_none_e_estimate_fora_do_postgres(client, rodar, auth, modo, esperado):
+    # estimate usa o EXPLAIN do PostgreSQL; no SQLite cai na contagem exata
+    rodar(_popular)
+
+    corpo = client.get(ROTA, params={"limit": 5, "total": modo}, headers=auth).json()
+
+    assert corpo["total"] == esperado
+    assert len(corpo["items"]) == 5
@@ -0,0 +1,77 @@
+"""Cache de tokens JWT já verificados (decode_token)"""
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import create_access_token, decode_token, jwt_decode_cache
+
+
+@pytest.fixture
+def chamadas_decode(monkeypatch):
+    chamadas = []
+    original = jwt.decode
+
+    def contar(*args, **kwargs):
+        chamadas.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", contar)
+    return chamadas
+
+
+def _token(**claims) -> str:
+    payload = {"sub": "1", "type": "access", "exp": int(time.time()) + 600, **claims}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def test_token_verificado_uma_unica_vez(chamadas_decode):
+    token = create_access_token(1, "a@escola.com", "ADMIN")
+
+    for _ in range(3):
+        assert decode_token(token)["email"] == "a@escola.com"
+
+    assert len(chamadas_decode) == 1
+
+
+def test_chamador_nao_altera_a_entrada_do_cache():
+    token = create_access_token(1, "a@escola.com", "ADMIN")
+
+    decode_token(token)["perfil"] = "ALUNO"
+
+    assert decode_token(token)["perfil"] == "ADMIN"
+
+
+def test_token_adulterado_nao_e_aceito_nem_guardado(chamadas_decode):
+    cabecalho, corpo, _ = create_access_token(1, "a@escola.com", "ADMIN").split(".")
+    adulterado = f"{cabecalho}.{corpo}.assinatura-invalida"
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as erro:
+            decode_token(adulterado)
+        assert erro.value.status_code == 401
+
+    assert len(chamadas_decode) == 2
+    assert len(jwt_decode_cache) == 0
+
+
+def test_token_expirado_e_rejeitado():
+    with pytest.raises(HTTPException) as erro:
+        decode_token(_token(exp=int(time.time()) - 10))
+    assert erro.value.status_code == 401
+    assert "expirado" in erro.value.detail
+
+
+def test_entrada_vale_so_ate_o_exp(chamadas_decode, monkeypatch):
+    token = _token(exp=int(time.time()) + 5)
+    decode_token(token)
+
+    # Passado o exp, a entrada sai do cache e o token volta a ser verificado
+    monotonic = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: monotonic + 10)
+    decode_token(token)
+
+    assert len(chamadas_decode) == 2
@@ -0,0 +1,167 @@
+"""
+Contagem de referências dos blobs e job de deduplicação/limpeza
+(app/repositories/blobs.py, app/database/deduplicar_imagens.py)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from conftest import imagem_png
+from app.core.blob_store import blob_store
+from app.core.derivados import chave_derivado
+from app.database.deduplicar_imagens import recontar_referencias, remover_sem_referencias
+from app.database.session import async_session
+from app.models.blob import Blob
+from app.routers import galeria as rotas
+
+ROTA = "/api/v1/galeria/"
+
+
+@pytest.fixture(autouse=True)
+def sem_derivados(monkeypatch):
+    monkeypatch.setattr(rotas.gerador_derivados, "agendar", lambda chave: None)
+
+
+def _referencias(rodar) -> dict:
+    async def ler() -> dict:
+        async with async_session() as session:
+            return dict((await session.execute(select(Blob.chave, Blob.referencias))).all())
+    return rodar(ler)
+
+
+def _executar(rodar, *comandos) -> None:
+    async def executar() -> None:
+        async with async_session() as session:
+            for comando in comandos:
+                await session.execute(comando)
+            await session.commit()
+    rodar(executar)
+
+
+async def _inserir_orfao(chave: str, referencias: int, idade_horas: float = 0) -> None:
+    momento = datetime.utcnow() - timedelta(hours=idade_horas)
+    async with async_session() as session:
+        session.add(Blob(chave=chave, tamanho=10, referencias=referencias, atualizado_em=momento))
+        await session.commit()
+
+
+def _enviar(client, auth, conteudo: bytes) -> dict:
+    resposta = client.post(f"{ROTA}upload", headers=auth, files={"arquivo": ("a.png", conteudo, "image/png")})
+    assert resposta.status_code == 201
+    return resposta.json()
+
+
+def test_referencias_no_upload_troca_e_exclusao(client, rodar, auth):
+    vermelha, azul = imagem_png(), imagem_png((0, 0, 200))
+    primeira = _enviar(client, auth, vermelha)
+    segunda = _enviar(client, auth, vermelha)
+    chave = primeira["image_hash"]
+
+    assert segunda["image_hash"] == chave
+    assert _referencias(rodar) == {chave: 2}
+
+    trocada = client.put(
+        f"{ROTA}{segunda['id_imagem']}/upload", headers=auth,
+        files={"arquivo": ("b.png", azul, "image/png")}
+    ).json()
+    assert _referencias(rodar) == {chave: 1, trocada["image_hash"]: 1}
+
+    # Reenviar o mesmo conteúdo não muda a contagem
+    client.put(f"{ROTA}{segunda['id_imagem']}/upload", headers=auth, files={"arquivo": ("b.png", azul, "image/png")})
+    assert _referencias(rodar)[trocada["image_hash"]] == 1
+
+    assert client.delete(f"{ROTA}{primeira['id_imagem']}", headers=auth).status_code == 204
+    assert _referencias(rodar) == {chave: 0, trocada["image_hash"]: 1}
+    # Soft delete não apaga o arquivo: a limpeza fica com o job
+    assert rodar(blob_store.existe, chave)
+
+
+def test_recontar_corrige_contadores(client, rodar, auth):
+    conteudo = imagem_png()
+    chave = _enviar(client, auth, conteudo)["image_hash"]
+    _enviar(client, auth, conteudo)
+    excluida = _enviar(client, auth, imagem_png((0, 200, 0)))
+    client.delete(f"{ROTA}{excluida['id_imagem']}", headers=auth)
+
+    # Contadores divergentes, blob sem registro e registro sem linhas
+    _executar(
+        rodar,
+        update(Blob).where(Blob.chave == chave).values(referencias=7),
+        update(Blob).where(Blob.chave == excluida["image_hash"]).values(referencias=3),
+    )
+    rodar(_inserir_orfao, "f" * 64, 5)
+
+    corrigidos, compartilhadas, economia = rodar(recontar_referencias)
+
+    assert _referencias(rodar) == {chave: 2, excluida["image_hash"]: 0, "f" * 64: 0}
+    assert corrigidos == 3
+    assert (compartilhadas, economia) == (2, len(conteudo))
+    # Já ajustado: nada a corrigir
+    assert rodar(recontar_referencias)[0] == 0
+
+
+def test_remove_apenas_sem_referencias_apos_a_carencia(client, rodar, auth):
+    # Conteúdo exclusivo deste teste: o blob store não é limpo entre testes
+    # e outros já podem ter gerado derivados das imagens padrão
+    antiga = _enviar(client, auth, imagem_png((17, 71, 117), (9, 7)))
+    recente = _enviar(client, auth, imagem_png((0, 0, 200)))
+    em_uso = _enviar(client, auth, imagem_png((0, 200, 0)))
+    for galeria in (antiga, recente):
+        client.delete(f"{ROTA}{galeria['id_imagem']}", headers=auth)
+
+    # Derivado já gerado também é removido
+    derivado = chave_derivado(antiga["image_hash"], 200, "png")
+    rodar(blob_store.gravar, derivado, b"miniatura")
+    _executar(
+        rodar,
+        update(Blob).where(Blob.chave == antiga["image_hash"])
+        .values(atualizado_em=datetime.utcnow() - timedelta(hours=48)),
+    )
+
+    removidos, liberados = rodar(remover_sem_referencias, 24)
+
+    assert removidos == 1
+    assert liberados == antiga["image_size"] + len(b"miniatura")
+    assert not rodar(blob_store.existe, antiga["image_hash"])
+    assert not rodar(blob_store.existe, derivado)
+    assert rodar(blob_store.existe, recente["image_hash"])
+    assert rodar(blob_store.existe, em_uso["image_hash"])
+    assert set(_referencias(rodar)) == {recente["image_hash"], em_uso["image_hash"]}
+
+
+def test_blob_reutilizado_nao_e_removido(client, rodar, auth):
+    conteudo = imagem_png()
+    primeira = _enviar(client, auth, conteudo)
+    client.delete(f"{ROTA}{primeira['id_imagem']}", headers=auth)
+    # O mesmo conteúdo volta a ser enviado antes da limpeza
+    _enviar(client, auth, conteudo)
+
+    assert rodar(remover_sem_referencias, 0) == (0, 0)
+    assert rodar(blob_store.existe, primeira["image_hash"])
+
+
+def test_upload_com_transacao_falha_e_limpo_apos_a_carencia(client, rodar, auth, monkeypatch):
+    async def falhar(*args) -> None:
+        raise HTTPException(status_code=500, detail="falha no banco")
+
+    # O arquivo já foi gravado quando a transação da galeria falha
+    monkeypatch.setattr(rotas, "_definir_imagem", falhar)
+    conteudo = imagem_png((23, 5, 99), (7, 9))
+    resposta = client.post(f"{ROTA}upload", headers=auth, files={"arquivo": ("a.png", conteudo, "image/png")})
+    assert resposta.status_code == 500
+
+    (chave, referencias), = _referencias(rodar).items()
+    assert referencias == 0
+    assert rodar(blob_store.existe, chave)
+
+    # Ainda na carência: pode ser uma gravação em andamento
+    assert rodar(remover_sem_referencias, 24) == (0, 0)
+    _executar(
+        rodar,
+        update(Blob).where(Blob.chave == chave).values(atualizado_em=datetime.utcnow() - timedelta(hours=48)),
+    )
+
+    assert rodar(remover_sem_referencias, 24) == (1, len(conteudo))
+    assert not rodar(blob_store.existe, chave)
@@ -0,0 +1,88 @@
+"""
+Miniaturas e WebP da galeria (app/core/derivados.py)
+"""
+import io
+
+import pytest
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conftest import imagem_png
+from app.core.derivados import gerador_derivados, gerar_derivados
+from app.routers import galeria as rotas
+
+ROTA = "/api/v1/galeria/"
+
+
+@pytest.fixture
+def agendados(monkeypatch) -> list:
+    chaves = []
+    monkeypatch.setattr(rotas.gerador_derivados, "agendar", chaves.append)
+    return chaves
+
+
+def test_gerar_derivados_mantem_proporcao_e_formato():
+    saidas = gerar_derivados(imagem_png(tamanho=(300, 150)), [100, 400])
+
+    assert sorted(saidas) == ["100.png", "100.webp", "400.png", "400.webp", "full.webp"]
+    with Image.open(io.BytesIO(saidas["100.png"])) as miniatura:
+        assert (miniatura.format, miniatura.size) == ("PNG", (100, 50))
+    # Sem ampliar: 400 px é maior que a imagem
+    with Image.open(io.BytesIO(saidas["400.webp"])) as webp:
+        assert (webp.format, webp.size) == ("WEBP", (300, 150))
+
+
+def test_pool_criado_no_startup_com_spawn(client):
+    executor = gerador_derivados._executor
+    assert executor is not None
+    assert executor._mp_context.get_start_method() == "spawn"
+
+
+def test_agenda_apos_o_commit(client, auth, agendados):
+    criada = client.post(
+        f"{ROTA}upload", headers=auth, files={"arquivo": ("a.png", imagem_png(), "image/png")}
+    ).json()
+    assert agendados == [criada["image_hash"]]
+
+    # Só metadados: nada a gerar
+    client.put(f"{ROTA}{criada['id_imagem']}", json={"descricao": "nova"}, headers=auth)
+    sem_imagem = client.post(ROTA, json={"descricao": "sem arquivo"}, headers=auth)
+    assert sem_imagem.status_code == 201
+    assert agendados == [criada["image_hash"]]
+
+    outra = client.put(
+        f"{ROTA}{criada['id_imagem']}/upload", headers=auth,
+        files={"arquivo": ("b.png", imagem_png((1, 2, 3)), "image/png")}
+    ).json()
+    assert agendados == [criada["image_hash"], outra["image_hash"]]
+
+
+def test_commit_com_falha_nao_agenda(client, auth, agendados, monkeypatch):
+    async def falhar(self):
+        raise RuntimeError("commit falhou")
+
+    monkeypatch.setattr(AsyncSession, "commit", falhar)
+
+    with pytest.raises(RuntimeError):
+        client.post(f"{ROTA}upload", headers=auth, files={"arquivo": ("a.png", imagem_png(), "image/png")})
+    assert agendados == []
+
+
+def test_miniatura_sob_demanda_no_pool(client, auth, agendados):
+    # agendar desligado: a rota gera os derivados que faltam
+    criada = client.post(
+        f"{ROTA}upload", headers=auth,
+        files={"arquivo": ("a.png", imagem_png(tamanho=(600, 300)), "image/png")}
+    ).json()
+    url = f"{ROTA}{criada['id_imagem']}/raw"
+
+    miniatura = client.get(url, params={"size": 200}, headers=auth)
+    webp = client.get(url, params={"size": 200, "formato": "webp"}, headers=auth)
+
+    assert miniatura.status_code == webp.status_code == 200
+    assert miniatura.headers["content-type"] == "image/png"
+    assert webp.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(miniatura.content)) as imagem:
+        assert imagem.size == (200, 100)
+
+    assert client.get(url, params={"size": 123}, headers=auth).status_code == 400
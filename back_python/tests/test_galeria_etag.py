@@ -0,0 +1,127 @@
+"""
+ETag, If-None-Match (304) e Cache-Control de /galeria/{id}/raw e /image
+"""
+import pytest
+
+from conftest import imagem_png
+from app.core.blob_store import blob_store
+from app.core.derivados import chave_derivado
+from app.database.session import async_session
+from app.models.galeria import Galeria
+from app.routers import galeria as rotas
+from app.routers.galeria import CACHE_IMUTAVEL, CACHE_REVALIDAR, _etag_confere
+
+ROTA = "/api/v1/galeria/"
+
+
+@pytest.mark.parametrize("cabecalho, confere", [
+    ('"abc"', True),
+    ('W/"abc"', True),              # comparação fraca
+    ('"x", W/"abc" , "y"', True),
+    ("*", True),
+    ('"abcd"', False),
+    ("", False),
+    (None, False),
+])
+def test_etag_confere(cabecalho, confere):
+    assert _etag_confere(cabecalho, '"abc"') is confere
+
+
+def test_sem_etag_nunca_confere():
+    assert _etag_confere("*", None) is False
+
+
+@pytest.fixture
+def imagem(client, auth, monkeypatch) -> dict:
+    # Sem geração em segundo plano: os derivados só existem se pedidos
+    monkeypatch.setattr(rotas.gerador_derivados, "agendar", lambda chave: None)
+    resposta = client.post(
+        f"{ROTA}upload", headers=auth, data={"descricao": "Festa junina"},
+        files={"arquivo": ("a.png", imagem_png(tamanho=(300, 300)), "image/png")}
+    )
+    return resposta.json()
+
+
+def test_raw_304_e_url_imutavel(client, auth, imagem):
+    url = f"{ROTA}{imagem['id_imagem']}/raw"
+    etag = f'"{imagem["image_hash"]}"'
+
+    primeira = client.get(url, headers=auth)
+    assert primeira.headers["ETag"] == etag
+    assert primeira.headers["Cache-Control"] == CACHE_REVALIDAR
+
+    for cabecalho in (etag, f"W/{etag}", f'"outra", {etag}'):
+        revalidada = client.get(url, headers={**auth, "If-None-Match": cabecalho})
+        assert revalidada.status_code == 304, cabecalho
+        assert revalidada.content == b""
+        assert revalidada.headers["ETag"] == etag
+
+    assert client.get(url, headers={**auth, "If-None-Match": '"outra"'}).status_code == 200
+
+    versionada = client.get(url, params={"v": imagem["image_hash"]}, headers=auth)
+    assert versionada.headers["Cache-Control"] == CACHE_IMUTAVEL
+    # Hash antigo na URL: não pode ficar em cache permanente
+    antiga = client.get(url, params={"v": "0" * 64}, headers=auth)
+    assert antiga.headers["Cache-Control"] == CACHE_REVALIDAR
+
+
+def test_304_do_derivado_nao_gera_nem_le_a_imagem(client, rodar, auth, imagem):
+    url = f"{ROTA}{imagem['id_imagem']}/raw"
+    derivado = chave_derivado(imagem["image_hash"], 200, "webp")
+
+    resposta = client.get(
+        url, params={"size": 200, "formato": "webp"}, headers={**auth, "If-None-Match": f'"{derivado}"'}
+    )
+
+    assert resposta.status_code == 304
+    assert not rodar(blob_store.existe, derivado)
+
+    gerada = client.get(url, params={"size": 200, "formato": "webp"}, headers=auth)
+    assert gerada.status_code == 200
+    assert gerada.headers["ETag"] == f'"{derivado}"'
+
+
+def test_troca_da_imagem_muda_o_etag(client, auth, imagem):
+    url = f"{ROTA}{imagem['id_imagem']}/raw"
+    etag_antigo = client.get(url, headers=auth).headers["ETag"]
+
+    client.put(
+        f"{ROTA}{imagem['id_imagem']}/upload", headers=auth,
+        files={"arquivo": ("b.png", imagem_png((5, 5, 5)), "image/png")}
+    )
+
+    resposta = client.get(url, headers={**auth, "If-None-Match": etag_antigo})
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"] != etag_antigo
+
+
+def test_base64_etag_inclui_a_descricao(client, auth, imagem):
+    url = f"{ROTA}{imagem['id_imagem']}/image"
+
+    primeira = client.get(url, headers=auth)
+    etag = primeira.headers["ETag"]
+    assert primeira.json()["descricao"] == "Festa junina"
+    assert etag.startswith(f'"{imagem["image_hash"]}.b64.')
+    assert client.get(url, headers={**auth, "If-None-Match": etag}).status_code == 304
+
+    client.put(f"{ROTA}{imagem['id_imagem']}", json={"descricao": "Festa julina"}, headers=auth)
+    depois = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert depois.status_code == 200
+    assert depois.json()["descricao"] == "Festa julina"
+    assert depois.headers["ETag"] != etag
+
+
+def test_imagem_legada_sem_etag(client, rodar, auth):
+    async def inserir() -> int:
+        async with async_session() as session:
+            galeria = Galeria(descricao="legado", imagem=imagem_png())
+            session.add(galeria)
+            await session.commit()
+            return galeria.id_imagem
+
+    url = f"{ROTA}{rodar(inserir)}/raw"
+    resposta = client.get(url, headers={**auth, "If-None-Match": "*"})
+
+    assert resposta.status_code == 200
+    assert "ETag" not in resposta.headers
+    assert resposta.headers["Cache-Control"] == CACHE_REVALIDAR
@@ -0,0 +1,122 @@
+"""
+GET /galeria/{id}/raw: binário em blocos com Range / If-Range / 416
+"""
+import base64
+import io
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.database.session import async_session
+from app.models.galeria import Galeria
+from app.routers import galeria as rotas
+from app.routers.galeria import _faixa_solicitada
+
+ROTA = "/api/v1/galeria/"
+
+
+@pytest.mark.parametrize("cabecalho, faixa", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-5", (95, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=0-1,5-6", None),    # múltiplas faixas: arquivo inteiro
+    ("bytes=9-3", None),        # inválida: ignorada
+    ("bytes=a-b", None),
+    ("items=0-9", None),
+    ("bytes=-", None),
+])
+def test_faixa_solicitada(cabecalho, faixa):
+    assert _faixa_solicitada(cabecalho, 100) == faixa
+
+
+@pytest.mark.parametrize("cabecalho", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_faixa_fora_do_arquivo(cabecalho):
+    with pytest.raises(HTTPException) as erro:
+        _faixa_solicitada(cabecalho, 100)
+    assert erro.value.status_code == 416
+    assert erro.value.headers["Content-Range"] == "bytes */100"
+
+
+@pytest.fixture
+def imagens(client, rodar, auth):
+    """{'blob': (id, bytes), 'legado': (id, bytes)}"""
+    # Ruído: o PNG não comprime e fica com alguns KiB
+    buffer = io.BytesIO()
+    Image.effect_noise((48, 48), 64).save(buffer, "PNG")
+    png = buffer.getvalue()
+    blob = client.post(ROTA, json={"imagem_base64": base64.b64encode(png).decode()}, headers=auth).json()
+
+    legado_bytes = bytes(range(256)) * 4
+
+    async def inserir() -> int:
+        async with async_session() as session:
+            galeria = Galeria(descricao="legado", imagem=legado_bytes)
+            session.add(galeria)
+            await session.commit()
+            return galeria.id_imagem
+
+    return {"blob": (blob["id_imagem"], png), "legado": (rodar(inserir), legado_bytes)}
+
+
+@pytest.mark.parametrize("origem", ["blob", "legado"])
+def test_arquivo_inteiro_e_faixas(client, auth, imagens, origem, monkeypatch):
+    # Blocos pequenos: a faixa atravessa vários SELECT substr(...) na imagem legada
+    monkeypatch.setattr(rotas, "CHUNK_LEGADO", 100)
+    id_imagem, dados = imagens[origem]
+    url = f"{ROTA}{id_imagem}/raw"
+    tamanho = len(dados)
+
+    inteiro = client.get(url, headers=auth)
+    assert inteiro.status_code == 200
+    assert inteiro.content == dados
+    assert inteiro.headers["Accept-Ranges"] == "bytes"
+    assert inteiro.headers["Content-Length"] == str(tamanho)
+    assert "Content-Range" not in inteiro.headers
+
+    for cabecalho, inicio, fim in [
+        ("bytes=0-9", 0, 9),
+        ("bytes=50-349", 50, 349),
+        ("bytes=-20", tamanho - 20, tamanho - 1),
+        (f"bytes={tamanho - 3}-{tamanho + 100}", tamanho - 3, tamanho - 1),
+    ]:
+        parcial = client.get(url, headers={**auth, "Range": cabecalho})
+        assert parcial.status_code == 206, cabecalho
+        assert parcial.content == dados[inicio:fim + 1]
+        assert parcial.headers["Content-Range"] == f"bytes {inicio}-{fim}/{tamanho}"
+        assert parcial.headers["Content-Length"] == str(fim - inicio + 1)
+
+    fora = client.get(url, headers={**auth, "Range": f"bytes={tamanho}-"})
+    assert fora.status_code == 416
+    assert fora.headers["Content-Range"] == f"bytes */{tamanho}"
+
+    if origem == "legado":
+        assert inteiro.headers["content-type"] == "application/octet-stream"
+    else:
+        assert inteiro.headers["content-type"] == "image/png"
+
+
+def test_if_range(client, auth, imagens):
+    id_imagem, dados = imagens["blob"]
+    url = f"{ROTA}{id_imagem}/raw"
+    etag = client.get(url, headers=auth).headers["ETag"]
+
+    mesma_versao = client.get(url, headers={**auth, "Range": "bytes=0-9", "If-Range": etag})
+    assert mesma_versao.status_code == 206
+    assert mesma_versao.content == dados[:10]
+
+    # Versão diferente da que o cliente tem: arquivo inteiro
+    outra_versao = client.get(url, headers={**auth, "Range": "bytes=0-9", "If-Range": '"outra"'})
+    assert outra_versao.status_code == 200
+    assert outra_versao.content == dados
+
+
+def test_imagem_inexistente_ou_sem_arquivo(client, auth):
+    assert client.get(f"{ROTA}999999/raw", headers=auth).status_code == 404
+
+    sem_arquivo = client.post(ROTA, json={"descricao": "sem arquivo"}, headers=auth).json()
+    resposta = client.get(f"{ROTA}{sem_arquivo['id_imagem']}/raw", headers=auth)
+    assert resposta.status_code == 404
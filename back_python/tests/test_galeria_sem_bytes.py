@@ -0,0 +1,94 @@
+"""
+Metadados da galeria sem transferir a coluna legada `imagem` (BYTEA)
+
+Nenhum SELECT das rotas de metadados, criação e edição pode projetar
+galeria.imagem, nem mesmo o refresh após o commit.
+"""
+import base64
+import re
+
+import pytest
+
+from conftest import imagem_png
+from app.database.session import async_session
+from app.models.galeria import Galeria
+
+ROTA = "/api/v1/galeria/"
+# A coluna como item do SELECT; expressões sobre ela (IS NOT NULL,
+# length(...)) são calculadas no banco e não transferem os bytes
+_PROJETA_IMAGEM = re.compile(r"(?:SELECT|,)\s+galeria\.imagem\s*(?:,|FROM\b)")
+
+
+def _selects_com_imagem(comandos) -> list:
+    return [sql for sql in comandos if _PROJETA_IMAGEM.search(sql)]
+
+
+def _legado(rodar, dados: bytes) -> int:
+    """Linha antiga, com os bytes ainda na coluna BYTEA"""
+    async def inserir() -> int:
+        async with async_session() as session:
+            galeria = Galeria(descricao="legado", imagem=dados)
+            session.add(galeria)
+            await session.commit()
+            return galeria.id_imagem
+    return rodar(inserir)
+
+
+def _base64(dados: bytes) -> str:
+    return base64.b64encode(dados).decode()
+
+
+@pytest.fixture
+def aquecido(client, auth):
+    # Carrega o usuário autenticado no cache (fora das capturas)
+    client.get(ROTA, headers=auth)
+    return auth
+
+
+def test_listagem_e_detalhe(client, rodar, aquecido, capturar_sql):
+    legado = _legado(rodar, b"x" * 5000)
+
+    with capturar_sql() as comandos:
+        lista = client.get(ROTA, params={"total": "exact"}, headers=aquecido)
+        detalhe = client.get(f"{ROTA}{legado}", headers=aquecido)
+
+    assert lista.status_code == detalhe.status_code == 200
+    assert detalhe.json()["has_image"] is True
+    assert detalhe.json()["image_size"] == 5000
+    assert _selects_com_imagem(comandos) == []
+
+
+def test_criacao_base64_e_upload(client, aquecido, capturar_sql):
+    with capturar_sql() as comandos:
+        criada = client.post(ROTA, json={"descricao": "a", "imagem_base64": _base64(imagem_png())}, headers=aquecido)
+        enviada = client.post(
+            f"{ROTA}upload", headers=aquecido,
+            data={"descricao": "b"}, files={"arquivo": ("foto.png", imagem_png((9, 9, 9)), "image/png")}
+        )
+
+    assert criada.status_code == enviada.status_code == 201, (criada.text, enviada.text)
+    assert criada.json()["has_image"] and enviada.json()["has_image"]
+    assert _selects_com_imagem(comandos) == []
+
+
+def test_edicao_de_linha_legada(client, rodar, aquecido, capturar_sql):
+    # A linha tem bytes na coluna: o refresh após o commit não pode relê-los
+    # (nem levantar erro pelo raiseload da coluna adiada)
+    sem_troca = _legado(rodar, b"y" * 3000)
+    com_troca = _legado(rodar, b"z" * 3000)
+    com_upload = _legado(rodar, b"w" * 3000)
+
+    with capturar_sql() as comandos:
+        so_descricao = client.put(f"{ROTA}{sem_troca}", json={"descricao": "nova"}, headers=aquecido)
+        nova_imagem = client.put(f"{ROTA}{com_troca}", json={"imagem_base64": _base64(imagem_png())}, headers=aquecido)
+        novo_arquivo = client.put(
+            f"{ROTA}{com_upload}/upload", headers=aquecido,
+            files={"arquivo": ("foto.png", imagem_png((7, 7, 7)), "image/png")}
+        )
+
+    assert so_descricao.status_code == nova_imagem.status_code == novo_arquivo.status_code == 200
+    assert so_descricao.json()["descricao"] == "nova"
+    assert so_descricao.json()["image_size"] == 3000
+    assert nova_imagem.json()["image_hash"] is not None
+    assert novo_arquivo.json()["image_size"] == len(imagem_png((7, 7, 7)))
+    assert _selects_com_imagem(comandos) == []
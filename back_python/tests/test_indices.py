@@ -0,0 +1,58 @@
+"""
+Índices gerenciados (app/database/indexes.py)
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.database import init_db
+from app.database.indexes import INDICES, _ddl_indice, _indices_ausentes, criar_indices
+from app.database.session import engine
+
+
+async def _remover(nomes):
+    async with engine.begin() as conn:
+        for nome in nomes:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {nome}"))
+
+
+async def _ausentes():
+    async with engine.connect() as conn:
+        return await conn.run_sync(_indices_ausentes)
+
+
+@pytest.mark.parametrize("habilitado", [False, True])
+def test_inicializacao_cria_indices_apenas_com_a_flag(rodar, monkeypatch, habilitado):
+    chamadas = []
+    monkeypatch.setattr(init_db, "garantir_indices", chamadas.append)
+    monkeypatch.setattr(settings, "DB_ENSURE_INDEXES", habilitado)
+
+    rodar(init_db.create_db_and_tables)
+
+    assert len(chamadas) == int(habilitado)
+
+
+def test_ddl_concorrente_apenas_quando_pedido():
+    indice = INDICES[0]
+
+    ddl = _ddl_indice(indice, postgresql.dialect(), concorrente=True)
+    assert ddl.startswith(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {indice.name} ")
+    assert "WHERE is_deleted = false" in ddl
+
+    assert "CONCURRENTLY" not in _ddl_indice(indice, postgresql.dialect(), concorrente=False)
+    assert "CONCURRENTLY" not in _ddl_indice(indice, sqlite.dialect(), concorrente=False)
+
+
+def test_create_cria_os_ausentes_em_autocommit(rodar):
+    # Banco existente sem parte dos índices (create_all só cria em tabelas novas)
+    faltando = [indice.name for indice in INDICES[:3]]
+    rodar(_remover, faltando)
+    assert rodar(_ausentes) == faltando
+
+    criados = rodar(criar_indices, engine)
+
+    assert sorted(criados) == sorted(faltando)
+    assert rodar(_ausentes) == []
+    # Idempotente
+    assert rodar(criar_indices, engine) == []
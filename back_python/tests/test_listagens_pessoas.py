@@ -0,0 +1,70 @@
+"""
+Listagens de alunos, professores e servidores: emails em lote (sem N+1)
+
+O email do usuário vinculado vem de uma única consulta por página
+(UsuarioRepository.emails_por_id), então o número de comandos SQL não
+depende do tamanho da página.
+"""
+import pytest
+
+from app.database.session import async_session
+from app.models.aluno import Aluno
+from app.models.professor import Professor
+from app.models.servidor import Servidor
+from app.models.user import User, UserRole
+
+QUANTIDADE = 120
+
+
+async def _popular() -> None:
+    async with async_session() as session:
+        usuarios = [
+            User(email=f"pessoa{i}@escola.com", senha_hash="x", perfil=UserRole.ALUNO)
+            for i in range(3 * QUANTIDADE)
+        ]
+        session.add_all(usuarios)
+        await session.flush()
+
+        for i in range(QUANTIDADE):
+            session.add(Aluno(
+                id_usuario=usuarios[i].id, matricula=f"M{i:05d}", nome=f"Aluno {i}",
+                cpf=f"1{i:010d}", nome_responsavel="Responsável"
+            ))
+            session.add(Professor(
+                id_usuario=usuarios[QUANTIDADE + i].id, nome=f"Professor {i}", cpf=f"2{i:010d}"
+            ))
+            # Metade dos servidores sem usuário vinculado
+            session.add(Servidor(
+                id_usuario=usuarios[2 * QUANTIDADE + i].id if i % 2 == 0 else None,
+                nome=f"Servidor {i}", cpf=f"3{i:010d}"
+            ))
+        await session.commit()
+
+
+@pytest.mark.parametrize("rota", ["/api/v1/alunos/", "/api/v1/professores/", "/api/v1/servidores/"])
+def test_consultas_nao_crescem_com_o_tamanho_da_pagina(client, rodar, auth, capturar_sql, rota):
+    rodar(_popular)
+    # Aquece o cache do usuário autenticado (fora da contagem)
+    assert client.get(rota, params={"limit": 1}, headers=auth).status_code == 200
+
+    contagens = {}
+    for limite in (1, 10, 100):
+        with capturar_sql() as comandos:
+            resposta = client.get(rota, params={"limit": limite}, headers=auth)
+        assert resposta.status_code == 200
+        itens = resposta.json()["items"]
+        assert len(itens) == limite
+        contagens[limite] = len(comandos)
+
+    assert contagens[1] == contagens[10] == contagens[100], contagens
+
+
+def test_emails_dos_usuarios_vinculados(client, rodar, auth):
+    rodar(_popular)
+    itens = client.get("/api/v1/servidores/", params={"limit": 10}, headers=auth).json()["items"]
+
+    for item in itens:
+        if item["id_usuario"] is None:
+            assert item["email_usuario"] is None
+        else:
+            assert item["email_usuario"] == f"pessoa{item['id_usuario'] - 2}@escola.com"
@@ -0,0 +1,101 @@
+"""
+Paginação por cursor (app/core/pagination.py)
+
+Percorrer as páginas por `next_cursor` traz cada linha uma única vez,
+na mesma ordem do modo offset, e cursores adulterados (malformados ou
+com valores de outro tipo) viram 400 antes de chegar ao banco.
+"""
+import base64
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.database.session import async_session
+from app.models.aluno import Aluno
+from app.models.noticia import Noticia
+
+
+def _cursor(valores) -> str:
+    """Cursor montado à mão (como faria um cliente adulterando o valor)"""
+    dados = json.dumps(valores).encode("utf-8")
+    return base64.urlsafe_b64encode(dados).decode("ascii").rstrip("=")
+
+
+async def _popular() -> None:
+    async with async_session() as session:
+        for i in range(25):
+            session.add(Aluno(
+                matricula=f"P{i:04d}", nome=f"Aluno {i}", cpf=f"5{i:010d}", nome_responsavel="Responsável"
+            ))
+            # Várias notícias por dia: o ID desempata a chave de data
+            session.add(Noticia(
+                titulo=f"Notícia {i}", conteudo="Conteúdo da notícia", data=date(2025, 1, 1) + timedelta(days=i // 3)
+            ))
+        await session.commit()
+
+
+def _percorrer(client, rota, auth, chave) -> list:
+    vistos, cursor = [], None
+    while True:
+        params = {"limit": 4, "total": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        corpo = client.get(rota, params=params, headers=auth).json()
+        vistos.extend(item[chave] for item in corpo["items"])
+        cursor = corpo["next_cursor"]
+        if cursor is None:
+            return vistos
+
+
+@pytest.mark.parametrize("rota, chave", [
+    ("/api/v1/alunos/", "id_aluno"),
+    ("/api/v1/noticias/", "id_noticia"),
+])
+def test_cursor_percorre_como_offset(client, rodar, auth, rota, chave):
+    rodar(_popular)
+
+    por_cursor = _percorrer(client, rota, auth, chave)
+    por_offset = [
+        item[chave]
+        for item in client.get(rota, params={"limit": 100}, headers=auth).json()["items"]
+    ]
+
+    assert len(por_cursor) == 25
+    assert por_cursor == por_offset
+
+
+@pytest.mark.parametrize("rota, cursor", [
+    ("/api/v1/alunos/", "não-é-base64!"),
+    ("/api/v1/alunos/", _cursor([1, 2])),                                  # quantidade de chaves
+    ("/api/v1/alunos/", _cursor(["abc"])),                                 # texto numa chave inteira
+    ("/api/v1/alunos/", _cursor([True])),
+    ("/api/v1/alunos/", _cursor([None])),
+    ("/api/v1/noticias/", _cursor([{"dt": "2025-01-01T10:00:00"}, 3])),    # datetime numa chave de data
+    ("/api/v1/noticias/", _cursor([{"d": "2025-13-40"}, 3])),
+    ("/api/v1/noticias/", _cursor([{"d": "2025-01-01"}, "3"])),
+    ("/api/v1/aluno-turma/", _cursor([{"d": "2025-01-01"}, 3])),           # data numa chave datetime
+    ("/api/v1/aluno-turma/", _cursor(["2025-01-01T10:00:00", 3])),
+])
+def test_cursor_invalido_retorna_400(client, auth, rota, cursor):
+    resposta = client.get(rota, params={"cursor": cursor}, headers=auth)
+
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Cursor de paginação inválido"
+
+
+def test_decode_cursor_preserva_tipos():
+    agora = datetime(2025, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor([agora, date(2025, 3, 1), 7, "Turma A"])
+
+    assert decode_cursor(cursor, 4, [datetime, date, int, str]) == [agora, date(2025, 3, 1), 7, "Turma A"]
+    # Sem tipos (compatibilidade): só a estrutura é validada
+    assert decode_cursor(cursor, 4) == [agora, date(2025, 3, 1), 7, "Turma A"]
+
+
+def test_decode_cursor_converte_inteiro_em_float():
+    assert decode_cursor(encode_cursor([3]), 1, [float]) == [3.0]
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(["3"]), 1, [float])
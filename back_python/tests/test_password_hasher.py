@@ -0,0 +1,106 @@
+"""Pool de hash de senhas: fora do event loop, fila limitada e lotes"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.password_hasher import PasswordHasher
+from app.core.security import get_password_hash_async, verify_password_async
+
+
+def _dormir(segundos: float) -> float:
+    time.sleep(segundos)
+    return segundos
+
+
+def test_hash_e_verificacao_assincronos(rodar):
+    async def cenario():
+        hash_ = await get_password_hash_async("senha123")
+        return (
+            await verify_password_async("senha123", hash_),
+            await verify_password_async("outra123", hash_),
+        )
+
+    assert rodar(cenario) == (True, False)
+
+
+def test_event_loop_continua_livre_durante_o_hash():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+
+    async def cenario():
+        batidas = 0
+
+        async def relogio():
+            nonlocal batidas
+            while True:
+                await asyncio.sleep(0.01)
+                batidas += 1
+
+        tarefa = asyncio.create_task(relogio())
+        await hasher.run(_dormir, 0.3)
+        tarefa.cancel()
+        return batidas
+
+    try:
+        assert asyncio.run(cenario()) >= 10
+    finally:
+        hasher.shutdown()
+
+
+def test_fila_cheia_rejeita_com_503():
+    hasher = PasswordHasher(max_workers=1, max_queue=1, retry_after=7)
+
+    async def cenario():
+        ocupando = [asyncio.create_task(hasher.run(_dormir, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as erro:
+            await hasher.run(_dormir, 0)
+        await asyncio.gather(*ocupando)
+        return erro.value
+
+    try:
+        erro = asyncio.run(cenario())
+    finally:
+        hasher.shutdown()
+
+    assert erro.status_code == 503
+    assert erro.headers["Retry-After"] == "7"
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["completed"] == 2
+
+
+def test_lote_aguarda_vagas_e_mantem_a_ordem():
+    hasher = PasswordHasher(max_workers=2, max_queue=0)
+    simultaneas = 0
+    pico = 0
+    trava = threading.Lock()
+
+    def tarefa(indice: int) -> int:
+        nonlocal simultaneas, pico
+        with trava:
+            simultaneas += 1
+            pico = max(pico, simultaneas)
+        time.sleep(0.02)
+        with trava:
+            simultaneas -= 1
+        return indice
+
+    try:
+        resultados = asyncio.run(hasher.run_many(tarefa, [(i,) for i in range(10)]))
+    finally:
+        hasher.shutdown()
+
+    # O lote não usa a fila (max_queue=0) nem passa de max_workers
+    assert resultados == list(range(10))
+    assert pico <= 2
+    assert hasher.stats()["rejected"] == 0
+
+
+def test_pool_de_processos():
+    hasher = PasswordHasher(executor="process", max_workers=1)
+    try:
+        assert asyncio.run(hasher.run(_dormir, 0)) == 0
+    finally:
+        hasher.shutdown()
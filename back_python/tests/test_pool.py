@@ -0,0 +1,67 @@
+"""
+Pool de conexões configurável e estatísticas em /metrics
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from conftest import cabecalhos_de
+from app.core.config import settings
+from app.database import session as modulo
+from app.models.user import UserRole
+
+
+def test_pool_monitorado_mede_espera_e_timeouts(tmp_path):
+    async def cenario():
+        motor = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+            poolclass=modulo.PoolMonitorado, pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+        try:
+            async with motor.connect():
+                ocupado = modulo._pool_stats(motor)
+                with pytest.raises(exc.TimeoutError):
+                    async with motor.connect():
+                        pass
+            livre = modulo._pool_stats(motor)
+        finally:
+            await motor.dispose()
+        return ocupado, livre
+
+    ocupado, livre = asyncio.run(cenario())
+
+    assert (ocupado["checked_out"], ocupado["idle"]) == (1, 0)
+    assert (livre["checked_out"], livre["idle"]) == (0, 1)
+    assert livre["timeouts"] == 1
+    # Checkout bem-sucedido + o que esperou até o timeout (>= 50 ms)
+    assert livre["checkout_wait"]["count"] == 2
+    assert livre["checkout_wait"]["max_ms"] >= 50
+
+
+def test_parametros_do_engine(monkeypatch):
+    assert modulo._engine_kwargs("sqlite+aiosqlite:///x.db") == {}
+
+    url = "postgresql+asyncpg://u:s@localhost/escola"
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    kwargs = modulo._engine_kwargs(url)
+    assert kwargs["poolclass"] is modulo.PoolMonitorado
+    assert kwargs["pool_size"] == settings.DB_POOL_SIZE
+    assert kwargs["connect_args"]["statement_cache_size"] == settings.DB_STATEMENT_CACHE_SIZE
+
+    # PgBouncer (transaction pooling): sem cache e com nomes únicos
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    connect_args = modulo._engine_kwargs(url)["connect_args"]
+    assert connect_args["statement_cache_size"] == connect_args["prepared_statement_cache_size"] == 0
+    nome = connect_args["prepared_statement_name_func"]
+    assert nome() != nome()
+
+
+def test_metrics_expoe_o_pool_apenas_para_admin(client, auth, criar_usuario):
+    resposta = client.get("/api/v1/metrics/", headers=auth)
+    assert resposta.status_code == 200
+    assert "primary" in resposta.json()["db_pool"]
+
+    professor = criar_usuario("prof@escola.com", UserRole.PROFESSOR)
+    assert client.get("/api/v1/metrics/", headers=cabecalhos_de(professor)).status_code == 403
@@ -0,0 +1,97 @@
+"""
+Provisionamento de usuários em lote (POST /alunos/provisionar-usuarios)
+
+Conflitos de email/CPF, com usuários existentes ou entre alunos do
+mesmo lote, são reportados por aluno; os demais são criados.
+"""
+from app.database.session import async_session
+from app.models.aluno import Aluno
+from app.models.user import User, UserRole
+
+ROTA = "/api/v1/alunos/provisionar-usuarios"
+
+
+def _criar_alunos(rodar, *dados) -> list:
+    """dados: (matricula, cpf) de cada aluno; retorna os IDs"""
+    async def inserir() -> list:
+        async with async_session() as session:
+            alunos = [
+                Aluno(matricula=matricula, nome=f"Aluno {matricula}", cpf=cpf, nome_responsavel="Responsável")
+                for matricula, cpf in dados
+            ]
+            session.add_all(alunos)
+            await session.commit()
+            return [aluno.id_aluno for aluno in alunos]
+    return rodar(inserir)
+
+
+def _por_aluno(resposta) -> dict:
+    assert resposta.status_code == 200, resposta.text
+    return {item["id_aluno"]: item for item in resposta.json()["itens"]}
+
+
+def test_cria_e_vincula_usuarios(client, rodar, auth):
+    ids = _criar_alunos(rodar, ("A001", "11111111111"), ("A002", "22222222222"))
+
+    resposta = client.post(ROTA, json={
+        "ids_aluno": ids, "dominio_email": "aluno.escola.com", "senha_inicial": "senha123"
+    }, headers=auth)
+
+    itens = _por_aluno(resposta)
+    assert resposta.json()["criados"] == 2
+    assert itens[ids[0]]["email"] == "a001@aluno.escola.com"
+    assert all(item["status"] == "criado" and item["id_usuario"] for item in itens.values())
+    login = client.post("/api/v1/auth/login", json={"email": "a002@aluno.escola.com", "senha": "senha123"})
+    assert login.status_code == 200
+
+
+def test_matriculas_equivalentes_no_mesmo_lote(client, rodar, auth):
+    # "B001" e " b001" geram o mesmo email: o segundo vira erro, sem 409
+    ids = _criar_alunos(rodar, ("B001", "33333333333"), (" b001", "44444444444"), ("B002", "55555555555"))
+
+    resposta = client.post(ROTA, json={"ids_aluno": ids, "dominio_email": "escola.com"}, headers=auth)
+
+    itens = _por_aluno(resposta)
+    assert itens[ids[0]]["status"] == "criado"
+    assert itens[ids[1]]["status"] == "erro"
+    assert itens[ids[1]]["email"] == "b001@escola.com"
+    assert "lote" in itens[ids[1]]["motivo"]
+    assert itens[ids[2]]["status"] == "criado"
+    assert (resposta.json()["criados"], resposta.json()["erros"]) == (2, 1)
+
+
+def test_conflitos_com_usuarios_existentes(client, rodar, auth, criar_usuario):
+    criar_usuario("c001@escola.com", UserRole.ALUNO)
+    criar_usuario("outro@escola.com", UserRole.ALUNO, cpf="77777777777")
+    ids = _criar_alunos(rodar, ("C001", "66666666666"), ("C002", "77777777777"), ("C003", "88888888888"))
+
+    itens = _por_aluno(client.post(ROTA, json={"ids_aluno": ids, "dominio_email": "escola.com"}, headers=auth))
+
+    assert itens[ids[0]]["motivo"] == "Este email já está em uso"
+    assert itens[ids[1]]["motivo"] == "CPF já vinculado a outro usuário"
+    assert itens[ids[2]]["status"] == "criado"
+    assert itens[ids[2]]["senha_gerada"]
+
+
+def test_ignora_alunos_com_usuario_e_ids_inexistentes(client, rodar, auth, criar_usuario):
+    usuario = criar_usuario("d001@escola.com", UserRole.ALUNO)
+    ids = _criar_alunos(rodar, ("D001", "99999999999"))
+
+    async def vincular():
+        async with async_session() as session:
+            aluno = await session.get(Aluno, ids[0])
+            aluno.id_usuario = usuario.id
+            await session.commit()
+    rodar(vincular)
+
+    itens = _por_aluno(client.post(ROTA, json={
+        "ids_aluno": [ids[0], 999999], "dominio_email": "escola.com"
+    }, headers=auth))
+
+    assert itens[ids[0]]["status"] == "ignorado"
+    assert itens[999999]["motivo"] == "Aluno não encontrado"
+
+    async def contar_usuarios() -> int:
+        async with async_session() as session:
+            return len((await session.execute(User.__table__.select())).all())
+    assert rodar(contar_usuarios) == 2  # admin + usuário existente
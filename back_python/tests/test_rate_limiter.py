@@ -0,0 +1,148 @@
+"""Limitador de tentativas de login/cadastro (janela deslizante aproximada)"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import rate_limiter as modulo
+from app.core.rate_limiter import LoginRateLimiter, MemoryBackend
+from app.routers import auth
+
+from conftest import SENHA_PADRAO
+
+
+def _requisicao(ip: str = "10.0.0.1", encaminhado: str = None) -> Request:
+    cabecalhos = [(b"x-forwarded-for", encaminhado.encode())] if encaminhado else []
+    return Request({"type": "http", "headers": cabecalhos, "client": (ip, 1234)})
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Horário controlado pelo teste (início de uma janela de 60 s)"""
+    agora = [6000.0]
+    monkeypatch.setattr(modulo.time, "time", lambda: agora[0])
+    return agora
+
+
+@pytest.fixture
+def bcrypt_chamado(monkeypatch):
+    chamadas = []
+    original = auth.verify_password_async
+
+    async def contar(*args):
+        chamadas.append(args)
+        return await original(*args)
+
+    monkeypatch.setattr(auth, "verify_password_async", contar)
+    return chamadas
+
+
+def test_limite_por_email_antes_do_bcrypt(client, admin, bcrypt_chamado):
+    credenciais = {"email": "admin@escola.com", "senha": "errada"}
+    for _ in range(5):
+        assert client.post("/api/v1/auth/login", json=credenciais).status_code == 401
+
+    resposta = client.post("/api/v1/auth/login", json={**credenciais, "senha": SENHA_PADRAO})
+
+    assert resposta.status_code == 429
+    assert int(resposta.headers["Retry-After"]) >= 1
+    # A sexta tentativa foi rejeitada sem executar o bcrypt
+    assert len(bcrypt_chamado) == 5
+
+
+def test_email_normalizado(relogio):
+    limitador = LoginRateLimiter(per_email=2, per_ip=0)
+
+    async def cenario():
+        await limitador.check(_requisicao(), "Admin@Escola.com")
+        await limitador.check(_requisicao(), " admin@escola.com ")
+        await limitador.check(_requisicao(), "ADMIN@ESCOLA.COM")
+
+    with pytest.raises(HTTPException) as erro:
+        asyncio.run(cenario())
+    assert erro.value.status_code == 429
+    assert limitador.rejected_email == 1
+
+
+def test_limite_por_ip_com_emails_diferentes(relogio):
+    limitador = LoginRateLimiter(per_email=5, per_ip=3)
+
+    async def cenario():
+        for i in range(3):
+            await limitador.check(_requisicao(), f"u{i}@escola.com")
+        await limitador.check(_requisicao("10.0.0.2"), "outro@escola.com")
+        await limitador.check(_requisicao(), "mais-um@escola.com")
+
+    with pytest.raises(HTTPException):
+        asyncio.run(cenario())
+    assert limitador.allowed == 4
+    assert limitador.rejected_ip == 1
+
+
+def test_janela_anterior_decai(relogio):
+    limitador = LoginRateLimiter(window_seconds=60, per_email=4, per_ip=0)
+    requisicao = _requisicao()
+
+    async def tentativas(n):
+        for _ in range(n):
+            await limitador.check(requisicao, "a@escola.com")
+
+    asyncio.run(tentativas(4))
+
+    # No início da janela seguinte as 4 anteriores ainda pesam quase inteiras
+    relogio[0] += 61
+    with pytest.raises(HTTPException):
+        asyncio.run(tentativas(1))
+
+    # Com 3/4 da janela decorridos, pesam 4 * 0.25 = 1 (+1 da rejeitada acima)
+    relogio[0] += 44
+    asyncio.run(tentativas(2))
+    with pytest.raises(HTTPException):
+        asyncio.run(tentativas(1))
+
+
+def test_x_forwarded_for_so_atras_de_proxy_confiavel():
+    confia = LoginRateLimiter(trust_proxy=True)
+    nao_confia = LoginRateLimiter(trust_proxy=False)
+    requisicao = _requisicao("10.0.0.1", "203.0.113.7, 10.0.0.1")
+
+    assert confia.client_ip(requisicao) == "203.0.113.7"
+    assert nao_confia.client_ip(requisicao) == "10.0.0.1"
+
+
+def test_compactacao_remove_chaves_ociosas(relogio):
+    backend = MemoryBackend(window_seconds=60)
+
+    async def cenario():
+        await backend.hit("antiga", relogio[0])
+        relogio[0] += 180
+        await backend.hit("nova", relogio[0])
+
+    asyncio.run(cenario())
+    assert backend.size() == 1
+    assert backend.compactions == 1
+
+
+def test_backend_no_banco(rodar, relogio):
+    limitador = LoginRateLimiter(backend="database", per_email=2, per_ip=0)
+
+    async def cenario():
+        await limitador.check(_requisicao(), "a@escola.com")
+        await limitador.check(_requisicao(), "a@escola.com")
+        with pytest.raises(HTTPException):
+            await limitador.check(_requisicao(), "a@escola.com")
+
+    rodar(cenario)
+    assert limitador.rejected_email == 1
+
+
+def test_cadastro_tem_escopo_proprio(relogio):
+    limitador = LoginRateLimiter(per_email=1, per_ip=0)
+
+    async def cenario():
+        await limitador.check(_requisicao(), "a@escola.com", escopo="login")
+        await limitador.check(_requisicao(), "a@escola.com", escopo="signup")
+
+    asyncio.run(cenario())
+    assert limitador.allowed == 2
@@ -0,0 +1,141 @@
+"""Rotação de refresh tokens, detecção de reuso, logout e índice de revogação"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.core.refresh_tokens import (
+    RevocationIndex,
+    carregar_indice_revogacao,
+    purgar_refresh_tokens_expirados,
+    revocation_index,
+)
+from app.database.session import async_session
+from app.main import app
+from app.models.refresh_token import RefreshToken
+
+from conftest import SENHA_PADRAO
+
+
+def _login(client, email="admin@escola.com"):
+    resposta = client.post("/api/v1/auth/login", json={"email": email, "senha": SENHA_PADRAO})
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+def _refresh(client, token):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+
+
+def _me(client, tokens):
+    return client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+
+
+def test_rotacao_emite_um_novo_par(client, admin):
+    tokens = _login(client)
+
+    resposta = _refresh(client, tokens["refresh_token"])
+
+    assert resposta.status_code == 200
+    novos = resposta.json()
+    assert novos["refresh_token"] != tokens["refresh_token"]
+    assert _me(client, novos).status_code == 200
+    assert _refresh(client, novos["refresh_token"]).status_code == 200
+
+
+def test_reuso_encerra_a_sessao_inteira(client, admin):
+    tokens = _login(client)
+    novos = _refresh(client, tokens["refresh_token"]).json()
+
+    reuso = _refresh(client, tokens["refresh_token"])
+
+    assert reuso.status_code == 401
+    assert "reutilizado" in reuso.json()["detail"]
+    # Toda a família foi revogada: o token legítimo mais novo e os access tokens
+    assert _refresh(client, novos["refresh_token"]).status_code == 401
+    assert _me(client, novos).status_code == 401
+    assert _me(client, tokens).status_code == 401
+
+
+def test_refresh_simultaneo_do_mesmo_token_tem_um_vencedor(client, rodar, admin):
+    tokens = _login(client)
+
+    async def duas_renovacoes():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            return await asyncio.gather(*(
+                cliente.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+                for _ in range(2)
+            ))
+
+    codigos = sorted(resposta.status_code for resposta in rodar(duas_renovacoes))
+
+    assert codigos == [200, 401]
+
+
+def test_logout_revoga_so_a_propria_sessao(client, admin):
+    sessao = _login(client)
+    outra = _login(client)
+
+    resposta = client.post("/api/v1/auth/logout", json={"refresh_token": sessao["refresh_token"]})
+
+    assert resposta.status_code == 204
+    assert _refresh(client, sessao["refresh_token"]).status_code == 401
+    assert _me(client, sessao).status_code == 401
+    assert _me(client, outra).status_code == 200
+    assert _refresh(client, outra["refresh_token"]).status_code == 200
+
+
+def test_access_token_nao_serve_como_refresh(client, admin):
+    tokens = _login(client)
+    assert _refresh(client, tokens["access_token"]).status_code == 401
+
+
+def test_indice_carrega_revogacoes_feitas_por_outro_worker(rodar, admin):
+    async def cenario():
+        async with async_session() as session:
+            session.add(RefreshToken(
+                jti="a" * 32, familia="familia-revogada", id_usuario=admin.id,
+                expira_em=datetime.utcnow() + timedelta(hours=1), revogado_em=datetime.utcnow()
+            ))
+            await session.commit()
+            await carregar_indice_revogacao(session)
+
+    rodar(cenario)
+
+    assert revocation_index.is_revoked("familia-revogada")
+    assert not revocation_index.is_revoked("outra-familia")
+
+
+def test_purga_de_expirados_em_lotes(rodar, admin):
+    async def cenario():
+        async with async_session() as session:
+            for i in range(5):
+                session.add(RefreshToken(
+                    jti=f"{i:032d}", familia="f", id_usuario=admin.id,
+                    expira_em=datetime.utcnow() - timedelta(minutes=1)
+                ))
+            session.add(RefreshToken(
+                jti="v" * 32, familia="f", id_usuario=admin.id,
+                expira_em=datetime.utcnow() + timedelta(hours=1)
+            ))
+            await session.commit()
+            return await purgar_refresh_tokens_expirados(session, batch_size=2)
+
+    assert rodar(cenario) == 5
+
+
+def test_indice_de_revogacao():
+    indice = RevocationIndex(capacity=100)
+
+    indice.revoke("viva", time.time() + 60)
+    indice.revoke("expirada", time.time() - 1)
+
+    assert indice.is_revoked("viva")
+    assert not indice.is_revoked("expirada")
+    assert not indice.is_revoked(None)
+    assert not indice.is_revoked("desconhecida")
+
+    indice.replace({})
+    assert not indice.is_revoked("viva")
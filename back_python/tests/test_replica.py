@@ -0,0 +1,74 @@
+"""
+Roteamento das leituras para a réplica (get_read_session)
+
+A "réplica" (fixture `replica` do conftest) é um segundo SQLite com as
+mesmas tabelas, vazio: o que a listagem devolve mostra de qual banco
+ela leu. Depois de uma escrita, as leituras do mesmo usuário
+(identificado pelo token validado) vão para o primário durante
+READ_AFTER_WRITE_SECONDS.
+"""
+import jwt
+from starlette.requests import Request
+
+from conftest import cabecalhos_de
+from app.core.config import settings
+from app.database import session as modulo
+from app.models.user import UserRole
+
+ROTA = "/api/v1/alunos/"
+ALUNO = {
+    "cpf": "12345678900", "matricula": "R0001", "nome": "Aluno da Réplica",
+    "nome_responsavel": "Responsável", "data_nascimento": "2010-05-15"
+}
+
+
+def _matriculas(client, headers) -> list:
+    resposta = client.get(ROTA, headers=headers)
+    assert resposta.status_code == 200
+    return [item["matricula"] for item in resposta.json()["items"]]
+
+
+def test_leituras_vao_para_a_replica_e_o_autor_le_do_primario(client, replica, auth, criar_usuario):
+    outro = cabecalhos_de(criar_usuario("outro@escola.com", UserRole.ADMIN))
+    assert _matriculas(client, auth) == []
+
+    assert client.post(ROTA, json=ALUNO, headers=auth).status_code == 201
+
+    # Autor da escrita: primário (vê o aluno); outro usuário: réplica (atrasada)
+    assert _matriculas(client, auth) == ["R0001"]
+    assert _matriculas(client, outro) == []
+    assert modulo.leituras_no_primario == 1
+
+
+def test_janela_expira(client, replica, auth, monkeypatch):
+    assert client.post(ROTA, json=ALUNO, headers=auth).status_code == 201
+    monkeypatch.setattr(settings, "READ_AFTER_WRITE_SECONDS", 0)
+    assert client.post(ROTA, json={**ALUNO, "cpf": "98765432100", "matricula": "R0002"}, headers=auth).status_code == 201
+
+    assert _matriculas(client, auth) == []
+
+
+def test_token_forjado_nao_usa_a_janela_do_usuario(client, replica, admin, auth):
+    assert client.post(ROTA, json=ALUNO, headers=auth).status_code == 201
+
+    # Mesmo "sub" do autor, assinatura inválida: rejeitado antes de qualquer leitura
+    forjado = jwt.encode({"sub": str(admin.id), "type": "access"}, "outra-chave", algorithm="HS256")
+    resposta = client.get(ROTA, headers={"Authorization": f"Bearer {forjado}"})
+
+    assert resposta.status_code == 401
+    assert modulo.leituras_no_primario == 0
+
+
+def test_chave_do_cliente_sem_usuario_validado_e_o_ip():
+    def requisicao(headers=()):
+        return Request({
+            "type": "http", "headers": list(headers), "client": ("10.0.0.7", 1234), "state": {}
+        })
+
+    # O bearer token, sozinho, não identifica o cliente (não foi validado)
+    sem_validacao = requisicao([(b"authorization", b"Bearer qualquer.coisa.aqui")])
+    assert modulo._chave_cliente(sem_validacao) == "ip:10.0.0.7"
+
+    validada = requisicao()
+    validada.state.id_usuario = 42
+    assert modulo._chave_cliente(validada) == "usuario:42"
@@ -0,0 +1,146 @@
+"""
+Cache de respostas (app/core/response_cache.py): coalescência de misses,
+stale-while-revalidate, invalidação por escrita e preenchimento no primário
+"""
+import asyncio
+from typing import Optional
+
+from conftest import cabecalhos_de
+from app.core.response_cache import CacheRespostas, cache_respostas
+from app.models.user import UserRole
+
+NOTICIA = {"titulo": "Reunião de pais", "conteudo": "Reunião de pais e mestres na sexta-feira."}
+
+
+class _Carregador:
+    """carregar(session) que conta as chamadas e devolve "v1", "v2", ..."""
+
+    def __init__(self, espera: float = 0, falhar_depois_de: Optional[int] = None):
+        self.chamadas = 0
+        self.espera = espera
+        self.falhar_depois_de = falhar_depois_de
+
+    async def __call__(self, session) -> str:
+        self.chamadas += 1
+        await asyncio.sleep(self.espera)
+        if self.falhar_depois_de is not None and self.chamadas > self.falhar_depois_de:
+            raise RuntimeError("banco indisponível")
+        return f"v{self.chamadas}"
+
+
+async def _esperar_atualizacoes(cache: CacheRespostas) -> None:
+    await asyncio.gather(*cache._em_andamento.values(), return_exceptions=True)
+
+
+def test_misses_simultaneos_fazem_uma_consulta():
+    cache = CacheRespostas(ttl=60, stale=0, max_size=10)
+    carregar = _Carregador(espera=0.05)
+
+    async def cenario():
+        valores = await asyncio.gather(*[cache.obter("lista", ["noticias"], None, carregar) for _ in range(5)])
+        return valores, await cache.obter("lista", ["noticias"], None, carregar)
+
+    valores, depois = asyncio.run(cenario())
+
+    assert valores == ["v1"] * 5 and depois == "v1"
+    assert carregar.chamadas == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (5, 4, 1)
+
+
+def test_resposta_velha_servida_enquanto_atualiza():
+    cache = CacheRespostas(ttl=0, stale=60, max_size=10)
+    carregar = _Carregador()
+
+    async def cenario():
+        primeira = await cache.obter("lista", ["noticias"], None, carregar)
+        velha = await cache.obter("lista", ["noticias"], None, carregar)
+        # Várias requisições velhas: uma única atualização
+        await cache.obter("lista", ["noticias"], None, carregar)
+        await _esperar_atualizacoes(cache)
+        return primeira, velha, await cache.obter("lista", ["noticias"], None, carregar)
+
+    assert asyncio.run(cenario()) == ("v1", "v1", "v2")
+    assert cache.stats()["stale_hits"] == 3
+
+
+def test_varios_workers_limitam_o_stale_ao_ttl():
+    assert CacheRespostas(ttl=30, stale=300, max_size=10).stale == 300
+    varios = CacheRespostas(ttl=30, stale=300, max_size=10, processos=4)
+    assert varios.stale == 30
+    assert varios._respostas.ttl == 60
+    assert CacheRespostas(ttl=30, stale=10, max_size=10, processos=4).stale == 10
+
+
+def test_falha_na_atualizacao_mantem_a_resposta_velha():
+    cache = CacheRespostas(ttl=0, stale=60, max_size=10)
+    carregar = _Carregador(falhar_depois_de=1)
+
+    async def cenario():
+        await cache.obter("lista", ["noticias"], None, carregar)
+        await cache.obter("lista", ["noticias"], None, carregar)
+        await _esperar_atualizacoes(cache)
+        return await cache.obter("lista", ["noticias"], None, carregar)
+
+    assert asyncio.run(cenario()) == "v1"
+    assert cache.stats()["refresh_errors"] >= 1
+
+
+def test_invalidacao_por_tabela_e_clear():
+    cache = CacheRespostas(ttl=60, stale=0, max_size=10)
+    noticias, galeria = _Carregador(), _Carregador()
+
+    async def obter():
+        return (
+            await cache.obter("noticias", ["noticias"], None, noticias),
+            await cache.obter("galeria", ["galeria"], None, galeria),
+        )
+
+    async def cenario():
+        antes = await obter()
+        cache.invalidar({"noticias"})
+        depois = await obter()
+        cache.clear()
+        return antes, depois, await obter()
+
+    assert asyncio.run(cenario()) == (("v1", "v1"), ("v2", "v1"), ("v3", "v2"))
+
+
+def test_desabilitado_usa_a_sessao_da_requisicao():
+    cache = CacheRespostas(ttl=60, stale=0, max_size=0)
+    recebidas = []
+
+    async def carregar(session):
+        recebidas.append(session)
+        return len(recebidas)
+
+    async def cenario():
+        return [await cache.obter("lista", ["noticias"], "sessao", carregar) for _ in range(2)]
+
+    assert asyncio.run(cenario()) == [1, 2]
+    assert recebidas == ["sessao", "sessao"]
+
+
+def test_escrita_invalida_as_listagens(client, auth):
+    # Contadores do cache global não são zerados entre testes
+    misses = cache_respostas.stats()["misses"]
+    assert client.get("/api/v1/noticias/", headers=auth).json()["total"] == 0
+    assert client.get("/api/v1/noticias/", headers=auth).json()["total"] == 0
+
+    assert client.post("/api/v1/noticias/", json=NOTICIA, headers=auth).status_code == 201
+
+    assert client.get("/api/v1/noticias/", headers=auth).json()["total"] == 1
+    assert cache_respostas.stats()["misses"] - misses == 2
+
+
+def test_preenchimento_no_primario_com_replica_atrasada(client, replica, auth, criar_usuario):
+    # Outro usuário lê pela réplica (fora da janela read-your-writes do autor)
+    leitor = cabecalhos_de(criar_usuario("leitor@escola.com", UserRole.PROFESSOR))
+
+    assert client.post("/api/v1/noticias/", json=NOTICIA, headers=auth).status_code == 201
+
+    # A réplica ainda não tem a notícia: o cache não pode guardar a
+    # listagem dela sob a geração nova
+    for headers in (leitor, auth, leitor):
+        titulos = [item["titulo"] for item in client.get("/api/v1/noticias/", headers=headers).json()["items"]]
+        assert titulos == [NOTICIA["titulo"]]
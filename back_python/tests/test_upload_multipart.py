@@ -0,0 +1,101 @@
+"""
+Upload multipart em streaming (app/core/upload.py, POST /galeria/upload)
+"""
+import os
+
+import pytest
+
+from conftest import cabecalhos_de, imagem_png
+from app.core.blob_store import blob_store
+from app.core.config import settings
+from app.models.user import UserRole
+
+ROTA = "/api/v1/galeria/upload"
+
+
+def _temporarios() -> list:
+    return os.listdir(blob_store.dir_temporario())
+
+
+@pytest.fixture(autouse=True)
+def sem_temporarios():
+    # Todo upload, aceito ou recusado, remove (ou move) o seu temporário
+    yield
+    assert _temporarios() == []
+
+
+def test_upload_com_campos(client, auth):
+    png = imagem_png()
+
+    resposta = client.post(
+        ROTA, headers=auth,
+        data={"descricao": "Feira de ciências", "data": "2025-09-10"},
+        files={"arquivo": ("feira.png", png, "application/octet-stream")}
+    )
+
+    assert resposta.status_code == 201, resposta.text
+    corpo = resposta.json()
+    assert (corpo["descricao"], corpo["data"], corpo["image_size"]) == ("Feira de ciências", "2025-09-10", len(png))
+    # Tipo verificado pelo conteúdo, não pelo Content-Type informado
+    assert client.get(f"/api/v1/galeria/{corpo['id_imagem']}/raw", headers=auth).headers["content-type"] == "image/png"
+
+
+def test_arquivo_menor_que_o_cabecalho_de_formato(client, auth):
+    resposta = client.post(ROTA, headers=auth, files={"arquivo": ("mini.gif", b"GIF89a", "image/gif")})
+    assert resposta.status_code == 201
+    assert resposta.json()["image_size"] == 6
+
+
+@pytest.mark.parametrize("kwargs, status_esperado, detalhe", [
+    ({"json": {"descricao": "x"}}, 400, "multipart/form-data"),
+    ({"data": {"descricao": "sem arquivo"}, "files": {"outro": (None, "x")}}, 400, "campo 'arquivo'"),
+    ({"files": {"foto": ("a.png", imagem_png(), "image/png")}}, 400, "campo 'arquivo'"),
+    ({"files": [("arquivo", ("a.png", imagem_png(), "image/png")), ("arquivo", ("b.png", imagem_png(), "image/png"))]}, 400, "único arquivo"),
+    ({"files": {"arquivo": ("a.txt", b"apenas um texto qualquer", "text/plain")}}, 415, "não suportado"),
+    ({"data": {"descricao": "x" * 300}, "files": {"arquivo": ("a.png", imagem_png(), "image/png")}}, 422, None),
+    ({"data": {"descricao": "x" * (70 * 1024)}, "files": {"arquivo": ("a.png", imagem_png(), "image/png")}}, 413, "Campos"),
+])
+def test_formularios_recusados(client, auth, kwargs, status_esperado, detalhe):
+    resposta = client.post(ROTA, headers=auth, **kwargs)
+
+    assert resposta.status_code == status_esperado, resposta.text
+    if detalhe:
+        assert detalhe in resposta.json()["detail"]
+
+
+@pytest.mark.parametrize("final", [
+    b"\r\n--outra-coisa--\r\n",  # boundary final errado
+    b"",                            # corpo truncado no meio do arquivo
+])
+def test_corpo_malformado_ou_truncado(client, auth, final):
+    resposta = client.post(
+        ROTA, headers={**auth, "Content-Type": "multipart/form-data; boundary=xyz"},
+        content=b"--xyz\r\nContent-Disposition: form-data; name=\"arquivo\"; filename=\"a.png\"\r\n\r\n"
+                + imagem_png() + final
+    )
+
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Formulário multipart malformado"
+    assert client.get("/api/v1/galeria/", headers=auth).json()["total"] == 0
+
+
+def test_limite_de_tamanho(client, auth, monkeypatch):
+    monkeypatch.setattr(settings, "GALERIA_UPLOAD_MAX_BYTES", 1024)
+    grande = imagem_png() + b"\0" * 2048
+
+    # Passa do limite durante a leitura (Content-Length dentro da folga dos campos)
+    resposta = client.post(ROTA, headers=auth, files={"arquivo": ("a.png", grande, "image/png")})
+    assert resposta.status_code == 413
+
+    # Content-Length declarado já acima do limite: recusado antes de ler o corpo
+    enorme = imagem_png() + b"\0" * (200 * 1024)
+    resposta = client.post(ROTA, headers=auth, files={"arquivo": ("a.png", enorme, "image/png")})
+    assert resposta.status_code == 413
+
+    assert client.get("/api/v1/galeria/", headers=auth).json()["total"] == 0
+
+
+def test_perfil_sem_permissao(client, criar_usuario):
+    aluno = cabecalhos_de(criar_usuario("aluno@escola.com", UserRole.ALUNO))
+    resposta = client.post(ROTA, headers=aluno, files={"arquivo": ("a.png", imagem_png(), "image/png")})
+    assert resposta.status_code == 403
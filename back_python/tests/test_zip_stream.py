@@ -0,0 +1,144 @@
+"""
+ZIP em streaming (app/core/zip_stream.py) e GET /galeria/evento/{id}/zip
+"""
+import asyncio
+import io
+import struct
+import zipfile
+from datetime import date, datetime
+
+import pytest
+
+from conftest import imagem_png
+from app.core.blob_store import BlobNaoEncontrado, blob_store
+from app.core.zip_stream import EntradaZip, stream_zip
+from app.database.session import async_session
+from app.models.evento import Evento
+from app.models.galeria import Galeria
+from app.routers import galeria as rotas
+
+ROTA = "/api/v1/galeria/"
+
+
+def _entrada(nome: str, dados: bytes, modificado_em=datetime(2025, 6, 15, 10, 30)) -> EntradaZip:
+    async def abrir():
+        for inicio in range(0, len(dados), 100):
+            yield dados[inicio:inicio + 100]
+    return EntradaZip(nome=nome, modificado_em=modificado_em, tamanho=len(dados), abrir=abrir)
+
+
+def _inexistente(nome: str) -> EntradaZip:
+    async def abrir():
+        raise BlobNaoEncontrado(nome)
+        yield b""
+    return EntradaZip(nome=nome, modificado_em=datetime(2025, 1, 1), tamanho=10, abrir=abrir)
+
+
+def _montar(entradas, **kwargs) -> bytes:
+    async def juntar() -> bytes:
+        return b"".join([bloco async for bloco in stream_zip(entradas, **kwargs)])
+    return asyncio.run(juntar())
+
+
+def test_zip_valido_em_blocos_e_sem_compressao():
+    a, b = bytes(range(256)) * 3, b"segunda"
+    dados = _montar([_entrada("a.bin", a), _entrada("b.bin", b, datetime(1970, 1, 1))])
+
+    with zipfile.ZipFile(io.BytesIO(dados)) as arquivo:
+        assert arquivo.testzip() is None
+        assert arquivo.namelist() == ["a.bin", "b.bin"]
+        assert (arquivo.read("a.bin"), arquivo.read("b.bin")) == (a, b)
+        info = arquivo.getinfo("a.bin")
+        assert info.compress_type == zipfile.ZIP_STORED
+        assert info.date_time == (2025, 6, 15, 10, 30, 0)
+        # Antes de 1980 não cabe no formato
+        assert arquivo.getinfo("b.bin").date_time[0] == 1980
+
+
+def test_entradas_inexistentes_sao_omitidas():
+    entradas = [_inexistente("x.bin"), _entrada("a.bin", b"abc"), _inexistente("y.bin")]
+
+    with zipfile.ZipFile(io.BytesIO(_montar(entradas, ignorar=(BlobNaoEncontrado,)))) as arquivo:
+        assert arquivo.namelist() == ["a.bin"]
+
+    with pytest.raises(BlobNaoEncontrado):
+        _montar(entradas)
+
+
+def test_zip64_decidido_pelo_tamanho_informado(monkeypatch):
+    # Limite reduzido: a entrada de 3000 bytes faz o papel de uma de mais de 4 GiB
+    monkeypatch.setattr(zipfile, "ZIP64_LIMIT", 2000)
+    grande, pequena = b"g" * 3000, b"p" * 10
+
+    dados = _montar([_entrada("grande.bin", grande), _entrada("pequena.bin", pequena)])
+
+    with zipfile.ZipFile(io.BytesIO(dados)) as arquivo:
+        assert (arquivo.read("grande.bin"), arquivo.read("pequena.bin")) == (grande, pequena)
+    # Campo extra ZIP64 (id 0x0001) só no cabeçalho local da entrada grande
+    tamanho_nome, tamanho_extra = struct.unpack("<HH", dados[26:30])
+    assert struct.unpack("<H", dados[30 + tamanho_nome:32 + tamanho_nome])[0] == 0x0001
+    assert tamanho_extra > 0
+    local_pequena = dados.index(b"PK\x03\x04", 30 + tamanho_nome)
+    assert struct.unpack("<H", dados[local_pequena + 28:local_pequena + 30])[0] == 0
+
+
+@pytest.fixture
+def evento(client, rodar, auth, monkeypatch) -> dict:
+    """Evento com duas imagens no blob store, uma legada e uma excluída"""
+    monkeypatch.setattr(rotas.gerador_derivados, "agendar", lambda chave: None)
+    legado = b"GIF89a" + bytes(range(200))
+
+    async def inserir() -> int:
+        async with async_session() as session:
+            evento = Evento(titulo="Festa Junina")
+            session.add(evento)
+            await session.flush()
+            session.add(Galeria(id_evento=evento.id_evento, data=date(2025, 6, 14), imagem=legado))
+            await session.commit()
+            return evento.id_evento
+
+    id_evento = rodar(inserir)
+    imagens = {}
+    for cor, dia in [((1, 2, 3), "2025-06-15"), ((4, 5, 6), "2025-06-16"), ((7, 8, 9), "2025-06-17")]:
+        conteudo = imagem_png(cor)
+        criada = client.post(
+            f"{ROTA}upload", headers=auth, data={"id_evento": str(id_evento), "data": dia},
+            files={"arquivo": ("a.png", conteudo, "image/png")}
+        ).json()
+        imagens[criada["id_imagem"]] = (dia, conteudo)
+    excluida = max(imagens)
+    client.delete(f"{ROTA}{excluida}", headers=auth)
+    del imagens[excluida]
+    return {"id": id_evento, "imagens": imagens, "legado": legado}
+
+
+def test_endpoint_zip_do_evento(client, auth, evento):
+    resposta = client.get(f"{ROTA}evento/{evento['id']}/zip", headers=auth)
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == "application/zip"
+    assert f'evento-{evento["id"]}.zip' in resposta.headers["content-disposition"]
+    with zipfile.ZipFile(io.BytesIO(resposta.content)) as arquivo:
+        nomes = arquivo.namelist()
+        assert len(nomes) == 3
+        assert nomes[0].startswith("2025-06-14_") and nomes[0].endswith(".gif")
+        assert arquivo.read(nomes[0]) == evento["legado"]
+        for id_imagem, (dia, conteudo) in evento["imagens"].items():
+            assert arquivo.read(f"{dia}_{id_imagem}.png") == conteudo
+
+
+def test_endpoint_omite_arquivo_ausente_do_blob_store(client, rodar, auth, evento):
+    id_imagem = min(evento["imagens"])
+    _, conteudo = evento["imagens"][id_imagem]
+    chave = client.get(f"{ROTA}{id_imagem}", headers=auth).json()["image_hash"]
+    rodar(blob_store.remover, chave)
+
+    resposta = client.get(f"{ROTA}evento/{evento['id']}/zip", headers=auth)
+
+    with zipfile.ZipFile(io.BytesIO(resposta.content)) as arquivo:
+        assert len(arquivo.namelist()) == 2
+        assert not any(nome.endswith(f"_{id_imagem}.png") for nome in arquivo.namelist())
+
+
+def test_evento_inexistente(client, auth):
+    assert client.get(f"{ROTA}evento/999999/zip", headers=auth).status_code == 404